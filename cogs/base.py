@@ -1,6 +1,7 @@
-import discord
 import logging
 from discord.ext import commands
+from config.config import MIN_GROUP_MEMBERS, MAX_GROUP_MEMBERS
+from utils.member_cache import fetch_voice_members
 
 class BaseCog(commands.Cog):
     """Base cog with utility methods for all cogs"""
@@ -8,7 +9,7 @@ class BaseCog(commands.Cog):
         self.bot = bot
         self.logger = logging.getLogger('bot')
 
-    async def check_voice_state(self, user):
+    async def check_voice_state(self, user, min_members=MIN_GROUP_MEMBERS, max_members=MAX_GROUP_MEMBERS):
         """Check if user is in a voice channel and return eligible members"""
         # Validate user is in voice channel
         if not user.voice or not user.voice.channel:
@@ -19,31 +20,35 @@ class BaseCog(commands.Cog):
                 'channel': None
             }
         
-        # Get non-bot members
-        members = [m for m in user.voice.channel.members if not m.bot]
+        return await self.check_voice_channel(user.voice.channel, min_members, max_members)
+
+    async def check_voice_channel(self, channel, min_members=MIN_GROUP_MEMBERS, max_members=MAX_GROUP_MEMBERS):
+        """Check a voice channel has enough members for a fractal and return them"""
+        # Get non-bot members (fetched on demand if the member cache isn't chunked)
+        members = [m for m in await fetch_voice_members(channel) if not m.bot]
         
-        # Validate member count (2-6 members)
-        if len(members) < 2:
+        # Validate member count against the server's group size limits
+        if len(members) < min_members:
             return {
                 'success': False,
-                'message': '❌ You need at least 2 members in your voice channel to create a fractal group.',
+                'message': f'❌ You need at least {min_members} members in your voice channel to create a fractal group.',
                 'members': [],
-                'channel': user.voice.channel
+                'channel': channel
             }
         
-        if len(members) > 6:
+        if len(members) > max_members:
             return {
                 'success': False,
-                'message': '❌ Fractal groups are limited to 6 members maximum for optimal experience.',
+                'message': f'❌ Fractal groups are limited to {max_members} members maximum for optimal experience.',
                 'members': [],
-                'channel': user.voice.channel
+                'channel': channel
             }
         
         return {
             'success': True,
             'message': f'✅ Found {len(members)} eligible members in voice channel.',
             'members': members,
-            'channel': user.voice.channel
+            'channel': channel
         }
 
 async def setup(bot):
@@ -0,0 +1,194 @@
+"""
+Shared pipeline for admin commands: defer, authorize, resolve the group, time and record
+"""
+import functools
+import inspect
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from .group import FractalGroup
+
+SLOW_COMMAND_SECONDS = 2.0   # Admin commands slower than this are logged as warnings
+LATENCY_SAMPLES = 256        # Recent latencies kept per command for percentiles
+
+# Outcomes recorded per invocation
+OK = 'ok'
+DENIED = 'denied'
+REJECTED = 'rejected'
+ERROR = 'error'
+
+
+class AdminError(Exception):
+    """A user-facing reason an admin command can't proceed"""
+
+
+class AdminAuthorizer:
+    """Administrator checks cached per (guild, member) for a short time
+
+    Resolving permissions walks the member's roles and the channel
+    overwrites; admins tend to issue commands in bursts, so the result is
+    reused until it expires or a role/member update invalidates it.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._cache: Dict[Tuple[int, int], Tuple[bool, float]] = {}  # (guild_id, user_id) -> (allowed, expires)
+
+    def is_admin(self, user) -> bool:
+        guild = getattr(user, 'guild', None)
+        if guild is None:
+            return False  # Not a guild member (e.g. a DM)
+        key = (guild.id, user.id)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and cached[1] > now:
+            return cached[0]
+        allowed = user.guild_permissions.administrator
+        self._cache[key] = (allowed, now + self.ttl)
+        return allowed
+
+    def invalidate(self, guild_id: Optional[int] = None, user_id: Optional[int] = None):
+        """Forget cached checks for a member, a whole guild, or everyone"""
+        if guild_id is None:
+            self._cache.clear()
+        elif user_id is not None:
+            self._cache.pop((guild_id, user_id), None)
+        else:
+            for key in [key for key in self._cache if key[0] == guild_id]:
+                del self._cache[key]
+
+
+class CommandStats:
+    __slots__ = ('calls', 'outcomes', 'total', 'max', 'latencies')
+
+    def __init__(self):
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.total = 0.0
+        self.max = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class AdminMetrics:
+    """Per-command call counts, outcomes and latency (seconds)"""
+
+    def __init__(self):
+        self.commands: Dict[str, CommandStats] = {}
+
+    def record(self, name: str, seconds: float, outcome: str):
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        stats.calls += 1
+        stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        stats.latencies.append(seconds)
+
+    def summary(self) -> List[Dict]:
+        """One row per command, most used first"""
+        return [
+            {
+                'command': name,
+                'calls': stats.calls,
+                'errors': stats.outcomes.get(ERROR, 0),
+                'denied': stats.outcomes.get(DENIED, 0),
+                'mean_ms': stats.total / stats.calls * 1000,
+                'p50_ms': stats.percentile(0.5) * 1000,
+                'p95_ms': stats.percentile(0.95) * 1000,
+                'max_ms': stats.max * 1000
+            }
+            for name, stats in sorted(self.commands.items(), key=lambda item: item[1].calls, reverse=True)
+        ]
+
+
+def resolve_group(cog, thread_id: str) -> FractalGroup:
+    """The active group for a thread ID typed by an admin"""
+    try:
+        group = cog.active_groups.get(int(thread_id))
+    except ValueError:
+        raise AdminError("Invalid thread ID format.")
+    if not group:
+        raise AdminError("No active fractal found with that thread ID.")
+    return group
+
+
+def admin_command(action: str, group: Optional[str] = None):
+    """Wrap a cog method as an admin command handler
+
+    The wrapper defers the interaction (ephemeral), checks administrator
+    permission through ``cog.admin_auth``, and times the handler into
+    ``cog.admin_metrics``. An AdminError raised anywhere is sent to the
+    admin as is. Any other exception is logged and reported as
+    "Error <action>".
+
+    With ``group='required'`` or ``group='optional'``, the handler's
+    ``group: FractalGroup`` parameter is exposed to Discord as a
+    ``thread_id`` string option and resolved to the active group before the
+    handler runs (None when an optional ID is omitted).
+
+    Apply it below ``@<app_commands.Group>.command`` and any describe/choices
+    decorators.
+    """
+    def decorator(handler: Callable):
+        signature = inspect.signature(handler)
+        if group:
+            thread_param = inspect.Parameter(
+                'thread_id', inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=str,
+                default=None if group == 'optional' else inspect.Parameter.empty
+            )
+            params = [thread_param if p.name == 'group' else p for p in signature.parameters.values()]
+            # Discord requires required options before optional ones
+            signature = signature.replace(parameters=params[:2] + sorted(
+                params[2:], key=lambda p: p.default is not inspect.Parameter.empty))
+
+        @functools.wraps(handler)
+        async def wrapper(cog, interaction: discord.Interaction, **options):
+            started = time.perf_counter()
+            outcome = OK
+            try:
+                try:
+                    await interaction.response.defer(ephemeral=True)
+                except discord.InteractionResponded:
+                    pass
+
+                if not cog.admin_auth.is_admin(interaction.user):
+                    outcome = DENIED
+                    await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
+                    return
+
+                if group:
+                    thread_id = options.pop('thread_id', None)
+                    options['group'] = resolve_group(cog, thread_id) if thread_id is not None else None
+
+                await handler(cog, interaction, **options)
+
+            except AdminError as e:
+                outcome = REJECTED
+                await interaction.followup.send(f"❌ {e}", ephemeral=True)
+            except discord.NotFound:
+                outcome = ERROR  # Interaction expired before we could respond
+            except Exception as e:
+                outcome = ERROR
+                logging.getLogger('bot').error(f"Admin command {handler.__name__} failed: {e}", exc_info=True)
+                try:
+                    await interaction.followup.send(f"❌ Error {action}: {str(e)}", ephemeral=True)
+                except discord.HTTPException:
+                    pass
+            finally:
+                elapsed = time.perf_counter() - started
+                cog.admin_metrics.record(handler.__name__, elapsed, outcome)
+                if elapsed > SLOW_COMMAND_SECONDS:
+                    logging.getLogger('bot').warning(f"Admin command {handler.__name__} took {elapsed:.1f}s ({outcome})")
+
+        wrapper.__signature__ = signature
+        return wrapper
+    return decorator
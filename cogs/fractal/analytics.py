@@ -0,0 +1,168 @@
+"""
+Vectorized analytics over historical fractal voting data
+"""
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
+
+
+class VoteHistory:
+    """Columnar NumPy view of vote and winner history across many fractals
+
+    Members are mapped from Discord snowflakes to dense indices so every
+    metric can be computed with array operations instead of walking records.
+    """
+
+    def __init__(self, records: Iterable[Dict]):
+        """Load history records (see FractalGroup.to_history_record) into arrays"""
+        records = list(records)
+        self.fractal_ids = np.array([r['thread_id'] for r in records], dtype=np.int64)
+
+        ballots, events, rounds, participation = [], [], [], []
+        for f, record in enumerate(records):
+            for member_id in record['members']:
+                participation.append((f, member_id))
+            for level, voter_id, candidate_id, changed in record['votes']:
+                events.append((f, level, voter_id, candidate_id, changed))
+            for round_info in record['rounds']:
+                rounds.append((f, round_info['level'], round_info['winner_id'], len(record['members'])))
+                for voter_id, candidate_id in round_info['ballots']:
+                    ballots.append((f, round_info['level'], voter_id, candidate_id))
+
+        ballots = np.array(ballots, dtype=np.int64).reshape(-1, 4)
+        events = np.array(events, dtype=np.int64).reshape(-1, 5)
+        rounds = np.array(rounds, dtype=np.int64).reshape(-1, 4)
+        participation = np.array(participation, dtype=np.int64).reshape(-1, 2)
+
+        # Dense member index over every snowflake that appears anywhere
+        self.member_ids = np.unique(np.concatenate([
+            participation[:, 1], events[:, 2], events[:, 3],
+            rounds[:, 2], ballots[:, 2], ballots[:, 3]
+        ]))
+        index = lambda ids: np.searchsorted(self.member_ids, ids)
+
+        self.ballot_fractal, self.ballot_level = ballots[:, 0], ballots[:, 1]
+        self.ballot_voter, self.ballot_candidate = index(ballots[:, 2]), index(ballots[:, 3])
+
+        self.event_fractal, self.event_level = events[:, 0], events[:, 1]
+        self.event_voter = index(events[:, 2])
+        self.event_changed = events[:, 4].astype(bool)
+
+        self.round_fractal, self.round_level = rounds[:, 0], rounds[:, 1]
+        self.round_winner, self.round_members = index(rounds[:, 2]), rounds[:, 3]
+
+        self.part_fractal, self.part_member = participation[:, 0], index(participation[:, 1])
+
+        levels = np.concatenate([self.ballot_level, self.event_level, self.round_level])
+        self.max_level = int(levels.max()) if levels.size else 0
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_ids)
+
+    @property
+    def fractal_count(self) -> int:
+        return len(self.fractal_ids)
+
+    def vote_tensor(self) -> np.ndarray:
+        """Final-ballot counts indexed as [voter, candidate, level - 1]"""
+        tensor = np.zeros((self.member_count, self.member_count, self.max_level), dtype=np.int32)
+        np.add.at(tensor, (self.ballot_voter, self.ballot_candidate, self.ballot_level - 1), 1)
+        return tensor
+
+    def affinity_matrix(self, normalize: bool = False) -> np.ndarray:
+        """Voter x candidate ballot counts summed over all levels
+
+        With normalize=True each row is the share of that voter's ballots.
+        """
+        matrix = np.zeros((self.member_count, self.member_count), dtype=np.float64)
+        np.add.at(matrix, (self.ballot_voter, self.ballot_candidate), 1)
+        if normalize:
+            totals = matrix.sum(axis=1, keepdims=True)
+            matrix = np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+        return matrix
+
+    def top_affinities(self, limit: int = 5) -> List[Tuple[int, int, int]]:
+        """Most frequent (voter_id, candidate_id, count) pairs, excluding self-votes"""
+        matrix = self.affinity_matrix()
+        np.fill_diagonal(matrix, 0)
+        flat = np.argsort(matrix, axis=None)[::-1][:limit]
+        voters, candidates = np.unravel_index(flat, matrix.shape)
+        return [
+            (int(self.member_ids[v]), int(self.member_ids[c]), int(matrix[v, c]))
+            for v, c in zip(voters, candidates) if matrix[v, c] > 0
+        ]
+
+    def consensus_speed(self) -> np.ndarray:
+        """Vote events needed per completed round, relative to group size
+
+        1.0 means every member voted exactly once before a winner emerged;
+        values above 1.0 indicate vote changes before consensus.
+        """
+        if not self.round_level.size:
+            return np.zeros(0)
+        stride = self.max_level + 1
+        event_keys = self.event_fractal * stride + self.event_level
+        round_keys = self.round_fractal * stride + self.round_level
+        keys, counts = np.unique(event_keys, return_counts=True)
+        pos = np.clip(np.searchsorted(keys, round_keys), 0, max(len(keys) - 1, 0))
+        events_per_round = np.where(keys[pos] == round_keys, counts[pos], 0) if keys.size else np.zeros_like(round_keys)
+        return events_per_round / np.maximum(self.round_members, 1)
+
+    def vote_change_rate(self) -> float:
+        """Share of all vote events that changed an earlier vote"""
+        return float(self.event_changed.mean()) if self.event_changed.size else 0.0
+
+    def member_change_rates(self) -> np.ndarray:
+        """Per-member share of their vote events that were changes"""
+        totals = np.bincount(self.event_voter, minlength=self.member_count)
+        changes = np.bincount(self.event_voter, weights=self.event_changed, minlength=self.member_count)
+        return np.divide(changes, totals, out=np.zeros(self.member_count), where=totals > 0)
+
+    def win_rates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-member (fractal win rate, round win rate)
+
+        A fractal win is winning the top level of that fractal; the round win
+        rate is rounds won over fractals participated in.
+        """
+        participations = np.bincount(self.part_member, minlength=self.member_count)
+        top_level = np.zeros(self.fractal_count, dtype=np.int64)
+        np.maximum.at(top_level, self.round_fractal, self.round_level)
+        is_top = self.round_level == top_level[self.round_fractal]
+
+        fractal_wins = np.bincount(self.round_winner[is_top], minlength=self.member_count)
+        round_wins = np.bincount(self.round_winner, minlength=self.member_count)
+        fractal_rate = np.divide(fractal_wins, participations, out=np.zeros(self.member_count), where=participations > 0)
+        round_rate = np.divide(round_wins, participations, out=np.zeros(self.member_count), where=participations > 0)
+        return fractal_rate, round_rate
+
+    def summary(self, limit: int = 5) -> Dict:
+        """JSON-serializable summary used by admin commands and data export"""
+        speed = self.consensus_speed()
+        fractal_rate, round_rate = self.win_rates()
+        participations = np.bincount(self.part_member, minlength=self.member_count)
+        ranked = np.lexsort((-participations, -fractal_rate))[:limit]
+
+        return {
+            'fractals': self.fractal_count,
+            'members': self.member_count,
+            'rounds': int(self.round_level.size),
+            'vote_events': int(self.event_level.size),
+            'vote_change_rate': round(self.vote_change_rate(), 4),
+            'consensus_speed': {
+                'mean': round(float(speed.mean()), 4) if speed.size else None,
+                'median': round(float(np.median(speed)), 4) if speed.size else None
+            },
+            'top_affinities': [
+                {'voter_id': voter, 'candidate_id': candidate, 'count': count}
+                for voter, candidate, count in self.top_affinities(limit)
+            ],
+            'top_win_rates': [
+                {
+                    'member_id': int(self.member_ids[i]),
+                    'fractal_win_rate': round(float(fractal_rate[i]), 4),
+                    'round_win_rate': round(float(round_rate[i]), 4),
+                    'participations': int(participations[i])
+                }
+                for i in ranked if participations[i] > 0
+            ]
+        }
@@ -0,0 +1,245 @@
+"""
+Read-only JSON API over the bot's in-memory fractal state for the web dashboard
+"""
+import asyncio
+import gzip
+import hmac
+import json
+import logging
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from aiohttp import web
+
+from config.config import STREAM_KEEPALIVE_SECONDS
+
+CACHE_ENTRIES = 256      # Rendered responses kept per state version
+GZIP_MIN_BYTES = 1024    # Smaller bodies aren't worth compressing
+
+
+def _id(value: int) -> str:
+    """Snowflakes are sent as strings; they overflow JavaScript numbers"""
+    return str(value)
+
+
+def group_summary(state) -> Dict:
+    return {
+        'threadId': _id(state.thread_id),
+        'guildId': _id(state.guild_id),
+        'name': state.name,
+        'facilitatorId': _id(state.facilitator_id),
+        'level': state.level,
+        'paused': state.paused,
+        'memberCount': len(state.member_ids),
+        'candidateCount': len(state.candidate_ids),
+        'votesCast': len(state.votes),
+        'createdAt': state.created_at,
+        'lastActivity': state.last_activity
+    }
+
+
+def group_tally(state) -> Dict:
+    candidates = set(state.candidate_ids)
+    return {
+        'threadId': _id(state.thread_id),
+        'level': state.level,
+        'threshold': state.threshold(),
+        'tally': {_id(cid): count for cid, count in state.tally().items() if cid in candidates},
+        'waitingOn': [_id(m) for m in state.non_voters()]
+    }
+
+
+def group_detail(state) -> Dict:
+    detail = group_summary(state)
+    detail.update(group_tally(state))
+    detail.update({
+        'members': [{'id': _id(m), 'name': state.display_name(m)} for m in state.member_ids],
+        'candidates': [_id(c) for c in state.candidate_ids],
+        'votes': {_id(voter): _id(candidate) for voter, candidate in state.votes.items()},
+        'winners': {str(level): _id(winner) for level, winner in state.winners.items()}
+    })
+    return detail
+
+
+def history_entry(record: Dict) -> Dict:
+    rounds = sorted(record['rounds'], key=lambda r: r['level'], reverse=True)
+    return {
+        'threadId': _id(record['thread_id']),
+        'guildId': _id(record['guild_id']),
+        'startedAt': record['started_at'],
+        'members': [_id(m) for m in record['members']],
+        'ranking': [{'level': r['level'], 'winnerId': _id(r['winner_id'])} for r in rounds]
+    }
+
+
+class FractalAPI:
+    """aiohttp server exposing active groups, tallies, history and leaderboards
+
+    Every state change is appended to the cog's event log, and the cog bumps
+    ``groups_version`` whenever groups are added or removed or history grows
+    (which happens without an event, or after one). Together they version
+    the whole in-memory state: responses are serialized and gzipped once per
+    version and path, and their ETag lets pollers get a 304 without a body
+    until something changes.
+    """
+
+    def __init__(self, cog, host: str, port: int, token: Optional[str] = None):
+        self.cog = cog
+        self.host = host
+        self.port = port
+        self.token = token
+        self.logger = logging.getLogger('bot')
+        self._cache: Dict[str, Tuple[Tuple[int, int], bytes, Optional[bytes], str]] = {}  # path -> (version, body, gzipped, etag)
+        self._runner = None
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._authorize])
+        app.router.add_get('/api/health', self.health)
+        app.router.add_get('/api/groups', self.groups)
+        app.router.add_get('/api/groups/{thread_id}', self.group)
+        app.router.add_get('/api/tallies', self.tallies)
+        app.router.add_get('/api/history', self.history)
+        app.router.add_get('/api/leaderboard', self.leaderboard)
+        app.router.add_get('/api/stream', self.stream)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Fractal API listening on http://{self.host}:{self.port}/api")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _authorize(self, request: web.Request, handler):
+        if self.token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {self.token}"):
+            raise web.HTTPUnauthorized(text="Unauthorized")
+        return await handler(request)
+
+    def version(self) -> Tuple[int, int]:
+        return self.cog.event_log.seq, self.cog.groups_version
+
+    def respond(self, request: web.Request, build: Callable[[], Dict]) -> web.Response:
+        """Serve ``build()`` as JSON, reusing the rendered body while the state version is unchanged"""
+        version = self.version()
+        key = request.path_qs
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != version:
+            if len(self._cache) >= CACHE_ENTRIES:
+                self._cache.pop(next(iter(self._cache)))
+            body = json.dumps(build(), separators=(',', ':')).encode()
+            compressed = gzip.compress(body, compresslevel=5) if len(body) >= GZIP_MIN_BYTES else None
+            etag = f'W/"{version[0]:x}.{version[1]:x}-{zlib.crc32(body):08x}"'
+            cached = self._cache[key] = (version, body, compressed, etag)
+
+        _, body, compressed, etag = cached
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if_none_match = request.headers.get('If-None-Match', '')
+        if if_none_match == '*' or etag in (tag.strip() for tag in if_none_match.split(',')):
+            return web.Response(status=304, headers=headers)
+        if compressed and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            headers['Content-Encoding'] = 'gzip'
+            body = compressed
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    @staticmethod
+    def _int_param(request: web.Request, name: str, default: Optional[int] = None) -> Optional[int]:
+        value = request.query.get(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise web.HTTPBadRequest(text=f"'{name}' must be an integer")
+
+    def _states(self, request: web.Request):
+        guild_id = self._int_param(request, 'guild_id')
+        return [g.state for g in self.cog.active_groups.values() if guild_id is None or g.state.guild_id == guild_id]
+
+    async def health(self, request: web.Request) -> web.Response:
+        seq, groups_version = self.version()
+        return web.json_response({'ok': True, 'version': seq, 'groupsVersion': groups_version,
+                                  'activeGroups': len(self.cog.active_groups)})
+
+    async def groups(self, request: web.Request) -> web.Response:
+        """GET /api/groups?guild_id= - summaries of active groups"""
+        return self.respond(request, lambda: {'groups': [group_summary(s) for s in self._states(request)]})
+
+    async def group(self, request: web.Request) -> web.Response:
+        """GET /api/groups/{thread_id} - one active group with members, votes and tally"""
+        try:
+            group = self.cog.active_groups.get(int(request.match_info['thread_id']))
+        except ValueError:
+            raise web.HTTPBadRequest(text="thread_id must be an integer")
+        if not group:
+            raise web.HTTPNotFound(text="No active fractal with that thread ID")
+        return self.respond(request, lambda: group_detail(group.state))
+
+    async def tallies(self, request: web.Request) -> web.Response:
+        """GET /api/tallies?guild_id= - current round tallies of active groups"""
+        return self.respond(request, lambda: {'tallies': [group_tally(s) for s in self._states(request)]})
+
+    async def history(self, request: web.Request) -> web.Response:
+        """GET /api/history?guild_id=&limit= - most recent finished fractals first"""
+        guild_id = self._int_param(request, 'guild_id')
+        limit = max(1, min(self._int_param(request, 'limit', 50), 500))
+
+        def build():
+            records = [r for r in reversed(self.cog.fractal_history) if guild_id is None or r['guild_id'] == guild_id]
+            return {'fractals': [history_entry(r) for r in records[:limit]]}
+        return self.respond(request, build)
+
+    async def leaderboard(self, request: web.Request) -> web.Response:
+        """GET /api/leaderboard?guild_id=&limit= - round wins and win rates for a guild"""
+        guild_id = self._int_param(request, 'guild_id')
+        if guild_id is None:
+            raise web.HTTPBadRequest(text="'guild_id' is required")
+        limit = max(1, min(self._int_param(request, 'limit', 10), 100))
+
+        def build():
+            wins = self.cog.get_win_counts(guild_id)
+            summary = self.cog._get_vote_history(guild_id).summary(limit)
+            return {
+                'roundWins': [
+                    {'memberId': _id(member_id), 'wins': count}
+                    for member_id, count in sorted(wins.items(), key=lambda item: item[1], reverse=True)[:limit]
+                ],
+                'winRates': [
+                    {
+                        'memberId': _id(entry['member_id']),
+                        'fractalWinRate': entry['fractal_win_rate'],
+                        'roundWinRate': entry['round_win_rate'],
+                        'participations': entry['participations']
+                    }
+                    for entry in summary['top_win_rates']
+                ]
+            }
+        return self.respond(request, build)
+
+    async def stream(self, request: web.Request) -> web.StreamResponse:
+        """GET /api/stream?thread_id= - live fractal events as server-sent events (all threads if omitted)"""
+        hub = getattr(self.cog, 'stream', None)
+        if hub is None:
+            raise web.HTTPNotFound(text="Live stream is disabled")
+        thread_id = self._int_param(request, 'thread_id')
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        await response.prepare(request)
+
+        subscriber = hub.subscribe(thread_id)
+        try:
+            async for frames in subscriber.frames(STREAM_KEEPALIVE_SECONDS):
+                await response.write(frames)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass  # Client went away
+        finally:
+            hub.unsubscribe(subscriber)
+        return response
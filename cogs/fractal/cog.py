@@ -1,12 +1,36 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
+import io
+import json
 import logging
-import random
+import os
+import time
 from datetime import datetime
+from typing import Optional
 from ..base import BaseCog
 from .views import MemberConfirmationView
-from .group import FractalGroup
+from .group import FractalGroup, mention
+from config.config import GROUP_IDLE_TIMEOUT_SECONDS, REAPER_INTERVAL_SECONDS, EVENT_LOG_PATH, SNAPSHOT_DIR, SNAPSHOT_EVERY_EVENTS, SETUP_API_CONCURRENCY, API_HOST, API_PORT, STREAM_BUFFER_EVENTS, SETTINGS_PATH, ADMIN_AUTH_CACHE_SECONDS, INTERACTION_DEDUP_SIZE, HANDOFF_PATH, SHUTDOWN_DRAIN_SECONDS
+from utils.web_integration import web_integration
+from utils.cache_profile import cache_stats
+from .analytics import VoteHistory
+from .scheduler import RoundScheduler, REMINDER
+from .events import EventLog
+from .api import FractalAPI
+from .stream import StreamHub
+from .settings import SettingsStore, GuildSettings, ANNOUNCE_MODES, ANNOUNCE_CHANNEL, FIELD_NAMES
+from .pagination import GroupListView, EndFractalListView, GroupQuery, SORTS, idle_label
+from .render import send_chunked
+from .admin import AdminAuthorizer, AdminMetrics, AdminError, admin_command
+from .dedup import InteractionDeduper
+from .state import FractalState
+from . import events, handoff
+
+RESTART_NOTICE = "🔄 **Bot restarting** - your votes are saved and this ballot will work again in a moment."
+RESUMED_NOTICE = "✅ **Bot is back** - voting continues on the ballot above."
+NOT_ACCEPTING = "🔄 The bot is restarting. Please try again in a minute."
 
 class FractalCog(BaseCog):
     """Cog for handling ZAO Fractal voting commands and logic"""
@@ -17,24 +41,279 @@ class FractalCog(BaseCog):
         self.logger = logging.getLogger('bot')
         self.active_groups = {}  # Dict mapping thread_id to FractalGroup
         self.daily_counters = {}  # Dict mapping guild_id -> {date: counter}
+        self.fractal_history = []  # History records of completed fractals for analytics
+        self.win_counts = {}  # Dict mapping guild_id -> {member_id: rounds won} across history
+        self.groups_version = 0  # Bumped when groups are added or removed or history grows; versions API responses
+        self.round_scheduler = RoundScheduler(self._on_round_timer)  # Deadlines/reminders for all groups
+        self.event_log = EventLog(EVENT_LOG_PATH, SNAPSHOT_DIR, SNAPSHOT_EVERY_EVENTS)  # Audit trail of state changes
+        self.settings = SettingsStore(SETTINGS_PATH)  # Per-guild settings, cached in memory
+        self.admin_auth = AdminAuthorizer(ADMIN_AUTH_CACHE_SECONDS)  # Cached administrator checks for admin commands
+        self.admin_metrics = AdminMetrics()  # Admin command counts and latency
+        self.dedup = InteractionDeduper(INTERACTION_DEDUP_SIZE)  # Drops redelivered interactions and repeat votes
+        self.api_budget = asyncio.Semaphore(SETUP_API_CONCURRENCY)  # Bounds concurrent setup requests across all groups
+        self.api = FractalAPI(self, API_HOST, API_PORT, os.getenv('FRACTAL_API_TOKEN')) if API_PORT else None  # Dashboard read API
+        self.stream = StreamHub(STREAM_BUFFER_EVENTS) if API_PORT else None  # Live event fan-out served by the API
+        self.accepting = True  # False once shutting down or unloaded; new fractals are refused
+    
+    async def cog_load(self):
+        self.round_scheduler.start()
+        self.idle_reaper.start()
+        if self.api:
+            try:
+                await self.api.start()
+            except OSError as e:
+                self.logger.error(f"Failed to start fractal API on {API_HOST}:{API_PORT}: {e}")
         
-        # Create admin command group
-        self.admin_group = app_commands.Group(name="admin", description="Admin commands for fractal management")
+        # Pick up groups from the previous instance: in memory after a hot
+        # reload, on disk after a controlled restart
+        payload = self.bot.__dict__.pop('fractal_handoff', None) or handoff.take_handoff(HANDOFF_PATH)
+        if payload:
+            if self.bot.is_ready():
+                await self.adopt_handoff(payload)  # Hot reload: serve ballots again before returning
+            else:
+                asyncio.create_task(self.adopt_handoff(payload))
     
-    def _get_next_group_name(self, guild_id: int) -> str:
-        """Generate auto-incremented group name for the day"""
-        today = datetime.now().strftime("%b %d, %Y")
+    async def cog_unload(self):
+        # Leave live groups on the bot for the next instance (hot reload)
+        self.accepting = False
+        self.bot.fractal_handoff = handoff.export_cog(self, handoff.RELOAD)
+        for group in self.active_groups.values():
+            group.release_views()
+        
+        self.round_scheduler.stop()
+        self.idle_reaper.cancel()
+        if self.api:
+            await self.api.stop()
+        self.event_log.close()
+    
+    async def adopt_handoff(self, payload: dict):
+        """Rebuild groups handed off by a previous instance and serve their ballots again"""
+        await self.bot.wait_until_ready()
+        counters = handoff.import_counters(payload)
+        self.daily_counters.update(counters['daily_counters'])
+        self.win_counts.update(counters['win_counts'])
+        self.fractal_history[:0] = counters['fractal_history']
+        self.groups_version += 1
+        
+        adopted = []
+        for entry in payload['groups']:
+            state = FractalState.from_dict(entry['state'])
+            thread = self.bot.get_channel(state.thread_id)
+            if thread is None:
+                try:
+                    thread = await self.bot.fetch_channel(state.thread_id)
+                except discord.HTTPException as e:
+                    self.logger.warning(f"Dropping handed-off fractal '{state.name}': thread unavailable ({e})")
+                    continue
+            
+            group = FractalGroup(thread, [], None, self, state=state, settings=GuildSettings(**entry['settings']))
+            try:
+                group.reattach_ballot(entry['ballot_message_id'])
+            except ValueError as e:
+                self.logger.error(f"Failed to reattach ballot in '{state.name}': {e}")
+            self.add_group(group)
+            adopted.append(group)
+        
+        self.logger.info(
+            f"Adopted {len(adopted)} of {len(payload['groups'])} fractal groups after {payload['reason']} "
+            f"({time.time() - payload['saved_at']:.1f}s after hand-off)"
+        )
+        if payload['reason'] == handoff.RESTART:
+            await self.notify_groups(adopted, RESUMED_NOTICE)
+    
+    async def notify_groups(self, groups, message: str):
+        """Post a notice in several group threads concurrently, bounded by the shared API budget"""
+        async def notify(group):
+            async with self.api_budget:
+                try:
+                    await group.thread.send(message)
+                except discord.HTTPException:
+                    pass  # Thread may be gone or locked
+        
+        await asyncio.gather(*(notify(group) for group in groups))
+    
+    async def shutdown(self, notice: str = RESTART_NOTICE) -> int:
+        """Prepare for the process to exit without ending any fractals
+        
+        New fractals are refused, ballots and timers stop, and every active
+        group is saved to HANDOFF_PATH (and snapshotted in the event log) for
+        the next process to adopt. Groups are then told the bot is restarting
+        while queued webhooks drain, both within SHUTDOWN_DRAIN_SECONDS.
+        Returns the number of groups handed off.
+        """
+        self.accepting = False
+        self.round_scheduler.stop()
+        self.idle_reaper.cancel()
+        groups = list(self.active_groups.values())
+        for group in groups:
+            group.release_views()  # No votes may land after the state is saved
+        
+        try:
+            handoff.write_handoff(HANDOFF_PATH, handoff.export_cog(self, handoff.RESTART))
+        except OSError as e:
+            self.logger.error(f"Failed to save fractal handoff to {HANDOFF_PATH}: {e}")
+        for group in groups:
+            self.event_log.write_snapshot(group.state)
+        self.event_log.flush()
+        
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(self.notify_groups(groups, notice), web_integration.flush(SHUTDOWN_DRAIN_SECONDS)),
+                SHUTDOWN_DRAIN_SECONDS
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Shutdown notices/webhooks still pending after {SHUTDOWN_DRAIN_SECONDS}s")
+        await web_integration.close()
+        
+        self.logger.info(f"Fractal cog shut down; handed off {len(groups)} active groups")
+        return len(groups)
+    
+    async def reap_group(self, thread_id: int, reason: str) -> bool:
+        """Evict an abandoned group, freeing its views and timers and notifying the web app"""
+        group = self.remove_group(thread_id)
+        if not group:
+            return False
+        
+        group.release_views()
+        group.cancel_timers()
+        group.record(events.REAPED, reason=reason)
+        self.record_history(group.state)
+        self.logger.info(f"Reaped fractal group '{group.state.name}' ({reason})")
+        
+        await web_integration.notify_fractal_reaped(group, reason)
+        return True
+    
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        """Evict a group as soon as its thread is deleted"""
+        await self.reap_group(payload.thread_id, "thread deleted")
+    
+    @commands.Cog.listener()
+    async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
+        """Evict a group as soon as its thread is archived"""
+        if after.archived and not before.archived:
+            await self.reap_group(after.id, "thread archived")
+    
+    @tasks.loop(seconds=REAPER_INTERVAL_SECONDS)
+    async def idle_reaper(self):
+        """Periodically close groups with no activity for GROUP_IDLE_TIMEOUT_SECONDS"""
+        await self.reap_idle_groups()
+    
+    @idle_reaper.before_loop
+    async def before_idle_reaper(self):
+        await self.bot.wait_until_ready()
+    
+    async def reap_idle_groups(self) -> int:
+        """Close groups idle past the timeout and return how many were reaped"""
+        cutoff = time.time() - GROUP_IDLE_TIMEOUT_SECONDS
+        idle = [group for group in self.active_groups.values() if group.state.last_activity < cutoff]
+        
+        for group in idle:
+            try:
+                await group.thread.send("🧹 **Fractal closed** after a long period of inactivity.")
+            except discord.HTTPException:
+                pass  # Thread may be gone or locked; reap regardless
+            await self.reap_group(group.state.thread_id, "idle timeout")
+        
+        return len(idle)
+    
+    async def _on_round_timer(self, thread_id: int, kind: str):
+        """Handle a fired round timer from the scheduler"""
+        group = self.active_groups.get(thread_id)
+        if not group or group.paused:
+            return
+        if kind == REMINDER:
+            await group.send_reminder()
+        else:
+            await group.resolve_timeout()
+    
+    async def add_thread_members(self, thread: discord.Thread, members):
+        """Add members to a thread concurrently, bounded by the shared API budget
+        
+        discord.py still waits out any 429s per route; the semaphore keeps
+        several groups starting at once from bursting into the global limit.
+        """
+        async def add(member):
+            async with self.api_budget:
+                try:
+                    await thread.add_user(member)
+                except discord.HTTPException:
+                    pass  # Member might already be in thread or have permissions issues
         
-        if guild_id not in self.daily_counters:
-            self.daily_counters[guild_id] = {}
+        await asyncio.gather(*(add(member) for member in members))
+    
+    async def create_fractal_group(self, channel: discord.TextChannel, name: str, members, facilitator) -> FractalGroup:
+        """Create a fractal's thread and register its group without starting it"""
+        async with self.api_budget:
+            thread = await channel.create_thread(
+                name=name,
+                type=discord.ChannelType.public_thread,
+                reason="ZAO Fractal Group"
+            )
         
-        if today not in self.daily_counters[guild_id]:
-            self.daily_counters[guild_id][today] = 0
+        group = FractalGroup(thread=thread, members=members, facilitator=facilitator, cog=self)
+        self.add_group(group)
+        return group
+    
+    async def launch_fractal_group(self, group: FractalGroup, members, started_at: float = None):
+        """Add members to a new group's thread while its welcome and first ballot go out
         
-        self.daily_counters[guild_id][today] += 1
-        counter = self.daily_counters[guild_id][today]
+        The thread is public and the welcome mentions everyone, so members
+        don't miss anything while their additions are still in flight.
+        """
+        async def start():
+            try:
+                await group.start_fractal(started_at)
+            except Exception as e:
+                # If fractal start fails, send error to thread
+                await group.thread.send(f"❌ Error starting fractal: {str(e)}")
+                raise
         
-        return f"Fractal Group {counter} - {today}"
+        await asyncio.gather(self.add_thread_members(group.thread, members), start())
+    
+    def _reserve_group_names(self, guild_id: int, count: int) -> list:
+        """Allocate ``count`` consecutive auto-incremented group names for the day in one step"""
+        today = datetime.now().strftime("%b %d, %Y")
+        counters = self.daily_counters.setdefault(guild_id, {})
+        first = counters.get(today, 0) + 1
+        counters[today] = first + count - 1
+        return [f"Fractal Group {counter} - {today}" for counter in range(first, first + count)]
+    
+    def _get_next_group_name(self, guild_id: int) -> str:
+        """Generate auto-incremented group name for the day"""
+        return self._reserve_group_names(guild_id, 1)[0]
+    
+    def add_group(self, group: FractalGroup):
+        """Register a live group (always through here, so API responses see the change)"""
+        self.active_groups[group.state.thread_id] = group
+        self.groups_version += 1
+    
+    def remove_group(self, thread_id: int) -> Optional[FractalGroup]:
+        """Drop a group from the active set, returning it if it was there"""
+        group = self.active_groups.pop(thread_id, None)
+        if group:
+            self.groups_version += 1
+        return group
+    
+    def record_history(self, state):
+        """Keep a finished group's history for analytics and tie-break win counts"""
+        self.fractal_history.append(state.to_history_record())
+        self.groups_version += 1
+        guild_wins = self.win_counts.setdefault(state.guild_id, {})
+        # Only rounds actually won by vote count; finalize() also places the
+        # last remaining candidate in state.winners without a round
+        for _, winner_id in state.round_results():
+            guild_wins[winner_id] = guild_wins.get(winner_id, 0) + 1
+    
+    def get_win_counts(self, guild_id: int) -> dict:
+        """Rounds won per member in this guild's finished fractals"""
+        return self.win_counts.get(guild_id, {})
+    
+    def _get_vote_history(self, guild_id: int) -> VoteHistory:
+        """Load completed and in-progress fractals for a guild into a VoteHistory"""
+        records = [r for r in self.fractal_history if r['guild_id'] == guild_id]
+        records += [g.state.to_history_record() for g in self.active_groups.values() if g.state.guild_id == guild_id]
+        return VoteHistory(records)
     
     @app_commands.command(
         name="zaofractal",
@@ -55,8 +334,13 @@ class FractalCog(BaseCog):
             # Already responded, continue with followup
             pass
         
-        # Check user's voice state
-        voice_check = await self.check_voice_state(interaction.user)
+        if not self.accepting:
+            await interaction.followup.send(NOT_ACCEPTING, ephemeral=True)
+            return
+        
+        # Check user's voice state against this server's group size limits
+        settings = self.settings.get(interaction.guild.id)
+        voice_check = await self.check_voice_state(interaction.user, settings.min_group_members, settings.max_group_members)
         if not voice_check['success']:
             try:
                 await interaction.followup.send(voice_check['message'], ephemeral=True)
@@ -83,6 +367,87 @@ class FractalCog(BaseCog):
                 view=view
             )
     
+    @app_commands.command(
+        name="zaofractal_bulk",
+        description="Start fractal groups in several voice channels at once (admin only)"
+    )
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(
+        category="Start a group in every voice channel in this category",
+        channel_1="Voice channel to start a group in",
+        channel_2="Voice channel to start a group in",
+        channel_3="Voice channel to start a group in",
+        channel_4="Voice channel to start a group in",
+        channel_5="Voice channel to start a group in"
+    )
+    async def zaofractal_bulk(self, interaction: discord.Interaction,
+                              category: discord.CategoryChannel = None,
+                              channel_1: discord.VoiceChannel = None,
+                              channel_2: discord.VoiceChannel = None,
+                              channel_3: discord.VoiceChannel = None,
+                              channel_4: discord.VoiceChannel = None,
+                              channel_5: discord.VoiceChannel = None):
+        """Validate several voice channels and start a fractal group in each valid one"""
+        await interaction.response.defer()
+        started_at = time.perf_counter()
+        # Launches groups on behalf of whoever is in the channels, so admins only
+        if not self.admin_auth.is_admin(interaction.user):
+            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
+            return
+        if not self.accepting:
+            await interaction.followup.send(NOT_ACCEPTING)
+            return
+        
+        # Collect the requested voice channels without duplicates
+        voice_channels = list(category.voice_channels) if category else []
+        voice_channels += [c for c in (channel_1, channel_2, channel_3, channel_4, channel_5) if c]
+        voice_channels = list({c.id: c for c in voice_channels}.values())
+        if not voice_channels:
+            await interaction.followup.send("❌ Choose a category or at least one voice channel.")
+            return
+        
+        # Threads go in the text channel the command was run from
+        parent = interaction.channel
+        if isinstance(parent, discord.Thread):
+            parent = parent.parent
+        
+        # Validate every channel in one pass
+        settings = self.settings.get(interaction.guild.id)
+        checks = await asyncio.gather(*(
+            self.check_voice_channel(c, settings.min_group_members, settings.max_group_members) for c in voice_channels
+        ))
+        valid = [check for check in checks if check['success']]
+        skipped = [check for check in checks if not check['success'] and check['channel'].voice_states]
+        
+        names = self._reserve_group_names(interaction.guild.id, len(valid))
+        
+        async def launch(check, name):
+            group = await self.create_fractal_group(parent, name, check['members'], interaction.user)
+            await self.launch_fractal_group(group, check['members'], started_at)
+            return group
+        
+        results = await asyncio.gather(*(launch(check, name) for check, name in zip(valid, names)), return_exceptions=True)
+        
+        # One line per channel; a large category can run past one message
+        parts = ["# 🚀 **Bulk Fractal Launch**\n\n"]
+        for check, result in zip(valid, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Bulk launch failed for {check['channel'].name}: {result}", exc_info=result)
+                parts.append(f"❌ {check['channel'].mention}: failed to start ({result})\n")
+            else:
+                parts.append(f"✅ {check['channel'].mention} → {result.thread.mention} ({len(check['members'])} members)\n")
+        for check in skipped:
+            parts.append(f"{check['channel'].mention}: {check['message']}\n")
+        
+        launched = sum(1 for result in results if not isinstance(result, Exception))
+        summary = f"\n**Started {launched} of {len(voice_channels)} channels** in {time.perf_counter() - started_at:.1f}s"
+        if len(voice_channels) > len(valid) + len(skipped):
+            summary += f" ({len(voice_channels) - len(valid) - len(skipped)} empty)"
+        parts.append(summary)
+        
+        await send_chunked(interaction.followup.send, parts)
+    
     @app_commands.command(
         name="endgroup",
         description="End an active fractal group (facilitator only)"
@@ -103,13 +468,12 @@ class FractalCog(BaseCog):
             return
         
         # Check if user is facilitator
-        if interaction.user.id != group.facilitator.id:
+        if interaction.user.id != group.state.facilitator_id:
             await interaction.followup.send("❌ Only the group facilitator can end the fractal group.", ephemeral=True)
             return
         
-        # End the fractal group
+        # End the fractal group (also removes it from active groups)
         await group.end_fractal()
-        del self.active_groups[interaction.channel.id]
         
         await interaction.followup.send("✅ Fractal group ended successfully.", ephemeral=True)
     
@@ -139,119 +503,103 @@ class FractalCog(BaseCog):
             await interaction.followup.send(f"❌ This thread is not an active fractal group.\nActive threads: {active_thread_ids}\nCurrent thread: {interaction.channel.id}", ephemeral=True)
             return
         
-        # Build status message
-        status = f"# ZAO Fractal Status\n\n"
-        status += f"**Group:** {interaction.channel.name}\n"
-        status += f"**Facilitator:** {group.facilitator.mention}\n"
-        status += f"**Current Level:** {group.current_level}\n"
-        status += f"**Members:** {len(group.members)}\n"
-        status += f"**Active Candidates:** {len(group.active_candidates)}\n"
-        status += f"**Votes Cast:** {len(group.votes)}/{len(group.members)}\n\n"
-        
-        # Winners so far
-        if group.winners:
-            status += "**Winners:**\n"
-            for level, winner in sorted(group.winners.items(), reverse=True):
-                status += f"Level {level}: {winner.mention}\n"
-        
-        await interaction.followup.send(status, ephemeral=True)
+        await interaction.followup.send(group.fragments.status(), ephemeral=True)
     
     # Admin Commands
-    @app_commands.command(
-        name="admin_end_fractal",
-        description="[ADMIN] Force end any active fractal group"
+    # Each handler runs inside admin_command(), which defers, checks
+    # permission, resolves ``thread_id`` to a group and records timing.
+    admin = app_commands.Group(
+        name="admin",
+        description="Admin commands for fractal management",
+        guild_only=True,
+        default_permissions=discord.Permissions(administrator=True)
     )
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """Drop a member's cached admin check when their roles change"""
+        if before.roles != after.roles:
+            self.admin_auth.invalidate(after.guild.id, after.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        """Drop a guild's cached admin checks when a role's permissions change"""
+        if before.permissions != after.permissions:
+            self.admin_auth.invalidate(after.guild.id)
+    
+    @admin.command(name="end_fractal", description="Force end any active fractal group")
     @app_commands.describe(thread_id="ID of the thread to end (optional)")
-    async def admin_end_fractal(self, interaction: discord.Interaction, thread_id: str = None):
+    @admin_command("ending fractal", group='optional')
+    async def admin_end_fractal(self, interaction: discord.Interaction, group: FractalGroup = None):
         """Admin command to force end fractals"""
-        await interaction.response.defer(ephemeral=True)
-        
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
+        if group:
+            # End specific fractal
+            await group.end_fractal()
+            await interaction.followup.send(f"✅ Ended fractal in {group.thread.mention}", ephemeral=True)
             return
         
-        if thread_id:
-            # End specific fractal
-            try:
-                thread_id_int = int(thread_id)
-                if thread_id_int in self.active_groups:
-                    group = self.active_groups[thread_id_int]
-                    await group.end_fractal()
-                    await interaction.followup.send(f"✅ Ended fractal in {group.thread.mention}", ephemeral=True)
-                else:
-                    await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-            except ValueError:
-                await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        else:
-            # Show list of active fractals to choose from
-            if not self.active_groups:
-                await interaction.followup.send("❌ No active fractals to end.", ephemeral=True)
-                return
-            
-            status = "**Active Fractals:**\n"
-            for thread_id, group in self.active_groups.items():
-                status += f"• {group.thread.mention} (ID: {thread_id}) - Level {group.current_level}\n"
-            status += "\nUse `/admin_end_fractal thread_id:<ID>` to end a specific one."
-            
-            await interaction.followup.send(status, ephemeral=True)
+        # Show pages of active fractals to choose from
+        if not self.active_groups:
+            raise AdminError("No active fractals to end.")
+        
+        view = EndFractalListView(
+            self, "Active Fractals", GroupQuery(), self._render_end_line, interaction.user.id, page_size=20
+        )
+        view.header = "Pick a fractal below, or use `/admin end_fractal thread_id:<ID>` to end a specific one.\n\n"
+        await view.send(interaction)
     
-    @app_commands.command(
-        name="admin_list_fractals",
-        description="[ADMIN] List all active fractal groups"
+    @admin.command(name="list_fractals", description="List all active fractal groups")
+    @app_commands.describe(
+        this_server="Only list groups in this server",
+        level="Only list groups at this level",
+        paused="Only list paused (true) or running (false) groups",
+        idle_minutes="Only list groups idle for at least this many minutes",
+        sort="Initial sort order"
     )
-    async def admin_list_fractals(self, interaction: discord.Interaction):
+    @app_commands.choices(sort=[app_commands.Choice(name=label, value=name) for name, (label, _) in SORTS.items()])
+    @admin_command("listing fractals")
+    async def admin_list_fractals(self, interaction: discord.Interaction, this_server: bool = False, level: int = None,
+                                  paused: bool = None, idle_minutes: int = 0, sort: str = 'idle'):
         """Admin command to list all active fractals"""
-        await interaction.response.defer(ephemeral=True)
-        
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
-        
         if not self.active_groups:
             await interaction.followup.send("✅ No active fractal groups.", ephemeral=True)
             return
         
-        status = f"**Active Fractal Groups ({len(self.active_groups)}):**\n\n"
-        for thread_id, group in self.active_groups.items():
-            status += f"**{group.thread.name}**\n"
-            status += f"• Thread: {group.thread.mention}\n"
-            status += f"• Facilitator: {group.facilitator.mention}\n"
-            status += f"• Current Level: {group.current_level}\n"
-            status += f"• Members: {len(group.members)}\n"
-            status += f"• Active Candidates: {len(group.active_candidates)}\n"
-            status += f"• Votes Cast: {len(group.votes)}\n\n"
-        
-        await interaction.followup.send(status, ephemeral=True)
+        query = GroupQuery(
+            guild_id=interaction.guild.id if this_server else None,
+            level=level,
+            paused=paused,
+            min_idle_seconds=idle_minutes * 60,
+            sort=sort
+        )
+        view = GroupListView(
+            self, f"Active Fractal Groups ({len(self.active_groups)})", query,
+            lambda group, now: group.fragments.list_entry(), interaction.user.id, page_size=8
+        )
+        await view.send(interaction)
     
-    @app_commands.command(
-        name="admin_cleanup",
-        description="[ADMIN] Clean up old/stuck fractal groups"
-    )
+    @staticmethod
+    def _render_end_line(group, now: float) -> str:
+        return f"• <#{group.state.thread_id}> (ID: {group.state.thread_id}) - Level {group.current_level}\n"
+    
+    @staticmethod
+    def _render_server_line(group, now: float) -> str:
+        status = "⏸️ Paused" if group.paused else "▶️ Active"
+        return f"• {group.state.name} - Level {group.current_level} ({status}, idle {idle_label(group.state, now)})\n"
+    
+    @admin.command(name="cleanup", description="Clean up old/stuck fractal groups")
+    @admin_command("cleaning up fractals")
     async def admin_cleanup(self, interaction: discord.Interaction):
         """Admin command to cleanup stuck fractals"""
-        await interaction.response.defer(ephemeral=True)
-        
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
-        
-        cleaned_count = 0
-        to_remove = []
-        
-        for thread_id, group in self.active_groups.items():
-            try:
-                # Check if thread still exists and is accessible
-                thread = self.bot.get_channel(thread_id)
-                if not thread or thread.archived:
-                    to_remove.append(thread_id)
-                    cleaned_count += 1
-            except:
-                to_remove.append(thread_id)
-                cleaned_count += 1
+        # Evict groups whose thread is gone or archived (normally handled by thread events)
+        missing = [
+            thread_id for thread_id in self.active_groups
+            if not (thread := self.bot.get_channel(thread_id)) or thread.archived
+        ]
+        for thread_id in missing:
+            await self.reap_group(thread_id, "thread unavailable")
         
-        # Remove invalid groups
-        for thread_id in to_remove:
-            del self.active_groups[thread_id]
+        cleaned_count = len(missing) + await self.reap_idle_groups()
         
         await interaction.followup.send(
             f"✅ Cleanup complete. Removed {cleaned_count} inactive fractal groups.",
@@ -259,543 +607,421 @@ class FractalCog(BaseCog):
         )
     
     # Force Round Progression Commands
-    @app_commands.command(
-        name="admin_force_round",
-        description="[ADMIN] Skip current voting and move to next level"
-    )
+    @admin.command(name="force_round", description="Skip current voting and move to next level")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_force_round(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("forcing round", group='required')
+    async def admin_force_round(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to force move to next round"""
-        await interaction.response.defer(ephemeral=True)
+        # Find candidate with most votes, tie-broken by the configured policy
+        winner_id, tie_break = group.pick_plurality_winner()
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        await group.start_new_round(
+            winner_id,
+            announcement=f"⚡ **ADMIN OVERRIDE:** Forcing round completion. Winner: {mention(winner_id)}\n\n",
+            tie_break=tie_break
+        )
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            # Find candidate with most votes or pick randomly if tie
-            vote_counts = {}
-            for candidate_id in group.votes.values():
-                vote_counts[candidate_id] = vote_counts.get(candidate_id, 0) + 1
-            
-            if vote_counts:
-                max_votes = max(vote_counts.values())
-                winners = [cid for cid, count in vote_counts.items() if count == max_votes]
-                winner_id = winners[0] if len(winners) == 1 else random.choice(winners)
-                winner = discord.utils.get(group.active_candidates, id=winner_id)
-            else:
-                # No votes cast, pick random candidate
-                winner = random.choice(group.active_candidates)
-            
-            await group.thread.send(f"⚡ **ADMIN OVERRIDE:** Forcing round completion. Winner: {winner.mention}")
-            await group.start_new_round(winner)
-            
-            await interaction.followup.send(f"✅ Forced round completion in {group.thread.mention}. Winner: {winner.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error forcing round: {str(e)}", ephemeral=True)
+        await interaction.followup.send(f"✅ Forced round completion in {group.thread.mention}. Winner: {mention(winner_id)}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_reset_votes",
-        description="[ADMIN] Clear all votes in current round"
-    )
+    @admin.command(name="reset_votes", description="Clear all votes in current round")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_reset_votes(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("resetting votes", group='required')
+    async def admin_reset_votes(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to reset votes in current round"""
-        await interaction.response.defer(ephemeral=True)
+        old_vote_count = len(group.votes)
+        group.record(events.VOTES_RESET)
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        await group.thread.send(f"⚡ **ADMIN RESET:** All votes cleared. Voting restarted for Level {group.current_level}.")
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            old_vote_count = len(group.votes)
-            group.votes = {}
-            
-            await group.thread.send(f"⚡ **ADMIN RESET:** All votes cleared. Voting restarted for Level {group.current_level}.")
-            
-            await interaction.followup.send(f"✅ Reset {old_vote_count} votes in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error resetting votes: {str(e)}", ephemeral=True)
+        await interaction.followup.send(f"✅ Reset {old_vote_count} votes in {group.thread.mention}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_declare_winner",
-        description="[ADMIN] Manually declare a round winner"
-    )
+    @admin.command(name="declare_winner", description="Manually declare a round winner")
     @app_commands.describe(thread_id="ID of the fractal thread", user="User to declare as winner")
-    async def admin_declare_winner(self, interaction: discord.Interaction, thread_id: str, user: discord.Member):
+    @admin_command("declaring winner", group='required')
+    async def admin_declare_winner(self, interaction: discord.Interaction, group: FractalGroup, user: discord.Member):
         """Admin command to manually declare a winner"""
-        await interaction.response.defer(ephemeral=True)
+        if user.id not in group.state.candidate_ids:
+            raise AdminError(f"{user.mention} is not an active candidate in this fractal.")
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        await group.start_new_round(
+            user.id,
+            announcement=f"⚡ **ADMIN DECLARATION:** {user.mention} declared winner of Level {group.current_level}!\n\n"
+        )
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            if user not in group.active_candidates:
-                await interaction.followup.send(f"❌ {user.mention} is not an active candidate in this fractal.", ephemeral=True)
-                return
-            
-            await group.thread.send(f"⚡ **ADMIN DECLARATION:** {user.mention} declared winner of Level {group.current_level}!")
-            await group.start_new_round(user)
-            
-            await interaction.followup.send(f"✅ Declared {user.mention} as winner in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error declaring winner: {str(e)}", ephemeral=True)
+        await interaction.followup.send(f"✅ Declared {user.mention} as winner in {group.thread.mention}", ephemeral=True)
     
     # Member Management Commands
-    @app_commands.command(
-        name="admin_add_member",
-        description="[ADMIN] Add someone to an active fractal"
-    )
+    @admin.command(name="add_member", description="Add someone to an active fractal")
     @app_commands.describe(thread_id="ID of the fractal thread", user="User to add to the fractal")
-    async def admin_add_member(self, interaction: discord.Interaction, thread_id: str, user: discord.Member):
+    @admin_command("adding member", group='required')
+    async def admin_add_member(self, interaction: discord.Interaction, group: FractalGroup, user: discord.Member):
         """Admin command to add member to active fractal"""
-        await interaction.response.defer(ephemeral=True)
+        if user.id in group.state.member_ids:
+            raise AdminError(f"{user.mention} is already in this fractal.")
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        # Add to members and active candidates
+        group.record(events.MEMBER_ADDED, user_id=user.id, name=user.display_name)
         
+        # Add to thread
         try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            if user in group.members:
-                await interaction.followup.send(f"❌ {user.mention} is already in this fractal.", ephemeral=True)
-                return
-            
-            # Add to members and active candidates
-            group.members.append(user)
-            group.active_candidates.append(user)
-            
-            # Add to thread
-            try:
-                await group.thread.add_user(user)
-            except discord.HTTPException:
-                pass
-            
-            await group.thread.send(f"⚡ **ADMIN ADD:** {user.mention} has been added to the fractal!")
-            
-            await interaction.followup.send(f"✅ Added {user.mention} to {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error adding member: {str(e)}", ephemeral=True)
+            await group.thread.add_user(user)
+        except discord.HTTPException:
+            pass
+        
+        await group.thread.send(f"⚡ **ADMIN ADD:** {user.mention} has been added to the fractal!")
+        
+        await interaction.followup.send(f"✅ Added {user.mention} to {group.thread.mention}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_remove_member",
-        description="[ADMIN] Remove someone from active fractal"
-    )
+    @admin.command(name="remove_member", description="Remove someone from active fractal")
     @app_commands.describe(thread_id="ID of the fractal thread", user="User to remove from the fractal")
-    async def admin_remove_member(self, interaction: discord.Interaction, thread_id: str, user: discord.Member):
+    @admin_command("removing member", group='required')
+    async def admin_remove_member(self, interaction: discord.Interaction, group: FractalGroup, user: discord.Member):
         """Admin command to remove member from active fractal"""
-        await interaction.response.defer(ephemeral=True)
+        if user.id not in group.state.member_ids:
+            raise AdminError(f"{user.mention} is not in this fractal.")
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        # Remove from members and active candidates, along with their vote and votes for them
+        group.remove_member(user.id)
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            if user not in group.members:
-                await interaction.followup.send(f"❌ {user.mention} is not in this fractal.", ephemeral=True)
-                return
-            
-            # Remove from members and active candidates
-            if user in group.members:
-                group.members.remove(user)
-            if user in group.active_candidates:
-                group.active_candidates.remove(user)
-            
-            # Remove their vote if they had one
-            if user.id in group.votes:
-                del group.votes[user.id]
-            
-            await group.thread.send(f"⚡ **ADMIN REMOVE:** {user.mention} has been removed from the fractal.")
-            
-            await interaction.followup.send(f"✅ Removed {user.mention} from {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error removing member: {str(e)}", ephemeral=True)
+        await group.thread.send(f"⚡ **ADMIN REMOVE:** {user.mention} has been removed from the fractal.")
+        
+        await interaction.followup.send(f"✅ Removed {user.mention} from {group.thread.mention}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_change_facilitator",
-        description="[ADMIN] Transfer facilitator role to another member"
-    )
+    @admin.command(name="change_facilitator", description="Transfer facilitator role to another member")
     @app_commands.describe(thread_id="ID of the fractal thread", user="New facilitator")
-    async def admin_change_facilitator(self, interaction: discord.Interaction, thread_id: str, user: discord.Member):
+    @admin_command("changing facilitator", group='required')
+    async def admin_change_facilitator(self, interaction: discord.Interaction, group: FractalGroup, user: discord.Member):
         """Admin command to change facilitator"""
-        await interaction.response.defer(ephemeral=True)
+        old_facilitator = mention(group.state.facilitator_id)
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        if user.id not in group.state.member_ids:
+            raise AdminError(f"{user.mention} must be a member of the fractal to become facilitator.")
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            old_facilitator = group.facilitator
-            
-            if user not in group.members:
-                await interaction.followup.send(f"❌ {user.mention} must be a member of the fractal to become facilitator.", ephemeral=True)
-                return
-            
-            group.facilitator = user
-            
-            await group.thread.send(f"⚡ **FACILITATOR CHANGE:** {old_facilitator.mention} → {user.mention}")
-            
-            await interaction.followup.send(f"✅ Changed facilitator from {old_facilitator.mention} to {user.mention} in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error changing facilitator: {str(e)}", ephemeral=True)
+        group.record(events.FACILITATOR_CHANGED, user_id=user.id)
+        
+        await group.thread.send(f"⚡ **FACILITATOR CHANGE:** {old_facilitator} → {user.mention}")
+        
+        await interaction.followup.send(f"✅ Changed facilitator from {old_facilitator} to {user.mention} in {group.thread.mention}", ephemeral=True)
     
     # Group Control Commands
-    @app_commands.command(
-        name="admin_pause_fractal",
-        description="[ADMIN] Temporarily pause voting in a fractal"
-    )
+    @admin.command(name="pause_fractal", description="Temporarily pause voting in a fractal")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_pause_fractal(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("pausing fractal", group='required')
+    async def admin_pause_fractal(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to pause fractal voting"""
-        await interaction.response.defer(ephemeral=True)
+        if group.paused:
+            raise AdminError("Fractal is already paused.")
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        group.record(events.PAUSED)
+        group.cancel_timers()
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            # Add paused flag to group
-            if not hasattr(group, 'paused'):
-                group.paused = False
-            
-            if group.paused:
-                await interaction.followup.send("❌ Fractal is already paused.", ephemeral=True)
-                return
-            
-            group.paused = True
-            
-            await group.thread.send("⏸️ **FRACTAL PAUSED** by admin. Voting is temporarily suspended.")
-            
-            await interaction.followup.send(f"✅ Paused fractal in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error pausing fractal: {str(e)}", ephemeral=True)
+        await group.thread.send("⏸️ **FRACTAL PAUSED** by admin. Voting is temporarily suspended.")
+        
+        await interaction.followup.send(f"✅ Paused fractal in {group.thread.mention}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_resume_fractal",
-        description="[ADMIN] Resume paused fractal voting"
-    )
+    @admin.command(name="resume_fractal", description="Resume paused fractal voting")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_resume_fractal(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("resuming fractal", group='required')
+    async def admin_resume_fractal(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to resume paused fractal"""
-        await interaction.response.defer(ephemeral=True)
+        if not group.paused:
+            raise AdminError("Fractal is not paused.")
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        group.record(events.RESUMED)
+        group.schedule_timers()  # Resumed rounds get a fresh deadline
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            if not hasattr(group, 'paused') or not group.paused:
-                await interaction.followup.send("❌ Fractal is not paused.", ephemeral=True)
-                return
-            
-            group.paused = False
-            
-            await group.thread.send("▶️ **FRACTAL RESUMED** by admin. Voting continues!")
-            
-            await interaction.followup.send(f"✅ Resumed fractal in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error resuming fractal: {str(e)}", ephemeral=True)
+        await group.thread.send("▶️ **FRACTAL RESUMED** by admin. Voting continues!")
+        
+        await interaction.followup.send(f"✅ Resumed fractal in {group.thread.mention}", ephemeral=True)
     
-    @app_commands.command(
-        name="admin_restart_fractal",
-        description="[ADMIN] Restart fractal from beginning with same members"
-    )
+    @admin.command(name="restart_fractal", description="Restart fractal from beginning with same members")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_restart_fractal(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("restarting fractal", group='required')
+    async def admin_restart_fractal(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to restart fractal from beginning"""
-        await interaction.response.defer(ephemeral=True)
+        # Reset fractal state
+        starting_level = group.settings.starting_level
+        group.record(events.RESTARTED, level=starting_level)
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        # Start new round
+        await group.start_new_round(announcement=f"🔄 **FRACTAL RESTARTED** by admin. Starting fresh from Level {starting_level}!")
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            # Reset fractal state
-            group.current_level = 6
-            group.votes = {}
-            group.winners = {}
-            group.active_candidates = group.members.copy()
-            if hasattr(group, 'paused'):
-                group.paused = False
-            
-            await group.thread.send("🔄 **FRACTAL RESTARTED** by admin. Starting fresh from Level 6!")
-            
-            # Start new round
-            await group.start_new_round()
-            
-            await interaction.followup.send(f"✅ Restarted fractal in {group.thread.mention}", ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error restarting fractal: {str(e)}", ephemeral=True)
+        await interaction.followup.send(f"✅ Restarted fractal in {group.thread.mention}", ephemeral=True)
     
     # Advanced Monitoring Commands
-    @app_commands.command(
-        name="admin_fractal_stats",
-        description="[ADMIN] Detailed stats for a specific fractal group"
-    )
+    @admin.command(name="fractal_stats", description="Detailed stats for a specific fractal group")
     @app_commands.describe(thread_id="ID of the fractal thread")
-    async def admin_fractal_stats(self, interaction: discord.Interaction, thread_id: str):
+    @admin_command("getting fractal stats", group='required')
+    async def admin_fractal_stats(self, interaction: discord.Interaction, group: FractalGroup):
         """Admin command to get detailed fractal stats"""
-        await interaction.response.defer(ephemeral=True)
+        await interaction.followup.send(group.fragments.stats(), ephemeral=True)
+    
+    @admin.command(name="server_stats", description="Overall server fractal statistics")
+    @admin_command("getting server stats")
+    async def admin_server_stats(self, interaction: discord.Interaction):
+        """Admin command to get server-wide fractal stats"""
+        guild_id = interaction.guild.id
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
+        # Count active fractals for this server
+        server_fractals = [group for group in self.active_groups.values() if group.state.guild_id == guild_id]
+        
+        total_active = len(server_fractals)
+        total_participants = sum(len(group.state.member_ids) for group in server_fractals)
+        total_votes_cast = sum(len(group.votes) for group in server_fractals)
+        
+        # Daily counter stats
+        today = datetime.now().strftime("%b %d, %Y")
+        daily_count = 0
+        if guild_id in self.daily_counters and today in self.daily_counters[guild_id]:
+            daily_count = self.daily_counters[guild_id][today]
+        
+        stats = "# 📈 **Server Fractal Statistics**\n\n"
+        stats += f"**Server:** {interaction.guild.name}\n"
+        stats += f"**Active Fractals:** {total_active}\n"
+        stats += f"**Total Participants:** {total_participants}\n"
+        stats += f"**Total Votes Cast:** {total_votes_cast}\n"
+        stats += f"**Groups Created Today:** {daily_count}\n\n"
+        
+        if not server_fractals:
+            await interaction.followup.send(stats + "No active fractals currently running.\n", ephemeral=True)
             return
         
-        try:
-            thread_id_int = int(thread_id)
-            if thread_id_int not in self.active_groups:
-                await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                return
-            
-            group = self.active_groups[thread_id_int]
-            
-            # Calculate detailed stats
-            total_members = len(group.members)
-            active_candidates = len(group.active_candidates)
-            votes_cast = len(group.votes)
-            vote_percentage = (votes_cast / total_members * 100) if total_members > 0 else 0
-            
-            # Vote distribution
-            vote_counts = {}
-            for candidate_id in group.votes.values():
-                candidate = discord.utils.get(group.active_candidates, id=candidate_id)
-                if candidate:
-                    vote_counts[candidate.display_name] = vote_counts.get(candidate.display_name, 0) + 1
-            
-            stats = f"# 📊 **Detailed Fractal Stats**\n\n"
-            stats += f"**Thread:** {group.thread.mention}\n"
-            stats += f"**Facilitator:** {group.facilitator.mention}\n"
-            stats += f"**Current Level:** {group.current_level}\n"
-            stats += f"**Status:** {'⏸️ Paused' if hasattr(group, 'paused') and group.paused else '▶️ Active'}\n\n"
-            
-            stats += f"**Members:** {total_members}\n"
-            stats += f"**Active Candidates:** {active_candidates}\n"
-            stats += f"**Votes Cast:** {votes_cast}/{total_members} ({vote_percentage:.1f}%)\n"
-            stats += f"**Votes Needed to Win:** {group.get_vote_threshold()}\n\n"
-            
-            if vote_counts:
-                stats += "**Current Vote Distribution:**\n"
-                for candidate, count in sorted(vote_counts.items(), key=lambda x: x[1], reverse=True):
-                    stats += f"• {candidate}: {count} votes\n"
-                stats += "\n"
-            
-            if group.winners:
-                stats += "**Winners So Far:**\n"
-                for level in sorted(group.winners.keys(), reverse=True):
-                    winner = group.winners[level]
-                    stats += f"• Level {level}: {winner.display_name}\n"
-            
-            await interaction.followup.send(stats, ephemeral=True)
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error getting fractal stats: {str(e)}", ephemeral=True)
+        view = GroupListView(
+            self, "Active Groups", GroupQuery(guild_id=guild_id), self._render_server_line,
+            interaction.user.id, page_size=15, header=stats
+        )
+        await view.send(interaction)
     
-    @app_commands.command(
-        name="admin_server_stats",
-        description="[ADMIN] Overall server fractal statistics"
+    @admin.command(name="cache_stats", description="Report cached Discord objects and process memory")
+    @admin_command("getting cache stats")
+    async def admin_cache_stats(self, interaction: discord.Interaction):
+        """Admin command to show what the client is caching and the resulting RSS"""
+        stats = cache_stats(self.bot)
+        coverage = stats['members'] / stats['member_count'] * 100 if stats['member_count'] else 0
+        
+        report = "# 🧠 **Cache Statistics**\n\n"
+        report += f"**Intents:** message content {'on' if self.bot.intents.message_content else 'off'}, "
+        report += f"members {'on' if self.bot.intents.members else 'off'}\n"
+        report += f"**Guilds:** {stats['guilds']}\n"
+        report += f"**Channels:** {stats['channels']} (+{stats['threads']} threads)\n"
+        report += f"**Cached Members:** {stats['members']} of {stats['member_count']} ({coverage:.1f}%)\n"
+        report += f"**Cached Users:** {stats['users']}\n"
+        report += f"**Cached Messages:** {stats['messages']}\n"
+        report += f"**Active Fractals:** {len(self.active_groups)}\n"
+        report += f"**Process RSS:** {stats['rss_mb']:.1f} MB\n"
+        
+        await interaction.followup.send(report, ephemeral=True)
+    
+    @admin.command(name="command_stats", description="Admin command usage and latency, and suppressed duplicate interactions")
+    @admin_command("getting command stats")
+    async def admin_command_stats(self, interaction: discord.Interaction):
+        """Admin command to show per-command latency percentiles and duplicate-suppression counters"""
+        rows = self.admin_metrics.summary()
+        
+        parts = ["# ⏱️ **Admin Command Stats**\n\n"]
+        if not rows:
+            parts.append("No admin commands recorded yet.\n")
+        for row in rows:
+            parts.append(
+                f"• `{row['command']}`: {row['calls']} calls"
+                + (f", {row['errors']} errors" if row['errors'] else "")
+                + (f", {row['denied']} denied" if row['denied'] else "")
+                + f" - p50 {row['p50_ms']:.0f}ms, p95 {row['p95_ms']:.0f}ms, max {row['max_ms']:.0f}ms\n"
+            )
+        
+        counters = self.dedup.counters
+        parts.append(
+            f"\n**Suppressed Duplicates:** {self.dedup.suppressed} "
+            f"({counters['duplicate_interaction']} redelivered interactions, {counters['repeat_vote']} repeat votes, "
+            f"{counters['in_flight_vote']} double-clicked votes, {counters['repeat_start']} repeat starts)\n"
+        )
+        
+        await send_chunked(interaction.followup.send, parts, ephemeral=True)
+    
+    @admin.command(name="reload", description="Reload the fractal code without ending active fractals")
+    @admin_command("reloading the fractal cog")
+    async def admin_reload(self, interaction: discord.Interaction):
+        """Admin command to hot-reload the fractal cog, handing live groups to the new instance"""
+        count = len(self.active_groups)
+        started_at = time.perf_counter()
+        await self.bot.reload_extension('cogs.fractal')
+        
+        await interaction.followup.send(
+            f"✅ Reloaded the fractal cog in {(time.perf_counter() - started_at) * 1000:.0f}ms and handed over {count} active groups.",
+            ephemeral=True
+        )
+    
+    @staticmethod
+    def _render_settings(guild: discord.Guild, settings: GuildSettings) -> str:
+        def timer(seconds: int) -> str:
+            return f"{seconds // 60}m {seconds % 60}s" if seconds % 60 else f"{seconds // 60} min" if seconds else "off"
+        
+        results_channel = f"<#{settings.results_channel_id}>" if settings.results_channel_id else "not set"
+        text = f"# ⚙️ **Fractal Settings for {guild.name}**\n\n"
+        text += f"**Group Size:** {settings.min_group_members}-{settings.max_group_members} members\n"
+        text += f"**Starting Level:** {settings.starting_level}\n"
+        text += f"**Results Announced In:** {ANNOUNCE_MODES[settings.announce_mode]}\n"
+        text += f"**Results Channel:** {results_channel}\n"
+        text += f"**Round Timeout:** {timer(settings.round_timeout_seconds)}\n"
+        text += f"**Vote Reminder:** {timer(settings.round_reminder_seconds)}\n"
+        return text
+    
+    @admin.command(name="settings", description="Show or change this server's fractal settings")
+    @app_commands.describe(
+        min_members="Fewest voice members needed to start a group",
+        max_members="Most voice members allowed in a group",
+        starting_level="Level the first round votes for",
+        announce_mode="Where finished fractals' results are posted",
+        results_channel="Channel to post results in (switches the announcement mode to it)",
+        round_timeout_minutes="Minutes before a round is decided by plurality (0 disables)",
+        reminder_minutes="Minutes before members who haven't voted are reminded (0 disables)"
     )
-    async def admin_server_stats(self, interaction: discord.Interaction):
-        """Admin command to get server-wide fractal stats"""
-        await interaction.response.defer(ephemeral=True)
+    @app_commands.choices(announce_mode=[app_commands.Choice(name=label, value=mode) for mode, label in ANNOUNCE_MODES.items()])
+    @admin_command("updating settings")
+    async def admin_settings(self, interaction: discord.Interaction, min_members: int = None, max_members: int = None,
+                             starting_level: int = None, announce_mode: str = None,
+                             results_channel: discord.TextChannel = None, round_timeout_minutes: int = None,
+                             reminder_minutes: int = None):
+        """Admin command to view and edit per-server settings"""
+        changes = {}
+        if min_members is not None:
+            changes['min_group_members'] = min_members
+        if max_members is not None:
+            changes['max_group_members'] = max_members
+        if starting_level is not None:
+            changes['starting_level'] = starting_level
+        if results_channel is not None:
+            changes['results_channel_id'] = results_channel.id
+            changes['announce_mode'] = ANNOUNCE_CHANNEL
+        if announce_mode is not None:
+            changes['announce_mode'] = announce_mode
+        if round_timeout_minutes is not None:
+            changes['round_timeout_seconds'] = round_timeout_minutes * 60
+        if reminder_minutes is not None:
+            changes['round_reminder_seconds'] = reminder_minutes * 60
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
+        if not changes:
+            await interaction.followup.send(self._render_settings(interaction.guild, self.settings.get(interaction.guild.id)), ephemeral=True)
             return
         
+        settings = self._save_settings(self.settings.update, interaction.guild.id, **changes)
+        
+        self.logger.info(f"{interaction.user} changed fractal settings in {interaction.guild.name}: {changes}")
+        await interaction.followup.send(
+            "✅ Settings updated. They apply to fractals started from now on.\n\n" + self._render_settings(interaction.guild, settings),
+            ephemeral=True
+        )
+    
+    @admin.command(name="reset_settings", description="Restore this server's fractal settings to the defaults")
+    @app_commands.describe(setting="Setting to reset (all if not specified)")
+    @app_commands.choices(setting=[app_commands.Choice(name=name.replace('_', ' '), value=name) for name in FIELD_NAMES])
+    @admin_command("resetting settings")
+    async def admin_reset_settings(self, interaction: discord.Interaction, setting: str = None):
+        """Admin command to reset per-server settings"""
+        settings = self._save_settings(self.settings.reset, interaction.guild.id, setting)
+        
+        reset = f"`{setting}`" if setting else "All settings"
+        await interaction.followup.send(
+            f"✅ {reset} reset to the default.\n\n" + self._render_settings(interaction.guild, settings),
+            ephemeral=True
+        )
+    
+    def _save_settings(self, change, guild_id: int, *args, **kwargs) -> GuildSettings:
+        """Apply a settings store change, turning its failures into admin-facing errors"""
         try:
-            guild_id = interaction.guild.id
-            
-            # Count active fractals for this server
-            server_fractals = [group for group in self.active_groups.values() if group.thread.guild.id == guild_id]
-            
-            total_active = len(server_fractals)
-            total_participants = sum(len(group.members) for group in server_fractals)
-            total_votes_cast = sum(len(group.votes) for group in server_fractals)
-            
-            # Daily counter stats
-            today = datetime.now().strftime("%b %d, %Y")
-            daily_count = 0
-            if guild_id in self.daily_counters and today in self.daily_counters[guild_id]:
-                daily_count = self.daily_counters[guild_id][today]
-            
-            stats = f"# 📈 **Server Fractal Statistics**\n\n"
-            stats += f"**Server:** {interaction.guild.name}\n"
-            stats += f"**Active Fractals:** {total_active}\n"
-            stats += f"**Total Participants:** {total_participants}\n"
-            stats += f"**Total Votes Cast:** {total_votes_cast}\n"
-            stats += f"**Groups Created Today:** {daily_count}\n\n"
-            
-            if server_fractals:
-                stats += "**Active Groups:**\n"
-                for group in server_fractals:
-                    status = "⏸️ Paused" if hasattr(group, 'paused') and group.paused else "▶️ Active"
-                    stats += f"• {group.thread.name} - Level {group.current_level} ({status})\n"
-            else:
-                stats += "No active fractals currently running.\n"
-            
-            await interaction.followup.send(stats, ephemeral=True)
-            
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error getting server stats: {str(e)}", ephemeral=True)
+            return change(guild_id, *args, **kwargs)
+        except ValueError as e:
+            raise AdminError(str(e))
+        except OSError as e:
+            self.logger.error(f"Failed to save settings for guild {guild_id}: {e}")
+            raise AdminError("Couldn't save settings. Please try again.")
     
-    @app_commands.command(
-        name="admin_export_data",
-        description="[ADMIN] Export fractal data for analysis"
-    )
+    @admin.command(name="export_data", description="Export fractal data for analysis")
     @app_commands.describe(thread_id="ID of the fractal thread (optional - exports all if not specified)")
-    async def admin_export_data(self, interaction: discord.Interaction, thread_id: str = None):
+    @admin_command("exporting data", group='optional')
+    async def admin_export_data(self, interaction: discord.Interaction, group: FractalGroup = None):
         """Admin command to export fractal data"""
-        await interaction.response.defer(ephemeral=True)
+        export_data = {
+            "export_timestamp": datetime.now().isoformat(),
+            "server_id": interaction.guild.id,
+            "server_name": interaction.guild.name,
+            "fractals": []
+        }
         
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send("❌ You need administrator permissions to use this command.", ephemeral=True)
-            return
+        if group:
+            # Export specific fractal
+            groups_to_export = [group]
+        else:
+            # Export all fractals for this server
+            groups_to_export = [group for group in self.active_groups.values() if group.state.guild_id == interaction.guild.id]
         
-        try:
-            import json
-            from datetime import datetime
-            
-            export_data = {
-                "export_timestamp": datetime.now().isoformat(),
-                "server_id": interaction.guild.id,
-                "server_name": interaction.guild.name,
-                "fractals": []
+        for group in groups_to_export:
+            state = group.state
+            fractal_data = {
+                "thread_id": state.thread_id,
+                "thread_name": state.name,
+                "facilitator": {
+                    "id": state.facilitator_id,
+                    "name": state.display_name(state.facilitator_id)
+                },
+                "current_level": state.level,
+                "paused": state.paused,
+                "members": [{"id": m, "name": state.display_name(m)} for m in state.member_ids],
+                "active_candidates": [{"id": m, "name": state.display_name(m)} for m in state.candidate_ids],
+                "votes": {str(voter_id): candidate_id for voter_id, candidate_id in state.votes.items()},
+                "winners": {str(level): {"id": winner_id, "name": state.display_name(winner_id)} for level, winner_id in state.winners.items()},
+                "vote_history": [list(event) for event in state.vote_history]
             }
-            
-            if thread_id:
-                # Export specific fractal
-                thread_id_int = int(thread_id)
-                if thread_id_int not in self.active_groups:
-                    await interaction.followup.send("❌ No active fractal found with that thread ID.", ephemeral=True)
-                    return
-                groups_to_export = [self.active_groups[thread_id_int]]
-            else:
-                # Export all fractals for this server
-                groups_to_export = [group for group in self.active_groups.values() if group.thread.guild.id == interaction.guild.id]
-            
-            for group in groups_to_export:
-                fractal_data = {
-                    "thread_id": group.thread.id,
-                    "thread_name": group.thread.name,
-                    "facilitator": {
-                        "id": group.facilitator.id,
-                        "name": group.facilitator.display_name
-                    },
-                    "current_level": group.current_level,
-                    "paused": hasattr(group, 'paused') and group.paused,
-                    "members": [{"id": m.id, "name": m.display_name} for m in group.members],
-                    "active_candidates": [{"id": m.id, "name": m.display_name} for m in group.active_candidates],
-                    "votes": {str(voter_id): candidate_id for voter_id, candidate_id in group.votes.items()},
-                    "winners": {str(level): {"id": winner.id, "name": winner.display_name} for level, winner in group.winners.items()}
-                }
-                export_data["fractals"].append(fractal_data)
-            
-            # Create JSON file content
-            json_content = json.dumps(export_data, indent=2)
-            
-            # Create file and send
-            import io
-            file_buffer = io.StringIO(json_content)
-            file = discord.File(file_buffer, filename=f"fractal_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-            
-            await interaction.followup.send(
-                f"📁 **Data Export Complete**\n"
-                f"Exported {len(export_data['fractals'])} fractal(s) from {interaction.guild.name}",
-                file=file,
-                ephemeral=True
-            )
-            
-        except ValueError:
-            await interaction.followup.send("❌ Invalid thread ID format.", ephemeral=True)
-        except Exception as e:
-            await interaction.followup.send(f"❌ Error exporting data: {str(e)}", ephemeral=True)
+            export_data["fractals"].append(fractal_data)
+        
+        # Vectorized analytics over this server's voting history
+        export_data["analytics"] = self._get_vote_history(interaction.guild.id).summary()
+        
+        # Create JSON file content
+        json_content = json.dumps(export_data, indent=2)
+        
+        # Create file and send
+        file_buffer = io.StringIO(json_content)
+        file = discord.File(file_buffer, filename=f"fractal_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        
+        await interaction.followup.send(
+            f"📁 **Data Export Complete**\n"
+            f"Exported {len(export_data['fractals'])} fractal(s) from {interaction.guild.name}",
+            file=file,
+            ephemeral=True
+        )
+    
+    @admin.command(name="vote_analytics", description="Voting analytics across this server's fractal history")
+    @admin_command("computing analytics")
+    async def admin_vote_analytics(self, interaction: discord.Interaction):
+        """Admin command to show affinity, consensus and win-rate analytics"""
+        summary = self._get_vote_history(interaction.guild.id).summary()
+        
+        if not summary['vote_events']:
+            raise AdminError("No voting history recorded yet.")
+        
+        speed = summary['consensus_speed']
+        stats = "# 🧮 **Voting Analytics**\n\n"
+        stats += f"**Fractals:** {summary['fractals']}\n"
+        stats += f"**Rounds Completed:** {summary['rounds']}\n"
+        stats += f"**Vote Events:** {summary['vote_events']}\n"
+        stats += f"**Vote Change Rate:** {summary['vote_change_rate'] * 100:.1f}%\n"
+        if speed['mean'] is not None:
+            stats += f"**Consensus Speed:** {speed['mean']:.2f} votes/member (median {speed['median']:.2f})\n"
+        stats += "\n"
+        
+        if summary['top_affinities']:
+            stats += "**Who Votes for Whom Most:**\n"
+            for pair in summary['top_affinities']:
+                stats += f"• <@{pair['voter_id']}> → <@{pair['candidate_id']}>: {pair['count']} votes\n"
+            stats += "\n"
+        
+        if summary['top_win_rates']:
+            stats += "**Top Win Rates:**\n"
+            for member in summary['top_win_rates']:
+                stats += (
+                    f"• <@{member['member_id']}>: {member['fractal_win_rate'] * 100:.0f}% fractals won, "
+                    f"{member['round_win_rate']:.2f} rounds/fractal ({member['participations']} fractals)\n"
+                )
+        
+        await interaction.followup.send(stats, ephemeral=True)
@@ -0,0 +1,67 @@
+"""
+Suppression of redelivered interactions and repeated vote clicks
+"""
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# Counter names
+DUPLICATE_INTERACTION = 'duplicate_interaction'   # Same interaction id delivered again
+REPEAT_VOTE = 'repeat_vote'                       # Vote for the candidate the voter already has this round
+IN_FLIGHT_VOTE = 'in_flight_vote'                 # Same vote clicked again while the first is still processing
+REPEAT_START = 'repeat_start'                     # Start Fractal clicked again while the group is being created
+
+
+class InteractionDeduper:
+    """Cheap in-memory checks run before an interaction does any network I/O
+
+    Interaction ids are remembered in a bounded LRU so a redelivered
+    interaction is dropped silently. Votes are keyed by (thread, voter):
+    one that matches a vote still being processed, or the vote already
+    recorded for the current level, changes nothing and is answered
+    without deferring, announcing or notifying the web app.
+    """
+
+    def __init__(self, capacity: int = 2048):
+        self.capacity = capacity
+        self._seen: OrderedDict = OrderedDict()  # interaction_id -> None, oldest first
+        self._pending: Dict[Tuple[int, int], Tuple[int, int]] = {}  # (thread_id, voter_id) -> (level, candidate_id)
+        self.counters: Dict[str, int] = {DUPLICATE_INTERACTION: 0, REPEAT_VOTE: 0, IN_FLIGHT_VOTE: 0, REPEAT_START: 0}
+
+    def first_delivery(self, interaction_id: int) -> bool:
+        """Record an interaction id; False if it was already handled"""
+        if interaction_id in self._seen:
+            self._seen.move_to_end(interaction_id)
+            self.counters[DUPLICATE_INTERACTION] += 1
+            return False
+        self._seen[interaction_id] = None
+        if len(self._seen) > self.capacity:
+            self._seen.popitem(last=False)
+        return True
+
+    def claim_vote(self, state, voter_id: int, candidate_id: int) -> bool:
+        """Reserve a vote for processing; False if it would be a no-op
+
+        A successful claim must be released with release_vote() once the
+        vote has been processed (or failed).
+        """
+        key = (state.thread_id, voter_id)
+        if self._pending.get(key) == (state.level, candidate_id):
+            self.counters[IN_FLIGHT_VOTE] += 1
+            return False
+        if key not in self._pending and state.votes.get(voter_id) == candidate_id:
+            self.counters[REPEAT_VOTE] += 1
+            return False
+        self._pending[key] = (state.level, candidate_id)
+        return True
+
+    def release_vote(self, state, voter_id: int, candidate_id: int):
+        key = (state.thread_id, voter_id)
+        if self._pending.get(key, (None, candidate_id))[1] == candidate_id:
+            self._pending.pop(key, None)
+
+    def count(self, name: str):
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    @property
+    def suppressed(self) -> int:
+        return sum(self.counters.values())
@@ -0,0 +1,266 @@
+"""
+Append-only event log for fractal state changes, with snapshots and replay
+"""
+import json
+import logging
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .state import FractalState
+
+# Event kinds
+CREATED = 'created'
+VOTE_CAST = 'vote'
+ROUND_STARTED = 'round_started'
+ROUND_WON = 'round_won'
+VOTES_RESET = 'votes_reset'
+MEMBER_ADDED = 'member_added'
+MEMBER_REMOVED = 'member_removed'
+FACILITATOR_CHANGED = 'facilitator_changed'
+PAUSED = 'paused'
+RESUMED = 'resumed'
+RESTARTED = 'restarted'
+COMPLETED = 'completed'
+REAPED = 'reaped'
+
+TERMINAL_EVENTS = (COMPLETED, REAPED)
+
+
+def state_from_created(thread_id: int, data: Dict, ts: float) -> FractalState:
+    """Build the initial state described by a CREATED event"""
+    state = FractalState.create(
+        thread_id=thread_id,
+        guild_id=data['guild_id'],
+        name=data['name'],
+        facilitator_id=data['facilitator_id'],
+        members={member_id: name for member_id, name in data['members']}
+    )
+    state.level = data.get('level', state.level)
+    state.created_at = state.last_activity = ts
+    return state
+
+
+def apply_event(state: FractalState, kind: str, data: Dict, ts: float):
+    """Apply one event to a state and return the mutation's result
+
+    This is the only place state changes are interpreted, so live groups
+    and replays always agree.
+    """
+    result = None
+    if kind == VOTE_CAST:
+        result = state.cast_vote(data['voter_id'], data['candidate_id'])
+    elif kind == ROUND_WON:
+        state.record_winner(data['winner_id'])
+    elif kind in (ROUND_STARTED, VOTES_RESET):
+        state.start_round()
+    elif kind == MEMBER_ADDED:
+        result = state.add_member(data['user_id'], data['name'])
+    elif kind == MEMBER_REMOVED:
+        result = state.remove_member(data['user_id'])
+    elif kind == FACILITATOR_CHANGED:
+        state.facilitator_id = data['user_id']
+    elif kind == PAUSED:
+        state.paused = True
+    elif kind == RESUMED:
+        state.paused = False
+    elif kind == RESTARTED:
+        state.restart(data['level'])
+    elif kind == COMPLETED:
+        state.finalize()
+    state.last_activity = ts
+    state.version += 1
+    return result
+
+
+class EventLog:
+    """Compact JSON-lines log of every fractal state change
+
+    Each line is ``[seq, ts, thread_id, kind, data]``. Every
+    ``snapshot_every`` events per thread (and when a fractal ends) the
+    full state is written to ``snapshot_dir/<thread_id>.json`` together
+    with the log's byte offset at that point, so a rebuild seeks past
+    everything the snapshot already covers and only replays what follows.
+
+    Opening the log drops a torn final line left by a crash mid-write, so
+    sequence numbers carry on from the last complete event. Tools reading
+    a log the bot may be writing open it with ``read_only=True``.
+    """
+
+    def __init__(self, path: str, snapshot_dir: str, snapshot_every: int = 50, read_only: bool = False):
+        self.path = path
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_every = snapshot_every
+        self.read_only = read_only
+        self.logger = logging.getLogger('bot')
+        self._since_snapshot: Dict[int, int] = {}
+        self._file = None
+
+        if read_only:
+            self.seq, self.offset = self._recover(repair=False)
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self.seq, self.offset = self._recover(repair=True)
+        self._file = open(path, 'ab')
+
+    def _recover(self, repair: bool) -> Tuple[int, int]:
+        """Sequence number and end offset of the last complete event
+
+        Scans backwards from the end of the file a block at a time, so
+        start-up cost doesn't grow with the log. Anything after the last
+        line that parses is a torn write and is truncated when ``repair``
+        is set. If no line parses at all the file is left alone and
+        numbering resumes after the newest snapshot, so sequence numbers
+        are never reused.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return self._snapshot_seq(), 0
+
+        seq, line_end = None, 0
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 1))
+            ends_with_newline = f.read(1) == b'\n'
+            end, tail = size, b''
+            while end > 0 and seq is None:
+                start = max(0, end - 4096)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+                line_end = start + len(tail)
+                # Only whole lines can be judged; keep the partial first line for the next block
+                lines = tail.split(b'\n')
+                first, lines = (lines[0], lines[1:]) if start > 0 else (b'', lines)
+                for line in reversed(lines):
+                    if line.strip():
+                        try:
+                            seq = int(json.loads(line)[0])
+                            break
+                        except (ValueError, TypeError, IndexError, KeyError):
+                            pass
+                    line_end -= len(line) + 1  # Step back over this line and its newline
+                tail = first
+
+        if seq is None:
+            if size:
+                self.logger.error(f"No readable events in {self.path}; continuing after the latest snapshot")
+                if repair and not ends_with_newline:
+                    with open(self.path, 'ab') as f:
+                        f.write(b'\n')
+                    size += 1
+            return self._snapshot_seq(), size
+
+        valid_end = min(line_end + 1, size)
+        if repair and line_end + 1 != size:
+            if valid_end < size:
+                self.logger.warning(f"Truncating {size - valid_end} bytes of incomplete events from {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+                if line_end == valid_end:  # Last event was written without its newline
+                    f.seek(valid_end)
+                    f.write(b'\n')
+                    valid_end += 1
+        return seq, valid_end
+
+    def _snapshot_seq(self) -> int:
+        """Highest sequence number recorded in any snapshot"""
+        seq = 0
+        try:
+            names = os.listdir(self.snapshot_dir)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if name.endswith('.json'):
+                snapshot = self._read_snapshot(os.path.join(self.snapshot_dir, name))
+                if snapshot:
+                    seq = max(seq, snapshot['seq'])
+        return seq
+
+    def append(self, state: FractalState, kind: str, data: Dict, ts: float) -> int:
+        """Write an event that has already been applied to ``state``"""
+        self.seq += 1
+        line = (json.dumps([self.seq, ts, state.thread_id, kind, data], separators=(',', ':')) + '\n').encode('utf-8')
+        self._file.write(line)
+        self._file.flush()
+        self.offset += len(line)
+
+        count = self._since_snapshot.get(state.thread_id, 0) + 1
+        if count >= self.snapshot_every or kind in TERMINAL_EVENTS:
+            self.write_snapshot(state)
+            count = 0
+        if kind in TERMINAL_EVENTS:
+            self._since_snapshot.pop(state.thread_id, None)
+        else:
+            self._since_snapshot[state.thread_id] = count
+        return self.seq
+
+    def write_snapshot(self, state: FractalState):
+        """Persist a full state snapshot tagged with the current sequence number and log offset"""
+        path = os.path.join(self.snapshot_dir, f"{state.thread_id}.json")
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'seq': self.seq, 'offset': self.offset, 'state': state.to_dict()}, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"Failed to write snapshot for thread {state.thread_id}: {e}")
+
+    def flush(self):
+        if self._file and not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+    def read(self, thread_id: Optional[int] = None, after_seq: int = 0, offset: int = 0) -> Iterator[List]:
+        """Iterate logged events, optionally for one thread and after a sequence number
+
+        ``offset`` is a byte position known to fall on a line boundary at
+        or before ``after_seq`` (as stored in snapshots); reading starts
+        there instead of at the top of the file.
+        """
+        self.flush()
+        with open(self.path, 'rb') as f:
+            if 0 < offset <= f.seek(0, os.SEEK_END):
+                f.seek(offset)
+            else:
+                f.seek(0)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Event still being written by another process
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event[0] > after_seq and (thread_id is None or event[2] == thread_id):
+                    yield event
+
+    def load_snapshot(self, thread_id: int) -> Optional[Dict]:
+        return self._read_snapshot(os.path.join(self.snapshot_dir, f"{thread_id}.json"))
+
+    def _read_snapshot(self, path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def rebuild(self, thread_id: int, until_seq: Optional[int] = None, until_ts: Optional[float] = None) -> Optional[FractalState]:
+        """Rebuild a group's state as of a sequence number or timestamp (default: latest)"""
+        state, after_seq, offset = None, 0, 0
+        snapshot = self.load_snapshot(thread_id)
+        if snapshot and (until_seq is None or snapshot['seq'] <= until_seq) and (
+                until_ts is None or snapshot['state']['last_activity'] <= until_ts):
+            state, after_seq = FractalState.from_dict(snapshot['state']), snapshot['seq']
+            offset = snapshot.get('offset', 0)  # Snapshots written before offsets were recorded read from the top
+
+        for seq, ts, _, kind, data in self.read(thread_id, after_seq, offset):
+            if (until_seq is not None and seq > until_seq) or (until_ts is not None and ts > until_ts):
+                break
+            if kind == CREATED:
+                state = state_from_created(thread_id, data, ts)
+            elif state is not None:
+                apply_event(state, kind, data, ts)
+        return state
@@ -1,135 +1,353 @@
 import discord
 import logging
 import asyncio
-import random
-from typing import Optional, List, Dict
-from ...utils.web_integration import web_integration
+import time
+from typing import Optional, List, Dict, Tuple
+from utils.web_integration import web_integration
+from config.config import TIE_BREAK_POLICY
+from .state import FractalState
+from .render import GroupFragments
+from .settings import GuildSettings, ANNOUNCE_AUTO, ANNOUNCE_CHANNEL
+from .tiebreak import TieBreak, FEWEST_WINS, break_tie
+from . import events
+
+def mention(user_id: int) -> str:
+    """Render a user mention from a snowflake without needing the member object"""
+    return f"<@{user_id}>"
 
 class FractalGroup:
-    """Core class for managing a fractal voting group"""
+    """Core class for managing a fractal voting group
+    
+    Voting state lives in a discord-independent FractalState keyed by
+    snowflakes; this class adds the thread and ballot handles needed to
+    talk to Discord and resolves members from the cache only when needed.
+    The guild's settings are captured when the group is created, so later
+    edits apply to new groups and voting never has to look them up.
+    """
+    __slots__ = ('state', 'settings', 'fragments', 'thread', 'cog', 'logger', 'current_voting_message', 'current_view')
     
-    def __init__(self, thread: discord.Thread, members: List[discord.Member], facilitator: discord.Member, cog):
+    def __init__(self, thread: discord.Thread, members: List[discord.Member], facilitator: discord.Member, cog,
+                 state: Optional[FractalState] = None, settings: Optional[GuildSettings] = None):
         """Initialize a new fractal group"""
         self.thread = thread
-        self.facilitator = facilitator
-        self.members = members
-        self.active_candidates = members.copy()  # Members currently in voting pool
-        self.votes = {}  # Dict mapping voter_id to candidate_id
-        self.winners = {}  # Dict mapping level to winner
-        self.current_level = 6  # Start at level 6
         self.current_voting_message = None
+        self.current_view = None
         self.cog = cog
         self.logger = logging.getLogger('bot')
+        if settings is None:
+            store = getattr(cog, 'settings', None)
+            settings = store.get(thread.guild.id) if store else GuildSettings()
+        self.settings = settings
+        self.state = state
+        if self.state is None:
+            created = {
+                'guild_id': thread.guild.id,
+                'name': thread.name,
+                'facilitator_id': facilitator.id,
+                'members': [[m.id, m.display_name] for m in members],
+                'level': settings.starting_level
+            }
+            now = round(time.time(), 3)
+            self.state = events.state_from_created(thread.id, created, now)
+            self._log_event(events.CREATED, created, now)
+        self.fragments = GroupFragments(self.state)
         
-        self.logger.info(f"Created fractal group '{thread.name}' with facilitator {facilitator.display_name} and {len(members)} members")
+        self.logger.info(f"Created fractal group '{thread.name}' with facilitator {self.state.display_name(self.state.facilitator_id)} and {len(self.state.member_ids)} members")
+    
+    @property
+    def current_level(self) -> int:
+        return self.state.level
+    
+    @property
+    def votes(self) -> Dict[int, int]:
+        return self.state.votes
+    
+    @property
+    def paused(self) -> bool:
+        return self.state.paused
+    
+    def record(self, kind: str, **data):
+        """Apply a state change as an event and append it to the event log"""
+        now = round(time.time(), 3)  # Millisecond timestamps, as stored in the log
+        result = events.apply_event(self.state, kind, data, now)
+        self._log_event(kind, data, now)
+        return result
+    
+    def _log_event(self, kind: str, data: Dict, ts: float):
+        seq = None
+        event_log = getattr(self.cog, 'event_log', None)
+        if event_log:
+            try:
+                seq = event_log.append(self.state, kind, data, ts)
+            except OSError as e:
+                self.logger.error(f"Failed to log {kind} event for '{self.state.name}': {e}")
+        
+        # Fan out to live dashboard subscribers
+        stream = getattr(self.cog, 'stream', None)
+        if stream:
+            stream.publish(self.state, kind, data, ts, seq)
+    
+    def get_member(self, user_id: int) -> Optional[discord.Member]:
+        """Resolve a member from the guild cache (None if not cached)"""
+        return self.thread.guild.get_member(user_id)
     
-    async def start_fractal(self):
-        """Start the fractal voting process"""
-        self.logger.info(f"Starting fractal process for '{self.thread.name}' with {len(self.members)} members")
+    async def start_fractal(self, started_at: Optional[float] = None):
+        """Start the fractal voting process
+        
+        The web app notification runs alongside the welcome message and first
+        ballot instead of delaying them. ``started_at`` is the perf_counter
+        time the facilitator confirmed, used to log time-to-first-ballot.
+        """
+        state = self.state
+        started_at = started_at or time.perf_counter()
+        self.logger.info(f"Starting fractal process for '{self.thread.name}' with {len(state.member_ids)} members")
         
         # Send welcome message
         welcome_msg = (
             f"# 🎊 **Welcome to {self.thread.name}!** 🎊\n\n"
-            f"**Facilitator:** {self.facilitator.mention}\n"
-            f"**Members:** {', '.join([m.mention for m in self.members])}\n\n"
+            f"**Facilitator:** {mention(state.facilitator_id)}\n"
+            f"**Members:** {self.fragments.member_mentions()}\n\n"
             f"🗳️ **Starting fractal voting process...**\n"
-            f"We'll vote through levels 6→1 until we have a winner!\n\n"
+            f"We'll vote through levels {state.level}→1 until we have a winner!\n\n"
         )
-        await self.thread.send(welcome_msg)
         
-        # Notify web app that fractal started
-        await web_integration.notify_fractal_started(self)
+        async def open_voting():
+            await self.thread.send(welcome_msg)
+            self.logger.info(f"Starting first round for '{self.thread.name}'")
+            await self.start_new_round()
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            self.logger.info(f"First ballot in '{self.thread.name}' posted {elapsed_ms:.0f}ms after start")
         
-        # Start first round
-        self.logger.info(f"Starting first round for '{self.thread.name}'")
-        await self.start_new_round()
+        # The webhook coroutine is scheduled first so it captures the initial state
+        await asyncio.gather(
+            web_integration.notify_fractal_started(self),
+            open_voting()
+        )
         
     async def add_member(self, member: discord.Member):
         """Add a member to the fractal group"""
-        if member not in self.members:
-            self.members.append(member)
-            self.active_candidates.append(member)
+        if self.record(events.MEMBER_ADDED, user_id=member.id, name=member.display_name):
             await self.thread.add_user(member)
             self.logger.info(f"Added {member.display_name} to fractal group '{self.thread.name}'")
 
-    async def start_new_round(self, winner: Optional[discord.Member] = None):
-        """Start a new voting round, optionally recording a previous winner"""
+    def remove_member(self, user_id: int) -> bool:
+        """Remove a member (and their current vote) from the fractal group"""
+        return self.record(events.MEMBER_REMOVED, user_id=user_id)
+
+    async def start_new_round(self, winner_id: Optional[int] = None, announcement: str = "", tie_break: Optional[TieBreak] = None):
+        """Start a new voting round, optionally recording a previous winner
+        
+        The next ballot is built before anything is sent, so the winner
+        announcement and the new ballot go out as a single message while the
+        previous ballot is disabled concurrently.
+        """
+        transition_started = time.perf_counter()
+        previous_message, previous_view = self.current_voting_message, self.current_view
+        self.release_views()
+        self.cancel_timers()
+        
         # Process previous winner if exists
-        if winner:
-            self.winners[self.current_level] = winner
-            self.active_candidates.remove(winner)  # Remove from active candidates
-            self.current_level -= 1  # Move to next level
+        if winner_id:
+            if tie_break:
+                self.record(events.ROUND_WON, winner_id=winner_id, tie_break=tie_break.to_dict())
+            else:
+                self.record(events.ROUND_WON, winner_id=winner_id)
             
-            # Send prominent winner announcement like the second image
-            await self.thread.send(
-                f"🎊 **LEVEL {self.current_level + 1} WINNER: {winner.mention}!** 🎊\n\n"
+            # Prominent winner announcement like the second image
+            announcement += (
+                f"🎊 **LEVEL {self.current_level + 1} WINNER: {mention(winner_id)}!** 🎊\n\n"
                 f"Moving to Level {self.current_level}..."
             )
         
         # Check if we've reached the end
-        if self.current_level < 1 or len(self.active_candidates) <= 1:
+        if self.state.is_complete():
+            self.current_voting_message = None
+            await asyncio.gather(
+                self._send_announcement(announcement),
+                self._disable_ballot(previous_message, previous_view)
+            )
             await self.end_fractal()
             return
             
         # Reset votes for new round
-        self.votes = {}
+        self.record(events.ROUND_STARTED)
         
         # Log active candidates
-        candidate_names = ", ".join([c.display_name for c in self.active_candidates])
-        self.logger.info(f"Starting level {self.current_level} with {len(self.active_candidates)} candidates: {candidate_names}")
+        candidate_names = ", ".join([self.state.display_name(c) for c in self.state.candidate_ids])
+        self.logger.info(f"Starting level {self.current_level} with {len(self.state.candidate_ids)} candidates: {candidate_names}")
         
         try:
-            # Import here to avoid circular import
-            from .views import ZAOFractalVotingView
-            
-            # Create voting view with buttons
-            view = ZAOFractalVotingView(self)
+            # Build the next ballot up front so sending is the only remaining work
+            voting_message, view = self.build_ballot()
+            if announcement:
+                voting_message = f"{announcement}\n\n{voting_message}"
             
-            # Create beautiful voting message like the second image
-            votes_needed = self.get_vote_threshold()
-            candidates_list = ", ".join([c.mention for c in self.active_candidates])
-            
-            voting_message = (
-                f"🗳️ **Voting for Level {self.current_level}**\n\n"
-                f"**Candidates:** {candidates_list}\n"
-                f"**Votes Needed to Win:** {votes_needed} ({votes_needed}/{len(self.members)} members)\n\n"
-                f"Click a button below to vote. Your vote will be announced publicly.\n"
-                f"You can change your vote at any time by clicking a different button."
+            self.current_view = view
+            message, _ = await asyncio.gather(
+                self.thread.send(voting_message, view=view),
+                self._disable_ballot(previous_message, previous_view)
             )
-            
-            message = await self.thread.send(voting_message, view=view)
             self.current_voting_message = message
+            self.schedule_timers()
+            
+            if winner_id:
+                elapsed_ms = (time.perf_counter() - transition_started) * 1000
+                self.logger.info(f"Round transition to level {self.current_level} in '{self.thread.name}' took {elapsed_ms:.0f}ms")
             
         except Exception as e:
             self.logger.error(f"Error creating voting UI: {e}", exc_info=True)
             await self.thread.send("❌ Error setting up voting buttons. Please try again.")
 
+    def build_ballot(self):
+        """Build the voting message content and button view for the current level"""
+        # Import here to avoid circular import
+        from .views import ZAOFractalVotingView
+        
+        # Create voting view with buttons
+        view = ZAOFractalVotingView(self)
+        return self.fragments.ballot(), view
+
+    async def _send_announcement(self, announcement: str):
+        """Send a standalone announcement if there is one"""
+        if announcement:
+            await self.thread.send(announcement)
+
+    async def _disable_ballot(self, message: Optional[discord.Message], view: Optional[discord.ui.View]):
+        """Edit a finished ballot so its buttons show as disabled"""
+        if not message or not view:
+            return
+        try:
+            for item in view.children:
+                item.disabled = True
+            # The view is already stopped, so editing does not re-register it
+            await message.edit(view=view)
+        except discord.HTTPException as e:
+            self.logger.warning(f"Failed to disable previous ballot in '{self.thread.name}': {e}")
+
+    def release_views(self):
+        """Stop the live ballot view so discord.py drops it from its view store"""
+        if self.current_view:
+            self.current_view.stop()
+            self.current_view = None
+
+    def schedule_timers(self):
+        """Start the current round's deadline and reminder timers"""
+        scheduler = getattr(self.cog, 'round_scheduler', None)
+        timeout = self.settings.round_timeout_seconds
+        if scheduler is None or timeout <= 0:
+            return
+        self.state.round_deadline = time.time() + timeout
+        scheduler.schedule_round(self.state.thread_id, timeout, self.settings.round_reminder_seconds)
+
+    def resume_timers(self):
+        """Re-arm the current round's timers from its saved deadline (after a reload or restart)
+
+        A deadline that passed while the bot was down fires right away.
+        """
+        scheduler = getattr(self.cog, 'round_scheduler', None)
+        deadline = self.state.round_deadline
+        if scheduler is None or deadline is None or self.paused:
+            return
+        now = time.time()
+        reminder = 0
+        if self.settings.round_reminder_seconds:
+            reminder = deadline - self.settings.round_timeout_seconds + self.settings.round_reminder_seconds - now
+        scheduler.schedule_round(self.state.thread_id, max(1.0, deadline - now), max(0.0, reminder))
+
+    def reattach_ballot(self, message_id: Optional[int]):
+        """Serve the ballot already posted in the thread from a fresh view
+
+        The buttons' custom ids only depend on the candidates, so registering
+        a new view for the existing message keeps it working without sending
+        or editing anything.
+        """
+        if message_id is None or self.state.is_complete():
+            return
+        _, view = self.build_ballot()
+        self.cog.bot.add_view(view, message_id=message_id)
+        self.current_view = view
+        self.current_voting_message = self.thread.get_partial_message(message_id)
+        self.resume_timers()
+
+    def cancel_timers(self):
+        """Stop the current round's timers (round ended, paused or group closed)"""
+        self.state.round_deadline = None
+        scheduler = getattr(self.cog, 'round_scheduler', None)
+        if scheduler is not None:
+            scheduler.cancel(self.state.thread_id)
+
+    async def send_reminder(self):
+        """Ping members who haven't voted in the current round yet"""
+        waiting = self.state.non_voters()
+        if not waiting or self.state.round_deadline is None:
+            return
+        minutes_left = max(1, round((self.state.round_deadline - time.time()) / 60))
+        await self.thread.send(
+            f"⏰ **{minutes_left} min left to vote for Level {self.current_level}!** "
+            f"Still waiting on: {', '.join([mention(m) for m in waiting])}"
+        )
+
+    async def resolve_timeout(self):
+        """Close a round whose deadline passed by plurality, using the tie-break policy"""
+        deadline = self.state.round_deadline
+        if self.paused or deadline is None or time.time() < deadline - 1:
+            return  # Timer is stale: round already advanced, paused or rescheduled
+        
+        max_votes, _ = self.state.leaders()
+        winner_id, tie_break = self.pick_plurality_winner()
+        self.logger.info(f"Round timeout for level {self.current_level} in '{self.thread.name}': {self.state.display_name(winner_id)} wins with {max_votes} votes")
+        
+        await asyncio.gather(
+            web_integration.notify_round_complete(self, winner_id),
+            self.start_new_round(
+                winner_id,
+                announcement=f"⏰ **Time's up!** Level {self.current_level} decided by plurality ({max_votes} votes).\n\n",
+                tie_break=tie_break
+            )
+        )
+
+    def pick_plurality_winner(self) -> Tuple[int, Optional[TieBreak]]:
+        """Candidate with the most votes, tie-broken among leaders (or everyone if nobody voted)"""
+        _, leaders = self.state.leaders()
+        leaders = [cid for cid in leaders if cid in self.state.candidate_ids] or list(self.state.candidate_ids)
+        if len(leaders) == 1:
+            return leaders[0], None
+        tie_break = self.break_tie(leaders)
+        return tie_break.winner_id, tie_break
+
+    def break_tie(self, tied: List[int]) -> TieBreak:
+        """Resolve a tie with the configured policy and log the seed for later verification"""
+        state = self.state
+        win_counts = None
+        if TIE_BREAK_POLICY == FEWEST_WINS and hasattr(self.cog, 'get_win_counts'):
+            win_counts = self.cog.get_win_counts(state.guild_id)
+        
+        tie_break = break_tie(tied, state.thread_id, state.level, state.votes, TIE_BREAK_POLICY, state.round_events(), win_counts)
+        self.logger.info(
+            f"Tie at level {state.level} in '{state.name}' between {list(tie_break.tied)} broken by "
+            f"{tie_break.policy}: {state.display_name(tie_break.winner_id)} (seed {tie_break.seed:016x})"
+        )
+        return tie_break
+
     def get_vote_threshold(self):
         """Calculate votes needed to win (50% or more)"""
-        return max(1, len(self.members) // 2 + len(self.members) % 2)  # Ceiling division
+        return self.state.threshold()
 
-    async def process_vote(self, voter: discord.Member, candidate: discord.Member):
+    async def process_vote(self, voter_id: int, candidate_id: int):
         """Process a vote and announce it publicly"""
-        previous_vote = self.votes.get(voter.id)
-        previous_candidate = None
-        
-        if previous_vote:
-            previous_candidate = discord.utils.get(self.active_candidates + [m for m in self.members if m.id in [w.id for w in self.winners.values()]], id=previous_vote)
-        
-        # Update vote
-        self.votes[voter.id] = candidate.id
+        previous_vote = self.record(events.VOTE_CAST, voter_id=voter_id, candidate_id=candidate_id)
         
         # Notify web app of vote
-        await web_integration.notify_vote_cast(self, voter, candidate)
+        await web_integration.notify_vote_cast(self, voter_id, candidate_id)
         
         # Announce vote publicly with green checkmarks like the second image
-        if previous_candidate:
+        if previous_vote:
             await self.thread.send(
-                f"🔄 **Vote Changed:** {voter.mention} changed vote from {previous_candidate.mention} to {candidate.mention}"
+                f"🔄 **Vote Changed:** {mention(voter_id)} changed vote from {mention(previous_vote)} to {mention(candidate_id)}"
             )
         else:
             await self.thread.send(
-                f"✅ **New Vote:** {voter.mention} voted for {candidate.mention}"
+                f"✅ **New Vote:** {mention(voter_id)} voted for {mention(candidate_id)}"
             )
         
         # Check if this vote caused a winner
@@ -137,96 +355,91 @@ class FractalGroup:
 
     async def check_for_winner(self):
         """Check if any candidate has reached the vote threshold"""
-        vote_counts = {}
+        max_votes, winners_with_max_votes = self.state.leaders()
         
-        # Count votes for each candidate
-        for candidate_id in self.votes.values():
-            vote_counts[candidate_id] = vote_counts.get(candidate_id, 0) + 1
-        
-        threshold = self.get_vote_threshold()
-        
-        # Check for a winner
-        max_votes = max(vote_counts.values()) if vote_counts else 0
-        
-        if max_votes >= threshold:
-            # Find all candidates with max votes (for tie-breaking)
-            winners_with_max_votes = [
-                candidate_id for candidate_id, count in vote_counts.items() 
-                if count == max_votes
-            ]
-            
-            # Handle ties with random selection
+        if winners_with_max_votes and max_votes >= self.get_vote_threshold():
+            # Handle ties with the configured, reproducible tie-break policy
+            tie_notice, tie_break = "", None
             if len(winners_with_max_votes) > 1:
-                await self.thread.send(
-                    f"🎲 **Tie detected!** {len(winners_with_max_votes)} candidates tied with {max_votes} votes. Selecting randomly..."
+                tie_break = self.break_tie(winners_with_max_votes)
+                winner_id = tie_break.winner_id
+                tie_notice = (
+                    f"🎲 **Tie detected!** {len(winners_with_max_votes)} candidates tied with {max_votes} votes. "
+                    f"Broken by `{tie_break.policy}` (seed `{tie_break.seed:016x}`).\n\n"
                 )
-                winner_id = random.choice(winners_with_max_votes)
             else:
                 winner_id = winners_with_max_votes[0]
             
-            winner = discord.utils.get(self.active_candidates, id=winner_id)
-            if winner:
+            if winner_id in self.state.candidate_ids:
                 # Log winner info
-                self.logger.info(f"Winner for level {self.current_level}: {winner.display_name} with {max_votes}/{len(self.members)} votes")
-                
-                # Notify web app of round completion
-                await web_integration.notify_round_complete(self, winner)
+                self.logger.info(f"Winner for level {self.current_level}: {self.state.display_name(winner_id)} with {max_votes}/{len(self.state.member_ids)} votes")
                 
-                await self.start_new_round(winner)
+                # Notify web app and advance concurrently; the webhook task is
+                # scheduled first so it captures this round's data before it changes
+                await asyncio.gather(
+                    web_integration.notify_round_complete(self, winner_id),
+                    self.start_new_round(winner_id, announcement=tie_notice, tie_break=tie_break)
+                )
                 return
 
+    def find_results_channel(self) -> Optional[discord.TextChannel]:
+        """Channel for the results summary, per the announcement mode (None to skip)"""
+        guild = self.thread.guild
+        if self.settings.announce_mode == ANNOUNCE_CHANNEL:
+            channel = guild.get_channel(self.settings.results_channel_id)
+            if isinstance(channel, discord.TextChannel):
+                return channel
+            self.logger.warning(f"Results channel {self.settings.results_channel_id} not found in {guild.name}; using a general channel")
+        elif self.settings.announce_mode != ANNOUNCE_AUTO:
+            return None
+        
+        # Find a general channel to post results
+        for channel in guild.channels:
+            if isinstance(channel, discord.TextChannel) and (
+                'general' in channel.name.lower() or 
+                'main' in channel.name.lower() or
+                channel.name.lower() in ['chat', 'lobby']
+            ):
+                return channel
+        
+        # Fallback to first available text channel
+        return next((ch for ch in guild.channels if isinstance(ch, discord.TextChannel)), None)
+
     async def end_fractal(self):
         """End the fractal process and show final results"""
-        # Add final remaining candidate as last place
-        if len(self.active_candidates) == 1:
-            self.winners[self.current_level] = self.active_candidates[0]
+        self.cancel_timers()
         
-        # Create final ranking
-        final_ranking = []
-        for level in sorted(self.winners.keys(), reverse=True):
-            final_ranking.append(self.winners[level])
+        # Close any ballot still open (e.g. when ended by facilitator or admin)
+        if self.current_view:
+            previous_message, previous_view = self.current_voting_message, self.current_view
+            self.release_views()
+            self.current_voting_message = None
+            await self._disable_ballot(previous_message, previous_view)
         
-        # Show results in fractal thread
-        results_text = "# 🏆 **FRACTAL COMPLETE!** 🏆\n\n**Final Rankings:**\n"
-        for i, winner in enumerate(final_ranking, 1):
-            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-            results_text += f"{medal} {winner.mention}\n"
+        # Add final remaining candidate as last place
+        self.record(events.COMPLETED)
         
-        await self.thread.send(results_text)
+        # Show results in fractal thread
+        await self.thread.send(self.fragments.results())
         
         # Notify web app that fractal is complete
         await web_integration.notify_fractal_complete(self)
         
-        # Post simple results to general channel
+        # Post simple results where the server's announcement mode says
         try:
-            # Find a general channel to post results
-            general_channel = None
-            for channel in self.thread.guild.channels:
-                if isinstance(channel, discord.TextChannel) and (
-                    'general' in channel.name.lower() or 
-                    'main' in channel.name.lower() or
-                    channel.name.lower() in ['chat', 'lobby']
-                ):
-                    general_channel = channel
-                    break
-            
-            if not general_channel:
-                # Fallback to first available text channel
-                general_channel = next(
-                    (ch for ch in self.thread.guild.channels if isinstance(ch, discord.TextChannel)),
-                    None
-                )
-            
-            if general_channel:
-                simple_results = f"🏆 **{self.thread.name} Results:** "
-                simple_results += ", ".join([f"{i+1}. {winner.display_name}" for i, winner in enumerate(final_ranking)])
-                await general_channel.send(simple_results)
+            results_channel = self.find_results_channel()
+            if results_channel:
+                await results_channel.send(self.fragments.results_summary())
         
         except Exception as e:
-            self.logger.error(f"Failed to post results to general channel: {e}")
+            self.logger.error(f"Failed to post results summary: {e}")
+        
+        # Keep vote history for analytics
+        if hasattr(self.cog, 'record_history'):
+            self.cog.record_history(self.state)
         
         # Remove from active groups
-        if hasattr(self.cog, 'active_groups') and self.thread.id in self.cog.active_groups:
-            del self.cog.active_groups[self.thread.id]
+        if hasattr(self.cog, 'remove_group'):
+            self.cog.remove_group(self.thread.id)
         
         self.logger.info(f"Fractal group '{self.thread.name}' completed")
@@ -0,0 +1,87 @@
+"""
+Carrying live fractal groups from one FractalCog to the next across reloads and restarts
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import asdict
+from typing import Dict, Optional
+
+HANDOFF_VERSION = 1
+
+# Why the groups are being handed off
+RELOAD = 'reload'     # Hot reload in the same process: the payload stays in memory on the bot
+RESTART = 'restart'   # Controlled shutdown: the payload is written to disk for the next process
+
+
+def export_cog(cog, reason: str) -> Dict:
+    """JSON-serializable payload of everything a new cog needs to carry on
+
+    Groups keep the settings they were created with and the id of their
+    live ballot, so the new cog can keep serving the same message instead
+    of posting a fresh one.
+    """
+    return {
+        'version': HANDOFF_VERSION,
+        'reason': reason,
+        'saved_at': time.time(),
+        'groups': [
+            {
+                'state': group.state.to_dict(),
+                'settings': asdict(group.settings),
+                'ballot_message_id': group.current_voting_message.id if group.current_voting_message else None
+            }
+            for group in cog.active_groups.values()
+        ],
+        'daily_counters': {str(guild_id): counters for guild_id, counters in cog.daily_counters.items()},
+        'win_counts': {
+            str(guild_id): {str(member_id): wins for member_id, wins in wins_by_member.items()}
+            for guild_id, wins_by_member in cog.win_counts.items()
+        },
+        'fractal_history': list(cog.fractal_history)
+    }
+
+
+def import_counters(payload: Dict) -> Dict:
+    """The cog-level counters from a payload, with integer snowflake keys restored"""
+    return {
+        'daily_counters': {int(guild_id): counters for guild_id, counters in payload['daily_counters'].items()},
+        'win_counts': {
+            int(guild_id): {int(member_id): wins for member_id, wins in wins_by_member.items()}
+            for guild_id, wins_by_member in payload['win_counts'].items()
+        },
+        'fractal_history': list(payload['fractal_history'])
+    }
+
+
+def write_handoff(path: str, payload: Dict):
+    """Write a payload atomically for the next process to pick up"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def take_handoff(path: str) -> Optional[Dict]:
+    """Read and remove a saved payload, so it is only ever restored once"""
+    logger = logging.getLogger('bot')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to read fractal handoff from {path}: {e}")
+        payload = None
+
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+    if payload and payload.get('version') != HANDOFF_VERSION:
+        logger.warning(f"Ignoring fractal handoff with unsupported version {payload.get('version')}")
+        return None
+    return payload
@@ -0,0 +1,171 @@
+"""
+Cursor-paginated admin listings of active fractal groups
+"""
+import heapq
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import discord
+
+from .render import MESSAGE_LIMIT
+
+# Sort orders; each key ends with the thread id so cursors are unique
+SORTS: Dict[str, Tuple[str, Callable]] = {
+    'idle': ("Longest idle", lambda s: (s.last_activity, s.thread_id)),
+    'newest': ("Newest", lambda s: (-s.created_at, s.thread_id)),
+    'level': ("Lowest level", lambda s: (s.level, s.thread_id)),
+    'name': ("Name", lambda s: (s.name.lower(), s.thread_id)),
+}
+
+
+class GroupQuery(NamedTuple):
+    """Filters and sort order for a listing of active groups"""
+    guild_id: Optional[int] = None
+    level: Optional[int] = None
+    paused: Optional[bool] = None
+    min_idle_seconds: float = 0
+    sort: str = 'idle'
+
+    def matches(self, state, now: float) -> bool:
+        return ((self.guild_id is None or state.guild_id == self.guild_id)
+                and (self.level is None or state.level == self.level)
+                and (self.paused is None or state.paused == self.paused)
+                and now - state.last_activity >= self.min_idle_seconds)
+
+
+def fetch_page(groups, query: GroupQuery, after: Optional[Tuple] = None, size: int = 10) -> Tuple[List, bool]:
+    """The ``size`` groups sorted after cursor ``after``, and whether more follow
+
+    A bounded heap selects just the page, so each page costs one pass over
+    the index instead of sorting every group.
+    """
+    key = SORTS[query.sort][1]
+    now = time.time()
+    candidates = (g for g in groups if query.matches(g.state, now) and (after is None or key(g.state) > after))
+    page = heapq.nsmallest(size + 1, candidates, key=lambda g: key(g.state))
+    return page[:size], len(page) > size
+
+
+def idle_label(state, now: float) -> str:
+    minutes = int(now - state.last_activity) // 60
+    return f"{minutes // 60}h {minutes % 60}m" if minutes >= 60 else f"{minutes}m"
+
+
+class GroupListView(discord.ui.View):
+    """Button-driven pages over the cog's active groups, rendering only the visible page
+
+    The forward cursor is the sort key of the last group shown; the keys
+    that started earlier pages are kept so Previous can return to them.
+    """
+
+    def __init__(self, cog, title: str, query: GroupQuery, render_group: Callable,
+                 user_id: int, page_size: int = 10, header: str = ""):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.title = title
+        self.query = query
+        self.render_group = render_group  # Called as render_group(group, now) -> str
+        self.user_id = user_id
+        self.page_size = page_size
+        self.header = header
+        self.starts: List[Optional[Tuple]] = [None]  # Cursor each visited page started after
+        self.page: List = []
+        self.lines: List[str] = []
+        self.notice = ""
+        self.has_more = False
+
+        self.sort_select.options = [
+            discord.SelectOption(label=label, value=name, default=name == query.sort)
+            for name, (label, _) in SORTS.items()
+        ]
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ Only the admin who opened this list can use it.", ephemeral=True)
+            return False
+        return True
+
+    def load(self, notice: str = ""):
+        """Fetch the current page and update the controls
+
+        Rows that don't fit in one message are left for the next page, so
+        the forward cursor only moves past groups that were shown.
+        """
+        self.notice = notice
+        page, has_more = fetch_page(self.cog.active_groups.values(), self.query, self.starts[-1], self.page_size)
+        now = time.time()
+        room = MESSAGE_LIMIT - len(self._heading())
+        self.page, self.lines = [], []
+        for group in page:
+            line = self.render_group(group, now)
+            if len(line) > room:
+                if self.page:
+                    break
+                line = line[:room - 2] + "…\n"  # A single oversized row is cut rather than never shown
+            self.page.append(group)
+            self.lines.append(line)
+            room -= len(line)
+        self.has_more = has_more or len(self.page) < len(page)
+        self.previous_page.disabled = len(self.starts) == 1
+        self.next_page.disabled = not self.has_more
+
+    def _heading(self) -> str:
+        return self.notice + self.header + f"**{self.title}** (page {len(self.starts)}, {SORTS[self.query.sort][0].lower()} first)\n\n"
+
+    def render(self) -> str:
+        if not self.page:
+            return self._heading() + "No matching fractal groups.\n"
+        return self._heading() + "".join(self.lines)
+
+    async def send(self, interaction: discord.Interaction):
+        """Send the first page as a followup to a deferred interaction"""
+        self.load()
+        await interaction.followup.send(self.render(), view=self, ephemeral=True)
+
+    async def refresh(self, interaction: discord.Interaction):
+        self.load()
+        await interaction.response.edit_message(content=self.render(), view=self)
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary, row=1)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.starts) > 1:
+            self.starts.pop()
+        await self.refresh(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary, row=1)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.page and self.has_more:
+            self.starts.append(SORTS[self.query.sort][1](self.page[-1].state))
+        await self.refresh(interaction)
+
+    @discord.ui.select(placeholder="Sort by…", row=0)
+    async def sort_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        self.query = self.query._replace(sort=select.values[0])
+        self.starts = [None]
+        for option in select.options:
+            option.default = option.value == self.query.sort
+        await self.refresh(interaction)
+
+
+class EndFractalListView(GroupListView):
+    """Group listing with a picker that force-ends a group from the visible page"""
+
+    def load(self, notice: str = ""):
+        super().load(notice)
+        self.end_select.options = [
+            discord.SelectOption(label=group.state.name[:100], value=str(group.state.thread_id),
+                                 description=f"Level {group.current_level} · {len(group.state.member_ids)} members")
+            for group in self.page
+        ] or [discord.SelectOption(label="No groups on this page", value="0")]
+        self.end_select.disabled = not self.page
+
+    @discord.ui.select(placeholder="End a fractal…", row=2)
+    async def end_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        group = self.cog.active_groups.get(int(select.values[0]))
+        if not group:
+            await interaction.response.send_message("❌ That fractal has already ended.", ephemeral=True)
+            return
+        await interaction.response.defer()
+        await group.end_fractal()
+        self.load(notice=f"✅ Ended fractal in <#{group.state.thread_id}>\n\n")
+        await interaction.edit_original_response(content=self.render(), view=self)
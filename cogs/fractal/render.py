@@ -0,0 +1,174 @@
+"""
+Message rendering for fractal groups: templates, cached fragments and chunking
+"""
+from typing import Callable, Dict, Iterable, List
+
+from .state import FractalState
+
+MESSAGE_LIMIT = 2000  # Discord's maximum message length
+
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+# Templates are bound once at import so rendering is a single format call
+BALLOT = (
+    "🗳️ **Voting for Level {level}**\n\n"
+    "**Candidates:** {candidates}\n"
+    "**Votes Needed to Win:** {threshold} ({threshold}/{members} members)\n\n"
+    "Click a button below to vote. Your vote will be announced publicly.\n"
+    "You can change your vote at any time by clicking a different button."
+).format
+
+STATUS = (
+    "# ZAO Fractal Status\n\n"
+    "**Group:** {name}\n"
+    "**Facilitator:** <@{facilitator_id}>\n"
+    "**Current Level:** {level}\n"
+    "**Members:** {members}\n"
+    "**Active Candidates:** {candidates}\n"
+    "**Votes Cast:** {votes}/{members}\n\n"
+).format
+
+LIST_ENTRY = (
+    "**{name}**\n"
+    "• Thread: <#{thread_id}>\n"
+    "• Facilitator: <@{facilitator_id}>\n"
+    "• Current Level: {level}\n"
+    "• Members: {members}\n"
+    "• Active Candidates: {candidates}\n"
+    "• Votes Cast: {votes}\n\n"
+).format
+
+STATS = (
+    "# 📊 **Detailed Fractal Stats**\n\n"
+    "**Thread:** <#{thread_id}>\n"
+    "**Facilitator:** <@{facilitator_id}>\n"
+    "**Current Level:** {level}\n"
+    "**Status:** {status}\n\n"
+    "**Members:** {members}\n"
+    "**Active Candidates:** {candidates}\n"
+    "**Votes Cast:** {votes}/{members} ({percentage:.1f}%)\n"
+    "**Votes Needed to Win:** {threshold}\n\n"
+).format
+
+
+class GroupFragments:
+    """Rendered pieces of one group's messages, rebuilt only after its state changes
+
+    Every applied event bumps ``state.version``; the first lookup after a
+    bump drops all cached fragments, so a listing of hundreds of idle
+    groups reuses their text instead of re-rendering it.
+    """
+    __slots__ = ('state', '_version', '_cache')
+
+    def __init__(self, state: FractalState):
+        self.state = state
+        self._version = -1
+        self._cache: Dict[str, str] = {}
+
+    def get(self, key: str, build: Callable[[FractalState], str]) -> str:
+        if self._version != self.state.version:
+            self._cache.clear()
+            self._version = self.state.version
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = build(self.state)
+        return value
+
+    def member_mentions(self) -> str:
+        return self.get('members', lambda s: ", ".join(f"<@{m}>" for m in s.member_ids))
+
+    def candidate_mentions(self) -> str:
+        return self.get('candidates', lambda s: ", ".join(f"<@{c}>" for c in s.candidate_ids))
+
+    def winner_mentions(self) -> str:
+        """One ``Level N: @winner`` line per decided level, highest first"""
+        return self.get('winners', lambda s: "".join(
+            f"Level {level}: <@{winner_id}>\n" for level, winner_id in sorted(s.winners.items(), reverse=True)))
+
+    def winner_names(self) -> str:
+        return self.get('winner_names', lambda s: "".join(
+            f"• Level {level}: {s.display_name(winner_id)}\n" for level, winner_id in sorted(s.winners.items(), reverse=True)))
+
+    def ballot(self) -> str:
+        return self.get('ballot', lambda s: BALLOT(
+            level=s.level, candidates=self.candidate_mentions(), threshold=s.threshold(), members=len(s.member_ids)))
+
+    def status(self) -> str:
+        def build(s):
+            text = STATUS(name=s.name, facilitator_id=s.facilitator_id, level=s.level, members=len(s.member_ids),
+                          candidates=len(s.candidate_ids), votes=len(s.votes))
+            if s.winners:
+                text += "**Winners:**\n" + self.winner_mentions()
+            return text
+        return self.get('status', build)
+
+    def list_entry(self) -> str:
+        return self.get('list_entry', lambda s: LIST_ENTRY(
+            name=s.name, thread_id=s.thread_id, facilitator_id=s.facilitator_id, level=s.level,
+            members=len(s.member_ids), candidates=len(s.candidate_ids), votes=len(s.votes)))
+
+    def stats(self) -> str:
+        def build(s):
+            members = len(s.member_ids)
+            text = STATS(thread_id=s.thread_id, facilitator_id=s.facilitator_id, level=s.level,
+                         status='⏸️ Paused' if s.paused else '▶️ Active', members=members,
+                         candidates=len(s.candidate_ids), votes=len(s.votes),
+                         percentage=len(s.votes) / members * 100 if members else 0, threshold=s.threshold())
+
+            counts = sorted(((count, s.display_name(cid)) for cid, count in s.tally().items() if cid in s.candidate_ids),
+                            key=lambda item: item[0], reverse=True)
+            if counts:
+                text += "**Current Vote Distribution:**\n"
+                text += "".join(f"• {name}: {count} votes\n" for count, name in counts)
+                text += "\n"
+            if s.winners:
+                text += "**Winners So Far:**\n" + self.winner_names()
+            return text
+        return self.get('stats', build)
+
+    def results(self) -> str:
+        return self.get('results', lambda s: "# 🏆 **FRACTAL COMPLETE!** 🏆\n\n**Final Rankings:**\n" + "".join(
+            f"{MEDALS.get(i, f'{i}.')} <@{winner_id}>\n" for i, winner_id in enumerate(s.ranking(), 1)))
+
+    def results_summary(self) -> str:
+        return self.get('results_summary', lambda s: f"🏆 **{s.name} Results:** " + ", ".join(
+            f"{i}. {s.display_name(winner_id)}" for i, winner_id in enumerate(s.ranking(), 1)))
+
+
+def chunk_message(parts: Iterable[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Pack text parts into as few messages as fit under ``limit``
+
+    Parts are kept whole where possible; a part longer than the limit is
+    split on line boundaries, and a single overlong line is hard-split.
+    """
+    chunks, current = [], ""
+    for part in parts:
+        if len(current) + len(part) <= limit:
+            current += part
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+        if len(part) <= limit:
+            current = part
+            continue
+        for line in part.splitlines(keepends=True):
+            while len(line) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:limit])
+                line = line[limit:]
+            if len(current) + len(line) > limit:
+                chunks.append(current)
+                current = ""
+            current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def send_chunked(send: Callable, parts: Iterable[str], **kwargs):
+    """Send text parts through ``send`` (e.g. ``followup.send``) in as few messages as fit"""
+    for chunk in chunk_message(parts):
+        await send(chunk, **kwargs)
@@ -0,0 +1,114 @@
+"""
+Round timers for all fractal groups driven by a single heap task
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+REMINDER = 'reminder'
+DEADLINE = 'deadline'
+
+
+class RoundScheduler:
+    """One asyncio task and a min-heap serving every group's round timers
+
+    Rescheduling or cancelling a group bumps its token instead of searching
+    the heap; stale entries are skipped when popped and compacted away once
+    they outnumber live ones, so thousands of timers cost one task.
+    """
+
+    def __init__(self, callback: Callable[[int, str], Awaitable[None]]):
+        self.callback = callback  # Called as callback(thread_id, kind) when a timer fires
+        self.logger = logging.getLogger('bot')
+        self._heap: List[Tuple[float, int, int, str, int]] = []  # (when, seq, thread_id, kind, token)
+        self._tokens: Dict[int, int] = {}  # thread_id -> live token
+        self._pending: Dict[int, int] = {}  # thread_id -> live entries in the heap
+        self._live = 0  # Sum of _pending, kept up to date so len() is O(1)
+        self._firing: Set[asyncio.Task] = set()  # Callbacks in flight, referenced until done
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def __len__(self):
+        return self._live
+
+    def schedule_round(self, thread_id: int, timeout: float, reminder: float = 0):
+        """Replace a group's timers with a deadline (and optional reminder) from now"""
+        self.cancel(thread_id)
+        if timeout <= 0:
+            return
+        token = next(self._seq)
+        self._tokens[thread_id] = token
+        now = asyncio.get_running_loop().time()
+
+        entries = [(now + timeout, DEADLINE)]
+        if 0 < reminder < timeout:
+            entries.append((now + reminder, REMINDER))
+        for when, kind in entries:
+            heapq.heappush(self._heap, (when, next(self._seq), thread_id, kind, token))
+        self._pending[thread_id] = len(entries)
+        self._live += len(entries)
+
+        # Wake the runner if this is now the earliest timer
+        if self._heap[0][4] == token:
+            self._wakeup.set()
+
+    def cancel(self, thread_id: int):
+        """Drop a group's timers; heap entries are discarded lazily"""
+        if self._tokens.pop(thread_id, None) is not None:
+            self._live -= self._pending.pop(thread_id, 0)
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self):
+                self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._tokens.get(entry[2]) == entry[4]]
+        heapq.heapify(self._heap)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue  # Heap changed, recompute the next deadline
+                except asyncio.TimeoutError:
+                    pass
+
+            now = loop.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, thread_id, kind, token = heapq.heappop(self._heap)
+                if self._tokens.get(thread_id) != token:
+                    continue
+                remaining = self._pending.get(thread_id, 1) - 1
+                self._live -= 1
+                if remaining:
+                    self._pending[thread_id] = remaining
+                else:
+                    self._pending.pop(thread_id, None)
+                    self._tokens.pop(thread_id, None)
+                task = asyncio.create_task(self._fire(thread_id, kind))
+                self._firing.add(task)
+                task.add_done_callback(self._firing.discard)
+
+    async def _fire(self, thread_id: int, kind: str):
+        try:
+            await self.callback(thread_id, kind)
+        except Exception as e:
+            self.logger.error(f"Round {kind} timer failed for thread {thread_id}: {e}", exc_info=True)
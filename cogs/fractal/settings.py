@@ -0,0 +1,171 @@
+"""
+Per-guild fractal settings persisted to a JSON file, with cached lookups
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Dict, Optional
+
+from config.config import (MIN_GROUP_MEMBERS, MAX_GROUP_MEMBERS, STARTING_LEVEL,
+                           ROUND_TIMEOUT_SECONDS, ROUND_REMINDER_SECONDS)
+
+# Where a finished fractal's results summary is posted
+ANNOUNCE_AUTO = 'auto'        # A channel named like general/main/chat/lobby, else the first text channel
+ANNOUNCE_CHANNEL = 'channel'  # The guild's configured results channel
+ANNOUNCE_THREAD = 'thread'    # Only in the fractal's own thread
+
+ANNOUNCE_MODES = {
+    ANNOUNCE_AUTO: "General channel (auto-detected)",
+    ANNOUNCE_CHANNEL: "Results channel",
+    ANNOUNCE_THREAD: "Fractal thread only"
+}
+
+GROUP_SIZE_LIMIT = 25         # Largest group anyone can configure
+LEVEL_LIMIT = 12              # Highest starting level anyone can configure
+TIMER_LIMIT_SECONDS = 24 * 60 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class GuildSettings:
+    """One guild's fractal settings; defaults come from config/config.py
+
+    Instances are immutable, so a group can keep the settings it was
+    created with while admins edit the guild's settings.
+    """
+    min_group_members: int = MIN_GROUP_MEMBERS
+    max_group_members: int = MAX_GROUP_MEMBERS
+    starting_level: int = STARTING_LEVEL
+    announce_mode: str = ANNOUNCE_AUTO
+    results_channel_id: Optional[int] = None
+    round_timeout_seconds: int = ROUND_TIMEOUT_SECONDS    # 0 disables round deadlines
+    round_reminder_seconds: int = ROUND_REMINDER_SECONDS  # 0 disables reminders
+
+    def validate(self):
+        """Raise ValueError describing the first invalid setting"""
+        if not 2 <= self.min_group_members <= self.max_group_members <= GROUP_SIZE_LIMIT:
+            raise ValueError(f"Group sizes must satisfy 2 ≤ minimum ≤ maximum ≤ {GROUP_SIZE_LIMIT}.")
+        if not 1 <= self.starting_level <= LEVEL_LIMIT:
+            raise ValueError(f"Starting level must be between 1 and {LEVEL_LIMIT}.")
+        if self.announce_mode not in ANNOUNCE_MODES:
+            raise ValueError(f"Announcement mode must be one of: {', '.join(ANNOUNCE_MODES)}.")
+        if self.announce_mode == ANNOUNCE_CHANNEL and self.results_channel_id is None:
+            raise ValueError("Set a results channel to announce results there.")
+        for seconds in (self.round_timeout_seconds, self.round_reminder_seconds):
+            if not 0 <= seconds <= TIMER_LIMIT_SECONDS:
+                raise ValueError("Timers must be between 0 and 24 hours.")
+        if self.round_reminder_seconds and self.round_timeout_seconds and \
+                self.round_reminder_seconds >= self.round_timeout_seconds:
+            raise ValueError("The reminder must come before the round deadline.")
+
+
+DEFAULTS = GuildSettings()
+FIELD_NAMES = tuple(f.name for f in fields(GuildSettings))
+
+
+class SettingsStore:
+    """Guild settings overrides in a JSON file, served from memory
+
+    The file maps guild ids to just the settings that differ from the
+    defaults. It is read once at startup; lookups build a guild's
+    GuildSettings on first use and reuse it until that guild's settings
+    change, so callers on hot paths never touch the disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger('bot')
+        self._overrides: Dict[int, Dict] = self._load()
+        self._cache: Dict[int, GuildSettings] = {}
+
+    def _load(self) -> Dict[int, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to load guild settings from {self.path}: {e}")
+            return {}
+        return {
+            int(guild_id): {name: value for name, value in overrides.items() if name in FIELD_NAMES}
+            for guild_id, overrides in data.items()
+        }
+
+    def _save(self, all_overrides: Dict[int, Dict]):
+        """Write every guild's overrides atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({str(guild_id): overrides for guild_id, overrides in all_overrides.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, guild_id: int) -> GuildSettings:
+        """A guild's settings, built from its overrides on first use"""
+        settings = self._cache.get(guild_id)
+        if settings is None:
+            settings = DEFAULTS
+            overrides = self._overrides.get(guild_id)
+            if overrides:
+                try:
+                    settings = replace(DEFAULTS, **overrides)
+                    settings.validate()
+                except (TypeError, ValueError) as e:
+                    self.logger.error(f"Ignoring invalid settings for guild {guild_id}: {e}")
+                    settings = DEFAULTS
+            self._cache[guild_id] = settings
+        return settings
+
+    def update(self, guild_id: int, **changes) -> GuildSettings:
+        """Validate and persist changed settings for a guild
+
+        Raises:
+            ValueError: If the resulting settings are invalid (nothing is saved)
+            OSError: If the settings file can't be written
+        """
+        settings = replace(self.get(guild_id), **changes)
+        settings.validate()
+        self._store(guild_id, settings)
+        return settings
+
+    def reset(self, guild_id: int, name: Optional[str] = None) -> GuildSettings:
+        """Restore one setting (or all of them) to the default
+
+        Raises:
+            ValueError: If the default conflicts with the guild's other settings
+            OSError: If the settings file can't be written
+        """
+        if name is None:
+            settings = DEFAULTS
+        else:
+            settings = replace(self.get(guild_id), **{name: getattr(DEFAULTS, name)})
+            if settings.announce_mode == ANNOUNCE_CHANNEL and settings.results_channel_id is None:
+                settings = replace(settings, announce_mode=DEFAULTS.announce_mode)
+            settings.validate()
+        self._store(guild_id, settings)
+        return settings
+
+    def _store(self, guild_id: int, settings: GuildSettings):
+        """Persist a guild's settings, then swap them in; a failed write changes nothing"""
+        all_overrides = dict(self._overrides)
+        overrides = {name: getattr(settings, name) for name in FIELD_NAMES
+                     if getattr(settings, name) != getattr(DEFAULTS, name)}
+        if overrides:
+            all_overrides[guild_id] = overrides
+        else:
+            all_overrides.pop(guild_id, None)
+        self._save(all_overrides)
+        self._overrides = all_overrides
+        self.invalidate(guild_id)
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Drop cached settings for a guild (or every guild)"""
+        if guild_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(guild_id, None)
+
+    def reload(self):
+        """Re-read the settings file, e.g. after editing it by hand"""
+        self._overrides = self._load()
+        self.invalidate()
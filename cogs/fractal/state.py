@@ -0,0 +1,219 @@
+"""
+Discord-independent state core for fractal voting groups
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+STARTING_LEVEL = 6
+
+
+@dataclass(slots=True)
+class FractalState:
+    """Compact voting state keyed by integer snowflakes
+
+    Holds no discord.py objects so it can be serialized, exported and
+    exercised in simulations without a bot. Display names are captured
+    when members join so rendering never needs the member cache.
+    """
+    thread_id: int
+    guild_id: int
+    name: str
+    facilitator_id: int
+    member_ids: List[int]
+    candidate_ids: List[int]
+    names: Dict[int, str] = field(default_factory=dict)
+    votes: Dict[int, int] = field(default_factory=dict)  # voter_id -> candidate_id
+    winners: Dict[int, int] = field(default_factory=dict)  # level -> winner_id
+    level: int = STARTING_LEVEL
+    paused: bool = False
+    created_at: float = field(default_factory=time.time)
+    last_activity: float = field(default_factory=time.time)
+    round_deadline: Optional[float] = None  # Wall-clock time the current round auto-resolves
+    round_started_index: int = 0  # Position in vote_history where the current round began
+    vote_history: List[Tuple[int, int, int, bool]] = field(default_factory=list)  # (level, voter, candidate, changed)
+    round_history: List[Dict] = field(default_factory=list)
+    version: int = 0  # Bumped on every applied event so rendered fragments know when to refresh
+
+    @classmethod
+    def create(cls, thread_id: int, guild_id: int, name: str, facilitator_id: int, members: Dict[int, str]) -> "FractalState":
+        """Create state for a new group from a mapping of member id -> display name"""
+        return cls(
+            thread_id=thread_id,
+            guild_id=guild_id,
+            name=name,
+            facilitator_id=facilitator_id,
+            member_ids=list(members),
+            candidate_ids=list(members),
+            names=dict(members)
+        )
+
+    def touch(self):
+        """Record activity on this group"""
+        self.last_activity = time.time()
+
+    def display_name(self, user_id: int) -> str:
+        return self.names.get(user_id, str(user_id))
+
+    def threshold(self) -> int:
+        """Votes needed to win (50% or more)"""
+        return max(1, len(self.member_ids) // 2 + len(self.member_ids) % 2)  # Ceiling division
+
+    def tally(self) -> Dict[int, int]:
+        """Vote counts per candidate for the current round"""
+        counts = {}
+        for candidate_id in self.votes.values():
+            counts[candidate_id] = counts.get(candidate_id, 0) + 1
+        return counts
+
+    def leaders(self) -> Tuple[int, List[int]]:
+        """Highest vote count and the candidates tied at it"""
+        counts = self.tally()
+        if not counts:
+            return 0, []
+        max_votes = max(counts.values())
+        return max_votes, [cid for cid, count in counts.items() if count == max_votes]
+
+    def cast_vote(self, voter_id: int, candidate_id: int) -> Optional[int]:
+        """Record a vote and return the voter's previous candidate, if any"""
+        previous = self.votes.get(voter_id)
+        self.votes[voter_id] = candidate_id
+        self.vote_history.append((self.level, voter_id, candidate_id, previous is not None))
+        self.touch()
+        return previous
+
+    def record_winner(self, winner_id: int):
+        """Close the current round with a winner and move down a level"""
+        self.round_history.append({
+            'level': self.level,
+            'winner_id': winner_id,
+            'ballots': [[voter_id, candidate_id] for voter_id, candidate_id in self.votes.items()]
+        })
+        self.winners[self.level] = winner_id
+        self.candidate_ids.remove(winner_id)
+        self.level -= 1
+        self.touch()
+
+    def start_round(self):
+        """Clear votes for a fresh round at the current level"""
+        self.votes = {}
+        self.round_started_index = len(self.vote_history)
+        self.touch()
+
+    def round_events(self) -> List[Tuple[int, int]]:
+        """(voter_id, candidate_id) votes cast so far this round, in order"""
+        return [(voter, candidate) for _, voter, candidate, _ in self.vote_history[self.round_started_index:]]
+
+    def non_voters(self) -> List[int]:
+        """Members who haven't voted in the current round"""
+        return [m for m in self.member_ids if m not in self.votes]
+
+    def is_complete(self) -> bool:
+        return self.level < 1 or len(self.candidate_ids) <= 1
+
+    def finalize(self):
+        """Assign the last remaining candidate to the current level"""
+        if len(self.candidate_ids) == 1:
+            self.winners[self.level] = self.candidate_ids[0]
+
+    def ranking(self) -> List[int]:
+        """Winner ids ordered from highest level to lowest"""
+        return [self.winners[level] for level in sorted(self.winners, reverse=True)]
+
+    def round_results(self) -> List[Tuple[int, int]]:
+        """(level, winner_id) of rounds won by vote, highest level first
+
+        Unlike ``winners`` this leaves out the last remaining candidate that
+        finalize() places without a round, so it matches the rounds the web
+        app stores and ranks.
+        """
+        return sorted(((r['level'], r['winner_id']) for r in self.round_history), reverse=True)
+
+    def add_member(self, user_id: int, name: str) -> bool:
+        if user_id in self.member_ids:
+            return False
+        self.member_ids.append(user_id)
+        self.candidate_ids.append(user_id)
+        self.names[user_id] = name
+        self.touch()
+        return True
+
+    def remove_member(self, user_id: int) -> bool:
+        if user_id not in self.member_ids:
+            return False
+        self.member_ids.remove(user_id)
+        if user_id in self.candidate_ids:
+            self.candidate_ids.remove(user_id)
+        # Drop their own vote and any votes for them, so those voters can vote again
+        self.votes.pop(user_id, None)
+        self.votes = {voter_id: candidate_id for voter_id, candidate_id in self.votes.items() if candidate_id != user_id}
+        self.touch()
+        return True
+
+    def restart(self, starting_level: int = STARTING_LEVEL):
+        """Reset to the first round with the same members, discarding earlier rounds"""
+        self.level = starting_level
+        self.votes = {}
+        self.vote_history = []
+        self.round_history = []
+        self.round_started_index = 0
+        self.winners = {}
+        self.candidate_ids = list(self.member_ids)
+        self.paused = False
+        self.touch()
+
+    def to_history_record(self) -> Dict:
+        """Plain record of this group's votes and winners for analytics"""
+        return {
+            'thread_id': self.thread_id,
+            'guild_id': self.guild_id,
+            'started_at': self.created_at,
+            'members': list(self.member_ids),
+            'rounds': list(self.round_history),
+            'votes': [list(event) for event in self.vote_history]
+        }
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot of the full state"""
+        return {
+            'thread_id': self.thread_id,
+            'guild_id': self.guild_id,
+            'name': self.name,
+            'facilitator_id': self.facilitator_id,
+            'member_ids': list(self.member_ids),
+            'candidate_ids': list(self.candidate_ids),
+            'names': {str(k): v for k, v in self.names.items()},
+            'votes': {str(k): v for k, v in self.votes.items()},
+            'winners': {str(k): v for k, v in self.winners.items()},
+            'level': self.level,
+            'paused': self.paused,
+            'created_at': self.created_at,
+            'last_activity': self.last_activity,
+            'round_deadline': self.round_deadline,
+            'round_started_index': self.round_started_index,
+            'vote_history': [list(event) for event in self.vote_history],
+            'round_history': list(self.round_history)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FractalState":
+        """Rebuild state from a to_dict() snapshot"""
+        return cls(
+            thread_id=data['thread_id'],
+            guild_id=data['guild_id'],
+            name=data['name'],
+            facilitator_id=data['facilitator_id'],
+            member_ids=list(data['member_ids']),
+            candidate_ids=list(data['candidate_ids']),
+            names={int(k): v for k, v in data['names'].items()},
+            votes={int(k): v for k, v in data['votes'].items()},
+            winners={int(k): v for k, v in data['winners'].items()},
+            level=data['level'],
+            paused=data['paused'],
+            created_at=data['created_at'],
+            last_activity=data['last_activity'],
+            round_deadline=data['round_deadline'],
+            round_started_index=data['round_started_index'],
+            vote_history=[tuple(event) for event in data['vote_history']],
+            round_history=list(data['round_history'])
+        )
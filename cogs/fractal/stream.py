@@ -0,0 +1,154 @@
+"""
+Fan-out of fractal events to live dashboard subscribers as server-sent events
+"""
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Set
+
+from . import events
+
+# Events sent with the current round's tally
+WITH_TALLY = (events.VOTE_CAST, events.VOTES_RESET, events.ROUND_STARTED, events.ROUND_WON, events.MEMBER_REMOVED)
+
+# Events whose tally makes an older one for the same thread redundant, so
+# they replace each other when a slow subscriber's buffer is full
+COALESCIBLE = (events.VOTE_CAST, events.VOTES_RESET)
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class Subscriber:
+    """One connected client: a bounded buffer of encoded SSE frames
+
+    When the buffer is full a coalescible event replaces the oldest one of
+    the same kind for that thread, or else evicts any coalescible frame a
+    newer one already supersedes; only when nothing is redundant is the
+    oldest frame dropped and the client sent a ``lagged`` event telling it
+    to refetch state.
+    """
+    __slots__ = ('thread_id', 'buffer', 'keys', 'limit', 'dropped', 'wakeup')
+
+    def __init__(self, thread_id: Optional[int], limit: int):
+        self.thread_id = thread_id
+        self.buffer = deque()  # Encoded frames
+        self.keys = deque()    # Coalescing key (or None) of each buffered frame
+        self.limit = limit
+        self.dropped = 0
+        self.wakeup = asyncio.Event()
+
+    def push(self, frame: bytes, key: Optional[tuple]):
+        if len(self.buffer) >= self.limit:
+            index = self.keys.index(key) if key is not None and key in self.keys else self._superseded()
+            if index is not None:
+                del self.buffer[index]
+                del self.keys[index]
+            else:
+                self.buffer.popleft()
+                self.keys.popleft()
+                self.dropped += 1
+        self.buffer.append(frame)
+        self.keys.append(key)
+        self.wakeup.set()
+
+    def _superseded(self) -> Optional[int]:
+        """Index of a buffered frame a later frame with the same key makes redundant"""
+        seen = set()
+        for index in range(len(self.keys) - 1, -1, -1):
+            key = self.keys[index]
+            if key is not None:
+                if key in seen:
+                    return index
+                seen.add(key)
+        return None
+
+    async def frames(self, keepalive: float) -> AsyncIterator[bytes]:
+        """Yield batches of buffered frames, or a keepalive comment when idle"""
+        while True:
+            if not self.buffer:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+
+            batch = b"".join(self.buffer)
+            self.buffer.clear()
+            self.keys.clear()
+            if self.dropped:
+                batch = encode('lagged', {'dropped': self.dropped}) + batch
+                self.dropped = 0
+            yield batch
+
+
+def encode(kind: str, payload: Dict, seq: Optional[int] = None) -> bytes:
+    """One SSE frame; the event sequence number doubles as the SSE id"""
+    frame = f"id: {seq}\n" if seq is not None else ""
+    return (frame + f"event: {kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n").encode()
+
+
+def _with_string_ids(data: Dict) -> Dict:
+    """Event data with snowflakes as strings, since they overflow JavaScript numbers"""
+    result = {}
+    for key, value in data.items():
+        if key.endswith('_id'):
+            value = str(value)
+        elif key == 'members':
+            value = [[str(member_id), name] for member_id, name in value]
+        elif key == 'tie_break':
+            value = dict(value, tied=[str(member_id) for member_id in value['tied']])
+        result[key] = value
+    return result
+
+
+class StreamHub:
+    """Per-thread (or all-thread) subscriptions to fractal events on one event loop
+
+    Each event is encoded once and the same bytes are pushed to every
+    interested subscriber, so publishing never awaits and costs one
+    buffer append per subscriber.
+    """
+
+    def __init__(self, buffer_limit: int = 64):
+        self.buffer_limit = buffer_limit
+        self._subscribers: Dict[Optional[int], Set[Subscriber]] = {}  # thread_id (None = all threads) -> subscribers
+
+    def __len__(self):
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, thread_id: Optional[int] = None) -> Subscriber:
+        subscriber = Subscriber(thread_id, self.buffer_limit)
+        self._subscribers.setdefault(thread_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subs = self._subscribers.get(subscriber.thread_id)
+        if subs:
+            subs.discard(subscriber)
+            if not subs:
+                del self._subscribers[subscriber.thread_id]
+
+    def publish(self, state, kind: str, data: Dict, ts: float, seq: Optional[int] = None):
+        """Push an applied state change to the thread's subscribers and to all-thread subscribers"""
+        targeted, everyone = self._subscribers.get(state.thread_id), self._subscribers.get(None)
+        if not targeted and not everyone:
+            return
+
+        payload = {
+            'threadId': str(state.thread_id),
+            'guildId': str(state.guild_id),
+            'ts': ts,
+            'level': state.level,
+            'paused': state.paused,
+            'data': _with_string_ids(data)
+        }
+        if kind in WITH_TALLY:
+            candidates = set(state.candidate_ids)
+            payload['tally'] = {str(cid): count for cid, count in state.tally().items() if cid in candidates}
+
+        frame = encode(kind, payload, seq)
+        key = (state.thread_id, kind) if kind in COALESCIBLE else None
+        for subs in (targeted, everyone):
+            for subscriber in subs or ():
+                subscriber.push(frame, key)
@@ -0,0 +1,75 @@
+"""
+Deterministic, seedable tie-breaking for fractal rounds
+"""
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+RANDOM = 'random'            # Seeded random choice among tied candidates
+EARLIEST = 'earliest'        # First tied candidate to reach the winning vote count
+FEWEST_WINS = 'fewest_wins'  # Tied candidate with the fewest previous round wins
+
+POLICIES = (RANDOM, EARLIEST, FEWEST_WINS)
+
+
+class TieBreak(NamedTuple):
+    winner_id: int
+    policy: str
+    seed: int
+    tied: Tuple[int, ...]
+
+    def to_dict(self) -> Dict:
+        return {'policy': self.policy, 'seed': self.seed, 'tied': list(self.tied)}
+
+
+def derive_seed(thread_id: int, level: int, votes: Dict[int, int]) -> int:
+    """64-bit seed from the thread, level and the exact set of votes cast"""
+    ballot = ",".join(f"{voter}:{candidate}" for voter, candidate in sorted(votes.items()))
+    digest = hashlib.sha256(f"{thread_id}|{level}|{ballot}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def _seeded_choice(tied: List[int], seed: int) -> int:
+    # The seed is a uniform 64-bit hash, so a modulo pick is unbiased for
+    # realistic tie sizes and avoids constructing a Random per call
+    return sorted(tied)[seed % len(tied)]
+
+
+def _earliest_to_count(tied: List[int], round_events: Iterable[Tuple[int, int]], target: int) -> Optional[int]:
+    """Replay this round's (voter, candidate) events to find who hit ``target`` first"""
+    candidates = set(tied)
+    votes, counts = {}, {}
+    for voter, candidate in round_events:
+        previous = votes.get(voter)
+        if previous is not None:
+            counts[previous] -= 1
+        votes[voter] = candidate
+        counts[candidate] = counts.get(candidate, 0) + 1
+        if candidate in candidates and counts[candidate] >= target:
+            return candidate
+    return None
+
+
+def break_tie(tied: List[int], thread_id: int, level: int, votes: Dict[int, int], policy: str = RANDOM,
+              round_events: Iterable[Tuple[int, int]] = (), win_counts: Optional[Dict[int, int]] = None) -> TieBreak:
+    """Pick a winner among tied candidates; the same inputs always give the same result
+
+    Policies that can still leave a tie (or lack the data they need) fall
+    back to the seeded random choice, so the seed alone verifies the result.
+    """
+    seed = derive_seed(thread_id, level, votes)
+    tied = sorted(tied)
+    winner_id = None
+
+    if len(tied) == 1:
+        winner_id = tied[0]
+    elif policy == EARLIEST:
+        target = max(sum(1 for c in votes.values() if c == cid) for cid in tied)
+        winner_id = _earliest_to_count(tied, round_events, target) if target else None
+    elif policy == FEWEST_WINS and win_counts is not None:
+        fewest = min(win_counts.get(cid, 0) for cid in tied)
+        remaining = [cid for cid in tied if win_counts.get(cid, 0) == fewest]
+        winner_id = remaining[0] if len(remaining) == 1 else _seeded_choice(remaining, seed)
+
+    if winner_id is None:
+        winner_id = _seeded_choice(tied, seed)
+    return TieBreak(winner_id, policy, seed, tuple(tied))
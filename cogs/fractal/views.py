@@ -1,7 +1,9 @@
 import discord
 import logging
+import asyncio
+import time
 from typing import Callable, Dict, List
-from .group import FractalGroup
+from .dedup import REPEAT_START
 
 class ZAOFractalVotingView(discord.ui.View):
     """UI view with voting buttons for fractal rounds"""
@@ -9,6 +11,7 @@ class ZAOFractalVotingView(discord.ui.View):
     def __init__(self, fractal_group):
         super().__init__(timeout=None)  # No timeout for persistent buttons
         self.fractal_group = fractal_group
+        self.level = fractal_group.current_level  # Level this ballot was issued for
         self.logger = logging.getLogger('bot')
         
         # Create voting buttons
@@ -28,36 +31,60 @@ class ZAOFractalVotingView(discord.ui.View):
         ]
         
         # Create a button for each candidate
-        for i, candidate in enumerate(self.fractal_group.active_candidates):
+        state = self.fractal_group.state
+        for i, candidate_id in enumerate(state.candidate_ids):
             # Cycle through button styles
             style = styles[i % len(styles)]
             
             # Create button with candidate name
             button = discord.ui.Button(
                 style=style,
-                label=candidate.display_name,
-                custom_id=f"vote_{candidate.id}"
+                label=state.display_name(candidate_id),
+                custom_id=f"vote_{candidate_id}"
             )
             
             # Create and assign callback
-            button.callback = self.create_vote_callback(candidate)
+            button.callback = self.create_vote_callback(candidate_id)
             self.add_item(button)
             
-        self.logger.info(f"Created {len(self.fractal_group.active_candidates)} voting buttons")
+        self.logger.info(f"Created {len(state.candidate_ids)} voting buttons")
     
-    def create_vote_callback(self, candidate):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Drop interactions Discord delivers more than once"""
+        dedup = getattr(self.fractal_group.cog, 'dedup', None)
+        return dedup is None or dedup.first_delivery(interaction.id)
+    
+    def create_vote_callback(self, candidate_id):
         """Create a callback function for voting buttons"""
         async def vote_callback(interaction):
-            # Always defer response immediately to avoid timeout
-            await interaction.response.defer(ephemeral=True)
+            # Reject clicks on stale or paused ballots before doing any work
+            rejection = self.get_rejection()
+            if rejection:
+                await interaction.response.send_message(rejection, ephemeral=True)
+                return
+            
+            # A repeated click for the same candidate changes nothing, so answer
+            # it directly instead of announcing and notifying the web app again
+            group = self.fractal_group
+            dedup = getattr(group.cog, 'dedup', None)
+            voter_id = interaction.user.id
+            if dedup and not dedup.claim_vote(group.state, voter_id, candidate_id):
+                await interaction.response.send_message(
+                    f"You already voted for {group.state.display_name(candidate_id)}",
+                    ephemeral=True
+                )
+                return
             
             try:
+                # Always defer response immediately to avoid timeout
+                await interaction.response.defer(ephemeral=True)
+                
                 # Process the vote (public announcement happens in process_vote)
-                await self.fractal_group.process_vote(interaction.user, candidate)
+                await group.process_vote(voter_id, candidate_id)
                 
                 # Confirm to the voter (private)
                 await interaction.followup.send(
-                    f"You voted for {candidate.display_name}",
+                    f"You voted for {group.state.display_name(candidate_id)}",
                     ephemeral=True
                 )
                 
@@ -67,8 +94,20 @@ class ZAOFractalVotingView(discord.ui.View):
                     "❌ Error recording your vote. Please try again.",
                     ephemeral=True
                 )
+            finally:
+                if dedup:
+                    dedup.release_vote(group.state, voter_id, candidate_id)
                 
         return vote_callback
+    
+    def get_rejection(self):
+        """Return a reason this ballot can't take votes, or None if it can"""
+        group = self.fractal_group
+        if self.is_finished() or self.level != group.current_level or group.current_view is not self:
+            return "❌ This ballot is closed. Please vote on the latest ballot."
+        if group.paused:
+            return "⏸️ Voting is paused. Please wait for an admin to resume the fractal."
+        return None
 
 
 class MemberConfirmationView(discord.ui.View):
@@ -79,6 +118,12 @@ class MemberConfirmationView(discord.ui.View):
         self.members = members
         self.facilitator = facilitator
         self.awaiting_modification = False
+        self.starting = False
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Drop interactions Discord delivers more than once"""
+        dedup = getattr(self.cog, 'dedup', None)
+        return dedup is None or dedup.first_delivery(interaction.id)
     
     @discord.ui.button(label="✅ Start Fractal", style=discord.ButtonStyle.success)
     async def confirm_members(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -87,7 +132,21 @@ class MemberConfirmationView(discord.ui.View):
             await interaction.response.send_message("Only the facilitator can start the fractal.", ephemeral=True)
             return
         
+        # A second click while the first is creating the group would start a duplicate
+        if self.starting:
+            dedup = getattr(self.cog, 'dedup', None)
+            if dedup:
+                dedup.count(REPEAT_START)
+            await interaction.response.send_message("⏳ The fractal is already starting.", ephemeral=True)
+            return
+        if not self.cog.accepting:
+            # The bot is shutting down, or this view belongs to a cog that was reloaded
+            await interaction.response.send_message("🔄 The bot is restarting. Please run /zaofractal again in a minute.", ephemeral=True)
+            return
+        self.starting = True
+        
         await interaction.response.defer()
+        started_at = time.perf_counter()
         
         # Generate group name
         group_name = self.cog._get_next_group_name(interaction.guild.id)
@@ -97,47 +156,26 @@ class MemberConfirmationView(discord.ui.View):
         if isinstance(channel, discord.Thread):
             channel = channel.parent
         
-        # Create public thread
-        thread = await channel.create_thread(
-            name=group_name,
-            type=discord.ChannelType.public_thread,
-            reason="ZAO Fractal Group"
-        )
+        # Create public thread and register the group
+        try:
+            fractal_group = await self.cog.create_fractal_group(channel, group_name, self.members, self.facilitator)
+        except Exception:
+            self.starting = False  # Let the facilitator try again
+            raise
         
-        # Add all members to thread
-        for member in self.members:
+        async def confirm_started():
             try:
-                await thread.add_user(member)
+                await interaction.edit_original_response(
+                    content=f"✅ **Fractal started!** Check {fractal_group.thread.mention}",
+                    view=None
+                )
             except discord.HTTPException:
-                pass  # Member might already be in thread or have permissions issues
+                pass  # Interaction might have timed out, but continue anyway
         
-        # Create and start fractal group
-        fractal_group = FractalGroup(
-            thread=thread,
-            members=self.members,
-            facilitator=self.facilitator,
-            cog=self.cog
+        await asyncio.gather(
+            confirm_started(),
+            self.cog.launch_fractal_group(fractal_group, self.members, started_at)
         )
-        
-        # Store active group
-        self.cog.active_groups[thread.id] = fractal_group
-        
-        # Update original message first to avoid timeout
-        try:
-            await interaction.edit_original_response(
-                content=f"✅ **Fractal started!** Check {thread.mention}",
-                view=None
-            )
-        except:
-            pass  # Interaction might have timed out, but continue anyway
-        
-        # Start the fractal (this might take a moment)
-        try:
-            await fractal_group.start_fractal()
-        except Exception as e:
-            # If fractal start fails, send error to thread
-            await thread.send(f"❌ Error starting fractal: {str(e)}")
-            raise
     
     @discord.ui.button(label="❌ Modify Members", style=discord.ButtonStyle.secondary)
     async def modify_members(self, interaction: discord.Interaction, button: discord.ui.Button):
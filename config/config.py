@@ -2,9 +2,10 @@
 Configuration parameters for the ZAO Fractal Bot
 """
 
-# Fractal Settings
+# Fractal Settings (defaults; admins can override them per server with /admin settings)
 MAX_GROUP_MEMBERS = 6
 MIN_GROUP_MEMBERS = 2
+SETTINGS_PATH = "data/guild_settings.json"   # Per-server setting overrides
 
 # Voting Settings
 STARTING_LEVEL = 6
@@ -20,3 +21,55 @@ BUTTON_STYLES = [
 
 # Thread Settings
 THREAD_PREFIX = "ZAO Fractal:"
+
+# Round Timer Settings (seconds, 0 disables; off by default so rounds only
+# end on a majority or a facilitator's force, e.g. 600 / 300 to enable)
+ROUND_TIMEOUT_SECONDS = 0       # Auto-resolve a round by plurality after this long
+ROUND_REMINDER_SECONDS = 0      # Ping members who haven't voted after this long
+
+# Stale Group Reaper Settings (seconds)
+GROUP_IDLE_TIMEOUT_SECONDS = 6 * 60 * 60   # Close groups with no activity for this long
+REAPER_INTERVAL_SECONDS = 300              # How often to sweep for idle groups
+
+# Event Log Settings
+EVENT_LOG_PATH = "data/events.log"      # Append-only log of every fractal state change
+SNAPSHOT_DIR = "data/snapshots"         # Per-group state snapshots for fast rebuilds
+SNAPSHOT_EVERY_EVENTS = 50              # Snapshot a group after this many events
+
+# Shutdown/Restart Settings
+HANDOFF_PATH = "data/handoff.json"   # Active groups saved on shutdown and adopted on the next start
+SHUTDOWN_DRAIN_SECONDS = 10          # Max time spent posting restart notices and draining webhooks
+
+# Tie-Break Settings
+TIE_BREAK_POLICY = "random"   # 'random' (seeded), 'earliest' (first to reach the count) or 'fewest_wins'
+
+# Member Cache Settings
+MEMBER_CACHE_STRATEGY = "voice"   # 'full' (chunk all guilds at startup), 'lazy' (no chunking) or 'voice' (voice members only)
+
+# Intents/Cache Profile Settings
+CACHE_PROFILE = "lean"   # 'default' (message content, 1000 cached messages) or 'lean' (no message content or message cache)
+
+# Discord API Settings
+SETUP_API_CONCURRENCY = 5   # Max concurrent thread-setup requests (e.g. adding members) across all groups
+
+# Interaction De-duplication Settings
+INTERACTION_DEDUP_SIZE = 2048   # Recent interaction ids remembered to drop redelivered interactions
+
+# Admin Command Settings
+ADMIN_AUTH_CACHE_SECONDS = 60   # Reuse a member's administrator check this long (role changes clear it sooner)
+
+# Dashboard API Settings (read-only JSON API served by the bot)
+API_HOST = "127.0.0.1"   # Interface to listen on
+API_PORT = 0             # Port to listen on (0 disables the API); set FRACTAL_API_TOKEN to require a bearer token
+STREAM_BUFFER_EVENTS = 64        # Live stream events buffered per subscriber before coalescing/dropping
+STREAM_KEEPALIVE_SECONDS = 15    # Idle interval between keepalive comments on live streams
+
+# Webhook Delivery Settings
+WEBHOOK_ENCODING = "json"        # 'json' or 'msgpack' (compact, integer ids; needs the msgpack package)
+# Send only fields changed since the fractal's previous event. Off by default:
+# the web app keeps the base for deltas per serverless instance, so behind a
+# platform like Vercel most delta batches land on an instance without it and
+# cost a 409 plus a full resend. Enable only for a single long-lived receiver.
+WEBHOOK_DELTAS = False
+WEBHOOK_BATCH_MAX = 50           # Max queued events sent in one request
+WEBHOOK_GZIP_MIN_BYTES = 4096    # Gzip request bodies at least this large
@@ -2,8 +2,14 @@ import discord
 import logging
 import asyncio
 import os
+import signal
+import time
 from discord.ext import commands
 from dotenv import load_dotenv
+from config.config import CACHE_PROFILE, MEMBER_CACHE_STRATEGY
+from utils.cache_profile import client_options, cache_stats
+
+STARTED_AT = time.perf_counter()
 
 # Load configuration
 load_dotenv()
@@ -19,14 +25,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger('bot')
 
-# Configure intents (all required for full functionality)
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.guilds = True
-
-# Initialize bot with command prefix
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Initialize bot with command prefix and the configured intents/cache profile
+bot = commands.Bot(command_prefix='!', **client_options(CACHE_PROFILE, MEMBER_CACHE_STRATEGY))
+startup_logged = False
 
 # Load cogs
 async def load_extensions():
@@ -41,9 +42,20 @@ async def load_extensions():
 
 @bot.event
 async def on_ready():
+    global startup_logged
     logger.info(f"=== Bot Starting Up ===")
     logger.info(f"Bot: {bot.user.name}#{bot.user.discriminator} (ID: {bot.user.id})")
     
+    # Startup cost of the member cache strategy (on_ready fires again on reconnects)
+    if not startup_logged:
+        startup_logged = True
+        stats = cache_stats(bot)
+        logger.info(
+            f"Ready in {time.perf_counter() - STARTED_AT:.1f}s with cache profile '{CACHE_PROFILE}' "
+            f"and member cache '{MEMBER_CACHE_STRATEGY}': {stats['guilds']} guilds, "
+            f"{stats['members']} cached members, RSS {stats['rss_mb']:.1f} MB"
+        )
+    
     # Generate invite link
     invite_link = discord.utils.oauth_url(
         bot.user.id,
@@ -80,9 +92,34 @@ async def on_ready():
         synced = await bot.tree.sync(guild=discord.Object(id=guild.id))
         logger.info(f"Commands synced to guild {guild.id}: {len(synced)} commands")
 
+# Graceful shutdown: hand off active fractals before disconnecting
+shutting_down = False
+
+async def shutdown():
+    global shutting_down
+    if shutting_down:
+        return
+    shutting_down = True
+    logger.info("Shutting down...")
+    
+    fractal_cog = bot.get_cog('FractalCog')
+    if fractal_cog:
+        try:
+            await fractal_cog.shutdown()
+        except Exception as e:
+            logger.error(f"Fractal shutdown failed: {e}", exc_info=True)
+    await bot.close()
+
 # Run bot
 async def main():
     async with bot:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, lambda: asyncio.create_task(shutdown()))
+            except NotImplementedError:
+                pass  # Not supported on Windows; Ctrl+C still closes the bot, just without the hand-off
+        
         await load_extensions()
         await bot.start(TOKEN)
 
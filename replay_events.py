@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Rebuild fractal group state from the event log
+
+Examples:
+    python3 replay_events.py --list
+    python3 replay_events.py 1234567890 --until-seq 420
+    python3 replay_events.py 1234567890 --until-time 2025-11-02T18:30:00
+    python3 replay_events.py --bench 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from config.config import EVENT_LOG_PATH, SNAPSHOT_DIR, SNAPSHOT_EVERY_EVENTS
+from cogs.fractal import events
+from cogs.fractal.events import EventLog
+
+
+def list_threads(log: EventLog):
+    """Print each thread in the log with its event count and last event"""
+    counts, last = Counter(), {}
+    for seq, ts, thread_id, kind, _ in log.read():
+        counts[thread_id] += 1
+        last[thread_id] = (seq, ts, kind)
+    for thread_id, count in counts.items():
+        seq, ts, kind = last[thread_id]
+        print(f"{thread_id}: {count} events, last #{seq} {kind} at {datetime.fromtimestamp(ts).isoformat()}")
+
+
+def bench(count: int, groups: int = 1000):
+    """Measure append throughput for votes spread over simulated groups on a temporary log"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(os.path.join(tmp, 'events.log'), os.path.join(tmp, 'snapshots'), SNAPSHOT_EVERY_EVENTS)
+        states = []
+        for thread_id in range(1, groups + 1):
+            created = {'guild_id': 1, 'name': f"bench {thread_id}", 'facilitator_id': 1,
+                       'members': [[i, f"member{i}"] for i in range(1, 7)]}
+            states.append(events.state_from_created(thread_id, created, time.time()))
+
+        start = time.perf_counter()
+        for i in range(count):
+            state = states[i % groups]
+            data = {'voter_id': i % 6 + 1, 'candidate_id': (i * 7) % 6 + 1}
+            now = round(time.time(), 3)
+            events.apply_event(state, events.VOTE_CAST, data, now)
+            log.append(state, events.VOTE_CAST, data, now)
+        elapsed = time.perf_counter() - start
+        log.close()
+
+        size = os.path.getsize(log.path)
+        print(f"{count} events over {groups} groups in {elapsed:.3f}s: {count / elapsed:,.0f} events/s, "
+              f"{elapsed / count * 1e6:.1f}us/event, {size / count:.1f} bytes/event")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild fractal state from the event log")
+    parser.add_argument('thread_id', nargs='?', type=int, help="Thread ID of the fractal to rebuild")
+    parser.add_argument('--until-seq', type=int, help="Stop after this event sequence number")
+    parser.add_argument('--until-time', help="Stop at this ISO timestamp (local time)")
+    parser.add_argument('--log', default=EVENT_LOG_PATH, help="Path to the event log")
+    parser.add_argument('--snapshots', default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument('--list', action='store_true', help="List fractals in the log")
+    parser.add_argument('--bench', type=int, metavar='N', help="Benchmark appending N events")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+
+    log = EventLog(args.log, args.snapshots, SNAPSHOT_EVERY_EVENTS, read_only=True)
+    if args.list or args.thread_id is None:
+        list_threads(log)
+        return
+
+    until_ts = datetime.fromisoformat(args.until_time).timestamp() if args.until_time else None
+    state = log.rebuild(args.thread_id, until_seq=args.until_seq, until_ts=until_ts)
+    if state is None:
+        print(f"No events found for thread {args.thread_id}")
+        return
+    print(json.dumps(state.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+The admin_command pipeline: authorization, group resolution, errors and metrics
+"""
+import asyncio
+import inspect
+from types import SimpleNamespace
+
+import discord
+
+from cogs.fractal.admin import (DENIED, ERROR, OK, REJECTED, AdminAuthorizer, AdminError, AdminMetrics,
+                                admin_command)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.deferred = 0
+
+    async def defer(self, **kwargs):
+        self.deferred += 1
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content, **kwargs):
+        self.messages.append(content)
+
+
+def make_interaction(admin=True):
+    user = SimpleNamespace(id=1, guild=SimpleNamespace(id=10), guild_permissions=SimpleNamespace(administrator=admin))
+    return SimpleNamespace(user=user, response=FakeResponse(), followup=FakeFollowup())
+
+
+def make_cog():
+    return SimpleNamespace(admin_auth=AdminAuthorizer(), admin_metrics=AdminMetrics(),
+                           active_groups={42: SimpleNamespace(name="group 42")}, handled=[])
+
+
+class Commands:
+    @admin_command("forcing round", group='required')
+    async def force(self, interaction, group, reason: str = None):
+        self.handled.append((group, reason))
+
+    @admin_command("ending fractal", group='optional')
+    async def end(self, interaction, group=None):
+        self.handled.append(group)
+
+    @admin_command("failing")
+    async def fail(self, interaction):
+        raise RuntimeError("disk full")
+
+    @admin_command("rejecting")
+    async def reject(self, interaction):
+        raise AdminError("Nothing to do.")
+
+
+def call(handler, cog, interaction, **options):
+    asyncio.run(handler(cog, interaction, **options))
+
+
+def outcomes(cog, name):
+    return cog.admin_metrics.commands[name].outcomes
+
+
+def test_signature_exposes_thread_id_before_optional_options():
+    params = list(inspect.signature(Commands.force).parameters.values())
+    assert [p.name for p in params] == ['self', 'interaction', 'thread_id', 'reason']
+    assert params[2].annotation is str and params[2].default is inspect.Parameter.empty
+
+    params = inspect.signature(Commands.end).parameters
+    assert list(params) == ['self', 'interaction', 'thread_id'] and params['thread_id'].default is None
+
+
+def test_thread_id_is_resolved_to_the_group():
+    cog, interaction = make_cog(), make_interaction()
+    call(Commands.force, cog, interaction, thread_id="42", reason="stuck")
+    call(Commands.end, cog, interaction)
+
+    assert cog.handled == [(cog.active_groups[42], "stuck"), None]
+    assert interaction.response.deferred == 2
+    assert outcomes(cog, 'force') == {OK: 1}
+
+
+def test_unknown_or_malformed_thread_ids_are_reported():
+    cog, interaction = make_cog(), make_interaction()
+    call(Commands.force, cog, interaction, thread_id="43")
+    call(Commands.force, cog, interaction, thread_id="abc")
+
+    assert cog.handled == []
+    assert interaction.followup.messages == ["❌ No active fractal found with that thread ID.",
+                                             "❌ Invalid thread ID format."]
+    assert outcomes(cog, 'force') == {REJECTED: 2}
+
+
+def test_non_admins_are_denied_before_the_handler_runs():
+    cog, interaction = make_cog(), make_interaction(admin=False)
+    call(Commands.force, cog, interaction, thread_id="42")
+
+    assert cog.handled == []
+    assert interaction.followup.messages == ["❌ You need administrator permissions to use this command."]
+    assert outcomes(cog, 'force') == {DENIED: 1}
+    assert cog.admin_metrics.summary()[0]['denied'] == 1
+
+
+def test_errors_are_reported_with_the_action():
+    cog, interaction = make_cog(), make_interaction()
+    call(Commands.reject, cog, interaction)
+    call(Commands.fail, cog, interaction)
+
+    assert interaction.followup.messages == ["❌ Nothing to do.", "❌ Error failing: disk full"]
+    assert outcomes(cog, 'reject') == {REJECTED: 1}
+    assert outcomes(cog, 'fail') == {ERROR: 1}
+
+
+def test_already_acknowledged_interactions_still_run():
+    async def defer(**kwargs):
+        raise discord.InteractionResponded(None)
+
+    cog, interaction = make_cog(), make_interaction()
+    interaction.response.defer = defer
+    call(Commands.end, cog, interaction, thread_id="42")
+    assert cog.handled == [cog.active_groups[42]]
+
+
+def test_admin_checks_are_cached_until_invalidated():
+    auth = AdminAuthorizer(ttl=60)
+    member = make_interaction().user
+    assert auth.is_admin(member)
+
+    member.guild_permissions.administrator = False
+    assert auth.is_admin(member)  # Cached
+    auth.invalidate(10, 1)
+    assert not auth.is_admin(member)
+    assert not auth.is_admin(SimpleNamespace(id=2))  # Not a guild member
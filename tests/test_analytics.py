@@ -0,0 +1,72 @@
+"""
+VoteHistory aggregates over hand-checked fractal records
+"""
+import pytest
+
+from cogs.fractal.analytics import VoteHistory
+
+RECORDS = [
+    {
+        'thread_id': 1, 'guild_id': 10, 'members': [100, 101, 102],
+        'votes': [[6, 100, 101, False], [6, 101, 100, False], [6, 100, 102, True], [6, 102, 102, False],
+                  [5, 100, 101, False], [5, 101, 101, False], [5, 102, 101, False]],
+        'rounds': [
+            {'level': 6, 'winner_id': 102, 'ballots': [[100, 102], [101, 100], [102, 102]]},
+            {'level': 5, 'winner_id': 101, 'ballots': [[100, 101], [101, 101], [102, 101]]},
+        ],
+    },
+    {
+        'thread_id': 2, 'guild_id': 10, 'members': [100, 103],
+        'votes': [[6, 100, 103, False], [6, 103, 103, False]],
+        'rounds': [{'level': 6, 'winner_id': 103, 'ballots': [[100, 103], [103, 103]]}],
+    },
+]
+
+
+def test_counts_and_rates():
+    history = VoteHistory(RECORDS)
+    assert history.fractal_count == 2
+    assert history.member_ids.tolist() == [100, 101, 102, 103]
+    assert history.vote_change_rate() == pytest.approx(1 / 9)
+    assert history.member_change_rates().tolist() == pytest.approx([0.25, 0, 0, 0])
+    # Level 6 of the first fractal took four events for three members
+    assert history.consensus_speed().tolist() == pytest.approx([4 / 3, 1, 1])
+
+
+def test_ballot_tensor_and_affinities():
+    history = VoteHistory(RECORDS)
+    tensor = history.vote_tensor()
+    assert tensor.shape == (4, 4, 6)
+    assert tensor.sum() == 8
+    assert tensor[0, 2, 5] == 1 and tensor[0, 1, 4] == 1  # 100 voted 102 at level 6, 101 at level 5
+
+    normalized = history.affinity_matrix(normalize=True)
+    assert normalized.sum(axis=1).tolist() == pytest.approx([1, 1, 1, 1])
+    assert normalized[0].tolist() == pytest.approx([0, 1 / 3, 1 / 3, 1 / 3])
+
+    pairs = history.top_affinities(limit=10)
+    assert sorted(pairs) == [(100, 101, 1), (100, 102, 1), (100, 103, 1), (101, 100, 1), (102, 101, 1)]
+    assert len(history.top_affinities(limit=2)) == 2
+
+
+def test_win_rates_and_summary():
+    history = VoteHistory(RECORDS)
+    fractal_rate, round_rate = history.win_rates()
+    assert fractal_rate.tolist() == [0, 0, 1, 1]  # Top level (6) winners
+    assert round_rate.tolist() == [0, 1, 1, 1]
+
+    summary = history.summary()
+    assert (summary['fractals'], summary['members'], summary['rounds'], summary['vote_events']) == (2, 4, 3, 9)
+    assert summary['consensus_speed'] == {'mean': round(10 / 9, 4), 'median': 1.0}
+    assert [row['member_id'] for row in summary['top_win_rates']] == [102, 103, 100, 101]
+    assert summary['top_win_rates'][2] == {'member_id': 100, 'fractal_win_rate': 0.0, 'round_win_rate': 0.0,
+                                           'participations': 2}
+
+
+def test_empty_history():
+    summary = VoteHistory([]).summary()
+    assert summary['fractals'] == 0 and summary['rounds'] == 0
+    assert summary['consensus_speed'] == {'mean': None, 'median': None}
+    assert summary['top_affinities'] == [] and summary['top_win_rates'] == []
+    assert VoteHistory([]).vote_tensor().size == 0
+    assert VoteHistory([]).vote_change_rate() == 0.0
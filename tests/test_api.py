@@ -0,0 +1,44 @@
+"""
+Dashboard API responses track group and history changes that aren't logged events
+"""
+import asyncio
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from cogs.fractal.api import FractalAPI
+from cogs.fractal.cog import FractalCog
+from cogs.fractal.state import FractalState
+
+
+def make_cog():
+    cog = SimpleNamespace(event_log=SimpleNamespace(seq=7), groups_version=0, active_groups={},
+                          fractal_history=[], win_counts={})
+    cog.add_group = lambda group: FractalCog.add_group(cog, group)
+    cog.remove_group = lambda thread_id: FractalCog.remove_group(cog, thread_id)
+    cog.record_history = lambda state: FractalCog.record_history(cog, state)
+    return cog
+
+
+def test_group_removal_and_history_invalidate_cached_responses():
+    async def run():
+        cog = make_cog()
+        state = FractalState.create(1, 10, "test", 100, {100: "a", 101: "b"})
+        cog.add_group(SimpleNamespace(state=state))
+
+        async with TestClient(TestServer(FractalAPI(cog, '127.0.0.1', 0).build_app())) as client:
+            response = await client.get('/api/groups')
+            etag = response.headers['ETag']
+            assert len((await response.json())['groups']) == 1
+            assert (await client.get('/api/groups', headers={'If-None-Match': etag})).status == 304
+
+            # A fractal ends: removed and archived with no further event logged
+            cog.record_history(cog.remove_group(1).state)
+
+            response = await client.get('/api/groups', headers={'If-None-Match': etag})
+            assert response.status == 200
+            assert (await response.json())['groups'] == []
+            history = await (await client.get('/api/history')).json()
+            assert [entry['threadId'] for entry in history['fractals']] == ['1']
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+"""
+Cog-level bookkeeping that doesn't need a connected bot
+"""
+import asyncio
+from types import SimpleNamespace
+
+from cogs.fractal import events
+from cogs.fractal.admin import AdminAuthorizer
+from cogs.fractal.cog import FractalCog
+from cogs.fractal.state import FractalState
+
+
+def test_win_counts_only_count_rounds_won():
+    state = FractalState.create(1, 10, "test", 100, {100: "a", 101: "b", 102: "c"})
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 101}, 1.0)
+    events.apply_event(state, events.ROUND_STARTED, {}, 1.0)
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 100}, 2.0)
+    events.apply_event(state, events.COMPLETED, {}, 3.0)
+    assert 102 in state.winners.values()  # Last place, assigned by finalize()
+
+    cog = SimpleNamespace(fractal_history=[], win_counts={}, groups_version=0)
+    FractalCog.record_history(cog, state)
+
+    assert cog.win_counts == {10: {101: 1, 100: 1}}
+
+
+class FakeFollowup:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content, **kwargs):
+        assert len(content) <= 2000
+        self.messages.append(content)
+
+
+def bulk_interaction(admin: bool):
+    async def defer(**kwargs):
+        pass
+    return SimpleNamespace(
+        user=SimpleNamespace(id=1, guild=SimpleNamespace(id=10),
+                             guild_permissions=SimpleNamespace(administrator=admin)),
+        guild=SimpleNamespace(id=10), channel=SimpleNamespace(),
+        response=SimpleNamespace(defer=defer), followup=FakeFollowup()
+    )
+
+
+def bulk_cog(launched):
+    async def check_voice_channel(channel, min_members, max_members):
+        return {'success': False, 'channel': channel, 'members': [],
+                'message': f"❌ Need at least {min_members} members in {channel.name} to start a fractal"}
+
+    async def create_fractal_group(*args):
+        launched.append(args)
+
+    return SimpleNamespace(
+        admin_auth=AdminAuthorizer(), accepting=True, logger=None,
+        settings=SimpleNamespace(get=lambda guild_id: SimpleNamespace(min_group_members=2, max_group_members=6)),
+        check_voice_channel=check_voice_channel, create_fractal_group=create_fractal_group,
+        _reserve_group_names=lambda guild_id, count: [f"group {i}" for i in range(count)]
+    )
+
+
+def voice_category(count):
+    channels = [SimpleNamespace(id=i, name=f"voice-channel-{i:03}", mention=f"<#{2000000000000000000 + i}>",
+                                voice_states={1: None}) for i in range(count)]
+    return SimpleNamespace(voice_channels=channels)
+
+
+def test_bulk_launch_requires_admin():
+    launched = []
+    interaction = bulk_interaction(admin=False)
+    asyncio.run(FractalCog.zaofractal_bulk.callback(bulk_cog(launched), interaction, category=voice_category(3)))
+
+    assert launched == []
+    assert interaction.followup.messages == ["❌ You need administrator permissions to use this command."]
+
+
+def test_bulk_launch_report_is_chunked():
+    launched = []
+    interaction = bulk_interaction(admin=True)
+    asyncio.run(FractalCog.zaofractal_bulk.callback(bulk_cog(launched), interaction, category=voice_category(40)))
+
+    report = "".join(interaction.followup.messages)
+    assert len(interaction.followup.messages) > 1
+    assert report.count("voice-channel-") == 40
+    assert "**Started 0 of 40 channels**" in report
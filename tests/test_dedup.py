@@ -0,0 +1,53 @@
+"""
+Redelivered interactions and repeated vote clicks are suppressed
+"""
+from cogs.fractal.dedup import DUPLICATE_INTERACTION, IN_FLIGHT_VOTE, REPEAT_VOTE, InteractionDeduper
+from cogs.fractal.state import FractalState
+
+
+def make_state():
+    return FractalState.create(1, 10, "test", 100, {100: "a", 101: "b", 102: "c"})
+
+
+def test_redelivered_interactions_are_dropped():
+    dedup = InteractionDeduper(capacity=3)
+    assert all(dedup.first_delivery(i) for i in (1, 2, 3))
+    assert not dedup.first_delivery(1)
+
+    dedup.first_delivery(4)  # Evicts 2, the least recently seen
+    assert dedup.first_delivery(2)
+    assert not dedup.first_delivery(1)
+    assert dedup.counters[DUPLICATE_INTERACTION] == 2
+
+
+def test_double_click_is_dropped_while_the_vote_is_in_flight():
+    dedup, state = InteractionDeduper(), make_state()
+    assert dedup.claim_vote(state, 100, 101)
+    assert not dedup.claim_vote(state, 100, 101)
+    assert dedup.claim_vote(state, 100, 102)  # A different candidate is a real change
+
+    dedup.release_vote(state, 100, 101)  # Stale release leaves the newer claim held
+    assert not dedup.claim_vote(state, 100, 102)
+    dedup.release_vote(state, 100, 102)
+    assert dedup.claim_vote(state, 100, 102)
+    assert dedup.counters[IN_FLIGHT_VOTE] == 2
+
+
+def test_repeating_the_recorded_vote_is_dropped():
+    dedup, state = InteractionDeduper(), make_state()
+    state.votes[100] = 101
+    assert not dedup.claim_vote(state, 100, 101)
+    assert dedup.claim_vote(state, 100, 102)
+    assert dedup.claim_vote(state, 101, 101)
+    assert dedup.counters[REPEAT_VOTE] == 1
+    assert dedup.suppressed == 1
+
+
+def test_claims_are_per_thread_and_level():
+    dedup, state = InteractionDeduper(), make_state()
+    other = FractalState.create(2, 10, "other", 100, {100: "a", 101: "b"})
+    assert dedup.claim_vote(state, 100, 101)
+    assert dedup.claim_vote(other, 100, 101)
+
+    state.level -= 1  # Round advanced while the old click was processing
+    assert dedup.claim_vote(state, 100, 101)
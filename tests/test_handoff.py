@@ -0,0 +1,66 @@
+"""
+Live groups and counters survive the handoff between cogs
+"""
+import json
+from types import SimpleNamespace
+
+from cogs.fractal import events, handoff
+from cogs.fractal.settings import ANNOUNCE_THREAD, GuildSettings
+from cogs.fractal.state import FractalState
+
+
+def played_state():
+    state = FractalState.create(1100000000000000001, 10, "test", 100, {100: "a", 101: "b", 102: "c", 103: "d"})
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 100, 'candidate_id': 101}, 1.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 102, 'candidate_id': 101}, 1.5)
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 101}, 2.0)
+    events.apply_event(state, events.ROUND_STARTED, {}, 2.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 103, 'candidate_id': 102}, 3.0)
+    events.apply_event(state, events.PAUSED, {}, 3.5)
+    return state
+
+
+def make_cog():
+    group = SimpleNamespace(state=played_state(), settings=GuildSettings(starting_level=4, announce_mode=ANNOUNCE_THREAD),
+                            current_voting_message=SimpleNamespace(id=555))
+    return SimpleNamespace(
+        active_groups={group.state.thread_id: group},
+        daily_counters={10: {'2026-10-19': 3}},
+        win_counts={10: {101: 2, 102: 1}},
+        fractal_history=[{'thread_id': 1, 'guild_id': 10, 'rounds': []}]
+    )
+
+
+def test_payload_round_trips_through_disk(tmp_path):
+    cog = make_cog()
+    path = str(tmp_path / 'handoff' / 'fractals.json')
+    handoff.write_handoff(path, handoff.export_cog(cog, handoff.RESTART))
+
+    payload = handoff.take_handoff(path)
+    assert payload['reason'] == handoff.RESTART
+    assert handoff.take_handoff(path) is None  # Only restored once
+
+    [entry] = payload['groups']
+    group = cog.active_groups[1100000000000000001]
+    state = FractalState.from_dict(entry['state'])
+    assert state.to_dict() == group.state.to_dict()
+    assert state.votes == {103: 102} and state.paused and state.winners == {6: 101}
+    assert state.vote_history == group.state.vote_history
+    assert GuildSettings(**entry['settings']) == group.settings
+    assert entry['ballot_message_id'] == 555
+
+    counters = handoff.import_counters(payload)
+    assert counters == {'daily_counters': cog.daily_counters, 'win_counts': cog.win_counts,
+                        'fractal_history': cog.fractal_history}
+
+
+def test_unreadable_or_foreign_payloads_are_discarded(tmp_path):
+    path = tmp_path / 'fractals.json'
+    path.write_text("{truncated")
+    assert handoff.take_handoff(str(path)) is None
+    assert not path.exists()
+
+    payload = handoff.export_cog(make_cog(), handoff.RELOAD)
+    path.write_text(json.dumps(dict(payload, version=handoff.HANDOFF_VERSION + 1)))
+    assert handoff.take_handoff(str(path)) is None
+    assert not path.exists()
@@ -0,0 +1,55 @@
+"""
+Admin group listings page within Discord's message limit
+"""
+import asyncio
+from types import SimpleNamespace
+
+from cogs.fractal.pagination import GroupListView, GroupQuery, SORTS
+from cogs.fractal.render import MESSAGE_LIMIT
+from cogs.fractal.state import FractalState
+
+
+def make_cog(count: int):
+    groups = {}
+    for thread_id in range(1, count + 1):
+        state = FractalState.create(thread_id, 10, f"group {thread_id}", 100, {100: "a"})
+        state.last_activity = thread_id
+        groups[thread_id] = SimpleNamespace(state=state)
+    return SimpleNamespace(active_groups=groups)
+
+
+def render_group(group, now):
+    # Long rows, so a full page of ten can't fit in one message
+    return f"**{group.state.name}** " + "x" * 400 + "\n"
+
+
+def test_pages_fit_and_cursor_only_skips_rows_shown():
+    async def run():
+        cog = make_cog(25)
+        view = GroupListView(cog, "Active", GroupQuery(sort='idle'), render_group, user_id=1)
+        seen = []
+        while True:
+            view.load()
+            text = view.render()
+            assert len(text) <= MESSAGE_LIMIT
+            assert len(view.page) < view.page_size
+            assert all(f"**{group.state.name}**" in text for group in view.page)
+            seen += [group.state.thread_id for group in view.page]
+            if not view.has_more:
+                break
+            view.starts.append(SORTS[view.query.sort][1](view.page[-1].state))  # As Next does
+        assert seen == list(range(1, 26))
+
+    asyncio.run(run())
+
+
+def test_notice_counts_toward_the_limit():
+    async def run():
+        view = GroupListView(make_cog(10), "Active", GroupQuery(), render_group, user_id=1)
+        view.load()
+        rows = len(view.page)
+        view.load(notice="✅ Ended fractal in <#1>\n\n" + "y" * 500)
+        assert len(view.render()) <= MESSAGE_LIMIT
+        assert len(view.page) < rows
+
+    asyncio.run(run())
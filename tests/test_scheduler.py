@@ -0,0 +1,100 @@
+"""
+RoundScheduler firing order, rescheduling and cancellation
+"""
+import asyncio
+
+from cogs.fractal.scheduler import RoundScheduler, REMINDER, DEADLINE
+
+
+def run_scheduler(setup, wait=0.25):
+    """Run ``setup(scheduler)`` against a started scheduler and return the fired timers in order"""
+    async def run():
+        fired = []
+
+        async def callback(thread_id, kind):
+            fired.append((thread_id, kind))
+
+        scheduler = RoundScheduler(callback)
+        scheduler.start()
+        await setup(scheduler)
+        await asyncio.sleep(wait)
+        scheduler.stop()
+        return fired, len(scheduler)
+
+    return asyncio.run(run())
+
+
+def test_timers_fire_in_deadline_order():
+    async def setup(scheduler):
+        scheduler.schedule_round(1, 0.15, reminder=0.05)
+        scheduler.schedule_round(2, 0.1)
+        scheduler.schedule_round(3, 0.02)
+
+    fired, pending = run_scheduler(setup)
+    assert fired == [(3, DEADLINE), (1, REMINDER), (2, DEADLINE), (1, DEADLINE)]
+    assert pending == 0
+
+
+def test_cancel_and_reschedule_drop_earlier_timers():
+    async def setup(scheduler):
+        scheduler.schedule_round(1, 0.05, reminder=0.02)
+        scheduler.schedule_round(2, 0.05)
+        assert len(scheduler) == 3
+        scheduler.cancel(1)
+        scheduler.schedule_round(2, 0.1)  # Replaces the first deadline
+        assert len(scheduler) == 1
+
+    fired, pending = run_scheduler(setup)
+    assert fired == [(2, DEADLINE)]
+    assert pending == 0
+
+
+def test_timer_armed_on_an_idle_scheduler_fires():
+    async def setup(scheduler):
+        await asyncio.sleep(0.02)  # Runner is parked waiting for the first timer
+        scheduler.schedule_round(1, 0.02)
+
+    fired, _ = run_scheduler(setup, wait=0.1)
+    assert fired == [(1, DEADLINE)]
+
+
+def test_zero_timeout_and_late_reminder_are_ignored():
+    async def setup(scheduler):
+        scheduler.schedule_round(1, 0)
+        scheduler.schedule_round(2, 0.03, reminder=0.05)  # Reminder after the deadline
+
+    fired, _ = run_scheduler(setup, wait=0.1)
+    assert fired == [(2, DEADLINE)]
+
+
+def test_failing_callback_does_not_stop_other_timers():
+    async def run():
+        fired = []
+
+        async def callback(thread_id, kind):
+            if thread_id == 1:
+                raise RuntimeError("boom")
+            fired.append(thread_id)
+
+        scheduler = RoundScheduler(callback)
+        scheduler.start()
+        scheduler.schedule_round(1, 0.01)
+        scheduler.schedule_round(2, 0.03)
+        await asyncio.sleep(0.1)
+        scheduler.stop()
+        return fired
+
+    assert asyncio.run(run()) == [2]
+
+
+def test_cancelled_timers_are_compacted():
+    async def setup(scheduler):
+        for thread_id in range(200):
+            scheduler.schedule_round(thread_id, 60)
+        for thread_id in range(190):
+            scheduler.cancel(thread_id)
+        assert len(scheduler) == 10
+        assert len(scheduler._heap) <= 2 * 10 + 64
+
+    fired, pending = run_scheduler(setup, wait=0)
+    assert fired == [] and pending == 10
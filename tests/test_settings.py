@@ -0,0 +1,80 @@
+"""
+Guild settings validation, bounds and persistence
+"""
+import json
+
+import pytest
+
+from cogs.fractal.settings import (ANNOUNCE_CHANNEL, DEFAULTS, GROUP_SIZE_LIMIT, LEVEL_LIMIT, TIMER_LIMIT_SECONDS,
+                                   GuildSettings, SettingsStore)
+
+
+@pytest.mark.parametrize('changes', [
+    {'min_group_members': 1},
+    {'min_group_members': 5, 'max_group_members': 4},
+    {'max_group_members': GROUP_SIZE_LIMIT + 1},
+    {'starting_level': 0},
+    {'starting_level': LEVEL_LIMIT + 1},
+    {'announce_mode': 'nowhere'},
+    {'announce_mode': ANNOUNCE_CHANNEL},
+    {'round_timeout_seconds': -1},
+    {'round_reminder_seconds': TIMER_LIMIT_SECONDS + 1},
+    {'round_timeout_seconds': 60, 'round_reminder_seconds': 60},
+])
+def test_invalid_settings_are_rejected(changes):
+    with pytest.raises(ValueError):
+        GuildSettings(**changes).validate()
+
+
+def test_bounds_are_inclusive():
+    GuildSettings(min_group_members=2, max_group_members=GROUP_SIZE_LIMIT, starting_level=LEVEL_LIMIT,
+                  announce_mode=ANNOUNCE_CHANNEL, results_channel_id=5,
+                  round_timeout_seconds=TIMER_LIMIT_SECONDS, round_reminder_seconds=TIMER_LIMIT_SECONDS - 1).validate()
+    GuildSettings(round_timeout_seconds=0, round_reminder_seconds=600).validate()  # Reminder without a deadline
+
+
+def test_update_persists_only_overrides(tmp_path):
+    path = tmp_path / 'settings.json'
+    store = SettingsStore(str(path))
+    assert store.get(10) is DEFAULTS
+
+    updated = store.update(10, starting_level=4, max_group_members=DEFAULTS.max_group_members)
+    assert store.get(10) == updated and updated.starting_level == 4
+    assert store.get(10) is store.get(10)  # Built once, then served from the cache
+    assert json.loads(path.read_text()) == {'10': {'starting_level': 4}}
+    assert store.get(11) is DEFAULTS
+
+    assert SettingsStore(str(path)).get(10) == updated
+
+
+def test_invalid_update_changes_nothing(tmp_path):
+    path = tmp_path / 'settings.json'
+    store = SettingsStore(str(path))
+    store.update(10, starting_level=4)
+
+    with pytest.raises(ValueError):
+        store.update(10, starting_level=LEVEL_LIMIT + 1)
+    assert store.get(10).starting_level == 4
+    assert json.loads(path.read_text()) == {'10': {'starting_level': 4}}
+
+
+def test_reset_drops_a_channel_mode_without_its_channel(tmp_path):
+    store = SettingsStore(str(tmp_path / 'settings.json'))
+    store.update(10, announce_mode=ANNOUNCE_CHANNEL, results_channel_id=5, starting_level=4)
+
+    settings = store.reset(10, 'results_channel_id')
+    assert settings.announce_mode == DEFAULTS.announce_mode and settings.starting_level == 4
+    assert store.reset(10) is DEFAULTS
+    assert store.get(10) is DEFAULTS
+
+
+def test_bad_overrides_in_the_file_fall_back_to_defaults(tmp_path):
+    path = tmp_path / 'settings.json'
+    path.write_text(json.dumps({'10': {'starting_level': 99}, '11': {'starting_level': 3, 'unknown': 1}}))
+    store = SettingsStore(str(path))
+    assert store.get(10) is DEFAULTS
+    assert store.get(11).starting_level == 3
+
+    path.write_text("{not json")
+    store.reload()
+    assert store.get(11) is DEFAULTS
@@ -0,0 +1,40 @@
+"""
+FractalState mutations applied through the event interpreter
+"""
+from cogs.fractal import events
+from cogs.fractal.state import FractalState
+
+
+def make_state():
+    return FractalState.create(1, 10, "test", 100, {100: "a", 101: "b", 102: "c", 103: "d"})
+
+
+def test_remove_member_drops_votes_for_them():
+    state = make_state()
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 100, 'candidate_id': 101}, 1.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 102, 'candidate_id': 101}, 1.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 101, 'candidate_id': 103}, 1.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 103, 'candidate_id': 102}, 1.0)
+
+    assert events.apply_event(state, events.MEMBER_REMOVED, {'user_id': 101}, 2.0)
+
+    assert state.votes == {103: 102}
+    assert 101 not in state.tally()
+    assert sorted(state.non_voters()) == [100, 102]
+
+
+def test_restart_discards_earlier_rounds():
+    state = make_state()
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 100, 'candidate_id': 101}, 1.0)
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 101}, 2.0)
+    events.apply_event(state, events.ROUND_STARTED, {}, 2.0)
+    events.apply_event(state, events.VOTE_CAST, {'voter_id': 100, 'candidate_id': 102}, 3.0)
+
+    events.apply_event(state, events.RESTARTED, {'level': 6}, 4.0)
+
+    assert state.level == 6
+    assert state.winners == {} and state.votes == {}
+    assert state.round_history == [] and state.vote_history == []
+    assert state.round_events() == []
+    assert state.candidate_ids == state.member_ids
+    assert FractalState.from_dict(state.to_dict()).to_history_record()['rounds'] == []
@@ -0,0 +1,97 @@
+"""
+StreamHub keeps slow subscribers bounded under bursts of events
+"""
+import asyncio
+import json
+
+from cogs.fractal import events
+from cogs.fractal.state import FractalState
+from cogs.fractal.stream import StreamHub
+
+SUBSCRIBERS = 2000
+BUFFER_LIMIT = 16
+BURST = 200
+
+
+def make_state(thread_id: int) -> FractalState:
+    return FractalState.create(thread_id, 10, f"group {thread_id}", 100, {100 + i: f"member{i}" for i in range(6)})
+
+
+def parse(batch: bytes):
+    """(event, data) pairs from a batch of SSE frames"""
+    frames = []
+    for frame in batch.decode().strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        frames.append((fields['event'], json.loads(fields['data'])))
+    return frames
+
+
+def publish_votes(hub, state, count, seq=0):
+    for i in range(count):
+        data = {'voter_id': 100 + i % 6, 'candidate_id': 100 + (i * 5) % 6}
+        events.apply_event(state, events.VOTE_CAST, data, float(i))
+        seq += 1
+        hub.publish(state, events.VOTE_CAST, data, float(i), seq)
+    return seq
+
+
+def test_vote_burst_coalesces_for_slow_subscribers():
+    async def run():
+        hub = StreamHub(BUFFER_LIMIT)
+        states = [make_state(thread_id) for thread_id in (1, 2, 3)]
+        subscribers = [hub.subscribe(states[i % 3].thread_id if i % 2 else None) for i in range(SUBSCRIBERS)]
+        assert len(hub) == SUBSCRIBERS
+
+        # Nobody reads while the burst is published
+        seq = 0
+        for state in states:
+            seq = publish_votes(hub, state, BURST, seq)
+
+        for subscriber in subscribers:
+            assert len(subscriber.buffer) <= BUFFER_LIMIT
+            assert subscriber.dropped == 0  # Votes replace older votes instead of being dropped
+
+        # An all-thread subscriber ends with the latest tally of every thread
+        frames = parse(await subscribers[0].frames(keepalive=1).__anext__())
+        latest = {}
+        for kind, payload in frames:
+            assert kind == events.VOTE_CAST
+            latest[payload['threadId']] = payload['tally']
+        for state in states:
+            assert latest[str(state.thread_id)] == {str(cid): n for cid, n in state.tally().items()}
+        assert not subscribers[0].buffer
+
+    asyncio.run(run())
+
+
+def test_overflowing_slow_subscribers_get_lagged():
+    async def run():
+        hub = StreamHub(BUFFER_LIMIT)
+        state = make_state(1)
+        subscribers = [hub.subscribe(1) for _ in range(SUBSCRIBERS)]
+
+        # Round changes can't be coalesced, so a full buffer drops the oldest
+        for i in range(BURST):
+            events.apply_event(state, events.PAUSED, {}, float(i))
+            hub.publish(state, events.PAUSED, {}, float(i), i + 1)
+
+        for subscriber in subscribers:
+            assert len(subscriber.buffer) == BUFFER_LIMIT
+            assert subscriber.dropped == BURST - BUFFER_LIMIT
+
+        frames = parse(await subscribers[-1].frames(keepalive=1).__anext__())
+        assert frames[0] == ('lagged', {'dropped': BURST - BUFFER_LIMIT})
+        assert len(frames) == BUFFER_LIMIT + 1
+        assert subscribers[-1].dropped == 0
+
+        # Subscribers that caught up are unaffected by ones still behind
+        hub.publish(state, events.RESUMED, {}, 0.0, BURST + 1)
+        frames = parse(await subscribers[-1].frames(keepalive=1).__anext__())
+        assert [kind for kind, _ in frames] == [events.RESUMED]
+        assert len(subscribers[0].buffer) == BUFFER_LIMIT
+
+        for subscriber in subscribers:
+            hub.unsubscribe(subscriber)
+        assert len(hub) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+"""
+Seeded tie-breaks are deterministic and follow the configured policy
+"""
+from cogs.fractal.tiebreak import RANDOM, EARLIEST, FEWEST_WINS, break_tie, derive_seed
+
+VOTES = {1: 10, 2: 11, 3: 10, 4: 11}
+
+
+def test_same_inputs_give_the_same_result():
+    first = break_tie([11, 10], 99, 6, VOTES)
+    again = break_tie([10, 11], 99, 6, dict(reversed(list(VOTES.items()))))
+    assert first == again
+    assert first.tied == (10, 11)
+    assert first.seed == derive_seed(99, 6, VOTES)
+    assert first.to_dict() == {'policy': RANDOM, 'seed': first.seed, 'tied': [10, 11]}
+
+
+def test_seed_depends_on_thread_level_and_votes():
+    seed = derive_seed(99, 6, VOTES)
+    assert derive_seed(98, 6, VOTES) != seed
+    assert derive_seed(99, 5, VOTES) != seed
+    assert derive_seed(99, 6, {**VOTES, 4: 10}) != seed
+
+
+def test_random_choice_covers_every_tied_candidate():
+    winners = {break_tie([10, 11, 12], thread_id, 6, VOTES).winner_id for thread_id in range(200)}
+    assert winners == {10, 11, 12}
+
+
+def test_earliest_picks_first_to_reach_the_count():
+    # 11 reaches two votes first even though 10 was voted for first
+    events = [(1, 10), (2, 11), (4, 11), (3, 10)]
+    assert break_tie([10, 11], 99, 6, VOTES, EARLIEST, events).winner_id == 11
+
+    # A changed vote takes its candidate's count back down: 10 only returns to one vote
+    events = [(1, 10), (1, 11), (2, 10), (3, 11), (4, 10)]
+    votes = {1: 11, 2: 10, 3: 11, 4: 10}
+    assert break_tie([10, 11], 99, 6, votes, EARLIEST, events).winner_id == 11
+
+
+def test_fewest_wins_prefers_fewer_round_wins():
+    tie_break = break_tie([10, 11, 12], 99, 6, VOTES, FEWEST_WINS, win_counts={10: 2, 11: 1, 12: 1})
+    assert tie_break.winner_id in (11, 12)
+    assert tie_break.winner_id == break_tie([11, 12], 99, 6, VOTES).winner_id  # Seeded among the rest
+
+    assert break_tie([10, 11], 99, 6, VOTES, FEWEST_WINS, win_counts={10: 3}).winner_id == 11
+
+
+def test_policies_fall_back_to_the_seeded_choice():
+    seeded = break_tie([10, 11], 99, 6, VOTES).winner_id
+    assert break_tie([10, 11], 99, 6, VOTES, FEWEST_WINS).winner_id == seeded  # No win counts
+    assert break_tie([10, 11], 99, 6, {}, EARLIEST).winner_id == break_tie([10, 11], 99, 6, {}).winner_id
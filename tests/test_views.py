@@ -0,0 +1,88 @@
+"""
+Ballot views are released from discord.py's view store as rounds advance
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import discord
+
+from cogs.fractal.group import FractalGroup
+
+ROUNDS = 200
+
+
+class FakeMessage:
+    """Message that registers views with the connection state the way discord.py does"""
+
+    def __init__(self, state, message_id: int):
+        self._state = state
+        self.id = message_id
+
+    async def edit(self, view=None, **kwargs):
+        if view is not None and not view.is_finished():
+            self._state.store_view(view, self.id)
+        return self
+
+
+class FakeThread:
+    def __init__(self, state):
+        self._state = state
+        self._ids = itertools.count(1000)
+        self.id = 1
+        self.name = "ZAO Fractal: test"
+        self.guild = SimpleNamespace(id=10, get_member=lambda user_id: None)
+
+    async def send(self, content=None, view=None, **kwargs):
+        message = FakeMessage(self._state, next(self._ids))
+        if view is not None and not view.is_finished() and view.is_dispatchable():
+            self._state.store_view(view, message.id)
+        return message
+
+
+def make_group(bot):
+    members = [SimpleNamespace(id=100 + i, display_name=f"member{i}") for i in range(6)]
+    thread = FakeThread(bot._connection)
+    cog = SimpleNamespace(bot=bot, settings=None, event_log=None, stream=None, round_scheduler=None)
+    return FractalGroup(thread, members, members[0], cog)
+
+
+def test_view_store_stays_bounded_across_rounds():
+    async def run():
+        bot = discord.Client(intents=discord.Intents.none())
+        view_store = bot._connection._view_store
+        group = make_group(bot)
+
+        for _ in range(ROUNDS):
+            await group.start_new_round()
+            # Only the live ballot is registered, whatever the number of rounds so far
+            assert len(view_store._synced_message_views) <= 1
+            assert len(view_store._views) <= 1
+
+        live_id = group.current_voting_message.id
+        assert list(view_store._synced_message_views) == [live_id]
+
+        # Closing the group releases the last ballot too
+        group.release_views()
+        assert len(view_store._synced_message_views) == 0
+        assert len(view_store._views) == 0
+        await bot.close()
+
+    asyncio.run(run())
+
+
+def test_stale_ballot_rejects_votes():
+    async def run():
+        bot = discord.Client(intents=discord.Intents.none())
+        group = make_group(bot)
+
+        await group.start_new_round()
+        first = group.current_view
+        await group.start_new_round()
+
+        assert first.is_finished()
+        assert first.get_rejection() is not None
+        assert group.current_view.get_rejection() is None
+        await bot.close()
+
+    asyncio.run(run())
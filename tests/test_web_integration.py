@@ -0,0 +1,38 @@
+"""
+Webhook payloads built from fractal state
+"""
+import asyncio
+from types import SimpleNamespace
+
+from cogs.fractal import events
+from cogs.fractal.state import FractalState
+from utils.web_integration import WebIntegration
+
+
+def test_completion_ranks_only_rounds_won():
+    state = FractalState.create(1, 10, "test", 100, {100: "a", 101: "b", 102: "c"})
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 101}, 1.0)
+    events.apply_event(state, events.ROUND_STARTED, {}, 1.0)
+    events.apply_event(state, events.ROUND_WON, {'winner_id': 100}, 2.0)
+    events.apply_event(state, events.COMPLETED, {}, 3.0)
+
+    sent = []
+
+    async def send_webhook(event_type, fractal_id, data):
+        sent.append((event_type, fractal_id, data))
+        return True
+
+    integration = WebIntegration()
+    integration.send_webhook = send_webhook
+    asyncio.run(integration.notify_fractal_complete(SimpleNamespace(state=state)))
+
+    (event_type, fractal_id, data), = sent
+    assert event_type == 'fractal_complete' and fractal_id == 1
+    # Last place (102) was assigned by finalize() without a round, so it isn't ranked,
+    # the same as the stats backfill ranking voting_rounds rows
+    assert data['results'] == [
+        {'discordId': 101, 'rank': 1, 'level': 6},
+        {'discordId': 100, 'rank': 2, 'level': 5},
+    ]
+    assert data['totalRounds'] == 2
+    assert sorted(data['participantDiscordIds']) == [100, 101, 102]
@@ -0,0 +1,73 @@
+import discord
+from utils.member_cache import member_cache_options
+from utils.process_stats import get_rss_mb
+
+# Cache/intents profiles
+DEFAULT = 'default'  # discord.py defaults: default intents plus message content, 1000 cached messages
+LEAN = 'lean'        # Only the gateway events and caches the bot uses
+
+PROFILES = (DEFAULT, LEAN)
+
+def build_intents(profile):
+    """
+    Build the gateway intents for a cache profile
+
+    The lean profile keeps guilds (threads and channels), voice states
+    (voice channel membership) and members (needed by query_members).
+    Message content is dropped because every command is a slash command.
+
+    Args:
+        profile (str): One of PROFILES
+
+    Returns:
+        discord.Intents: Intents to pass to commands.Bot
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown cache profile '{profile}', expected one of {PROFILES}")
+
+    if profile == DEFAULT:
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.members = True
+        intents.guilds = True
+        return intents
+
+    return discord.Intents(guilds=True, voice_states=True, members=True)
+
+def client_options(profile, member_strategy):
+    """
+    Build all cache-related commands.Bot options for a profile and member strategy
+
+    Args:
+        profile (str): One of PROFILES
+        member_strategy (str): One of utils.member_cache.STRATEGIES
+
+    Returns:
+        dict: intents, max_messages, member_cache_flags and chunk_guilds_at_startup options
+    """
+    options = member_cache_options(member_strategy)
+    options['intents'] = build_intents(profile)
+    # None disables the message cache entirely (0 would fall back to discord.py's default of 1000)
+    options['max_messages'] = 1000 if profile == DEFAULT else None
+    return options
+
+def cache_stats(bot):
+    """
+    Measure what the client is currently holding in memory
+
+    Args:
+        bot (commands.Bot): Running bot
+
+    Returns:
+        dict: Cached guild, channel, thread, member, user and message counts plus RSS in MB
+    """
+    return {
+        'guilds': len(bot.guilds),
+        'channels': sum(len(guild.channels) for guild in bot.guilds),
+        'threads': sum(len(guild.threads) for guild in bot.guilds),
+        'members': sum(len(guild.members) for guild in bot.guilds),
+        'member_count': sum(guild.member_count or 0 for guild in bot.guilds),
+        'users': len(bot.users),
+        'messages': len(bot.cached_messages),
+        'rss_mb': get_rss_mb()
+    }
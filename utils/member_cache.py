@@ -0,0 +1,69 @@
+import asyncio
+import discord
+import logging
+
+logger = logging.getLogger('bot')
+
+# Member cache strategies
+FULL = 'full'    # Chunk every guild at startup and cache all members
+LAZY = 'lazy'    # No startup chunking; cache members as they are seen
+VOICE = 'voice'  # Only cache members while they are in a voice channel
+
+STRATEGIES = (FULL, LAZY, VOICE)
+
+# Discord accepts at most 100 user IDs per member query
+QUERY_BATCH_SIZE = 100
+
+def member_cache_options(strategy):
+    """
+    Build discord.py client options for a member cache strategy
+    
+    Args:
+        strategy (str): One of STRATEGIES
+    
+    Returns:
+        dict: member_cache_flags and chunk_guilds_at_startup options for commands.Bot
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown member cache strategy '{strategy}', expected one of {STRATEGIES}")
+    
+    if strategy == FULL:
+        return {'member_cache_flags': discord.MemberCacheFlags.all(), 'chunk_guilds_at_startup': True}
+    
+    if strategy == LAZY:
+        return {'member_cache_flags': discord.MemberCacheFlags.all(), 'chunk_guilds_at_startup': False}
+    
+    flags = discord.MemberCacheFlags.none()
+    flags.voice = True
+    return {'member_cache_flags': flags, 'chunk_guilds_at_startup': False}
+
+async def fetch_voice_members(channel):
+    """
+    Get the members connected to a voice channel without relying on a chunked cache
+    
+    Voice states are always tracked, so the connected user IDs are known even
+    when their members aren't cached; any missing ones are fetched on demand.
+    
+    Args:
+        channel (discord.VoiceChannel): Voice channel to inspect
+    
+    Returns:
+        list: discord.Member objects for everyone in the channel
+    """
+    guild = channel.guild
+    members, missing = [], []
+    for user_id in channel.voice_states:
+        member = guild.get_member(user_id)
+        if member:
+            members.append(member)
+        else:
+            missing.append(user_id)
+    
+    for start in range(0, len(missing), QUERY_BATCH_SIZE):
+        batch = missing[start:start + QUERY_BATCH_SIZE]
+        try:
+            members.extend(await guild.query_members(user_ids=batch, limit=len(batch), cache=True))
+        except (discord.ClientException, discord.HTTPException, asyncio.TimeoutError) as e:
+            logger.warning(f"Failed to query {len(batch)} voice members in {guild.name}: {e}")
+    
+    return members
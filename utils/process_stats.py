@@ -0,0 +1,19 @@
+import os
+import resource
+import sys
+
+def get_rss_mb():
+    """
+    Get the current resident set size of this process
+    
+    Returns:
+        float: RSS in megabytes (peak RSS where current RSS isn't available)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
@@ -1,101 +1,197 @@
 import aiohttp
 import asyncio
+import json
 import logging
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List
+from config.config import WEBHOOK_ENCODING, WEBHOOK_DELTAS, WEBHOOK_BATCH_MAX, WEBHOOK_GZIP_MIN_BYTES
+from utils import webhook_codec
+from utils.webhook_codec import DeltaTracker, encode_batch, sign
+
+# Events after which a fractal sends nothing more
+FINAL_EVENTS = ('fractal_complete', 'fractal_reaped')
+
+# Seconds to wait before each retry of a failed batch
+RETRY_DELAYS = (1, 2, 4)
+
+DEFAULT_SECRET = 'your_webhook_secret'
 
 class WebIntegration:
-    """Integration with the Vercel web application"""
+    """Integration with the Vercel web application
+    
+    Events are queued and sent in order by one background task, batching
+    whatever has queued up into a single request. Snowflakes are integers
+    in msgpack bodies and strings in JSON ones. Each request body is signed
+    with HMAC-SHA256 over a timestamp and nonce so the web app can reject
+    forged, stale and replayed requests.
+    """
     
     def __init__(self):
         self.webhook_url = os.getenv('WEB_WEBHOOK_URL', 'https://your-app.vercel.app/api/webhook')
-        self.webhook_secret = os.getenv('WEBHOOK_SECRET', 'your_webhook_secret')
+        self.webhook_secret = os.getenv('WEBHOOK_SECRET', DEFAULT_SECRET)
         self.logger = logging.getLogger('bot')
+        if self.webhook_secret in ('', DEFAULT_SECRET):
+            self.logger.warning("WEBHOOK_SECRET is not set; webhooks are signed with the public default secret")
+        self._secret = self.webhook_secret.encode()
+        self.encoding = WEBHOOK_ENCODING
+        if self.encoding == webhook_codec.MSGPACK and webhook_codec.msgpack is None:
+            self.logger.warning("msgpack is not installed; sending webhooks as JSON")
+            self.encoding = webhook_codec.JSON
+        self.deltas = DeltaTracker() if WEBHOOK_DELTAS else None
+        self._queue = asyncio.Queue()
+        self._sender = None
+        self._session = None
+    
+    async def send_webhook(self, event_type: str, fractal_id: int, data: Dict[str, Any]) -> bool:
+        """Queue a webhook to the web application; events are delivered in order"""
+        final = event_type in FINAL_EVENTS
+        if self.deltas:
+            seq, base_seq, full, delta = self.deltas.track(fractal_id, data, final)
+        else:
+            seq, base_seq, full, delta = 0, None, data, data
+        
+        self._queue.put_nowait({
+            'fractal_id': fractal_id,
+            'event': event_type,
+            'seq': seq,
+            'base_seq': base_seq,
+            'full': full,
+            'delta': delta
+        })
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._run())
+        return True
     
-    async def send_webhook(self, event_type: str, fractal_id: str, data: Dict[str, Any]) -> bool:
-        """Send webhook to web application"""
+    async def flush(self, timeout: float = 10) -> bool:
+        """Wait until every queued webhook has been delivered (or given up on)"""
         try:
-            payload = {
-                'fractalId': fractal_id,
-                'event': event_type,
-                'data': data
-            }
-            
-            headers = {
-                'Authorization': f'Bearer {self.webhook_secret}',
-                'Content-Type': 'application/json'
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.webhook_url, 
-                    json=payload, 
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Gave up waiting for {self._queue.qsize()} queued webhooks")
+            return False
+    
+    async def close(self):
+        if self._sender:
+            self._sender.cancel()
+            self._sender = None
+        if self._session:
+            await self._session.close()
+            self._session = None
+    
+    async def _run(self):
+        """Send queued events in batches of whatever is waiting, oldest first"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < WEBHOOK_BATCH_MAX and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                self.logger.error(f"Webhook error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _deliver(self, batch: List[Dict]) -> bool:
+        """POST a batch, resending affected fractals in full when the receiver asks to resync"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        
+        resync = set()
+        attempt = 0
+        while True:
+            body, headers = encode_batch(batch, self.encoding, resync, WEBHOOK_GZIP_MIN_BYTES)
+            headers.update(sign(self._secret, body))
+            try:
+                async with self._session.post(self.webhook_url, data=body, headers=headers) as response:
                     if response.status == 200:
-                        self.logger.info(f"Webhook sent successfully: {event_type} for fractal {fractal_id}")
+                        self.logger.info(f"Webhook batch sent: {len(batch)} events, {len(body)} bytes ({self.encoding})")
                         return True
-                    else:
-                        self.logger.error(f"Webhook failed: {response.status} - {await response.text()}")
+                    
+                    if response.status == 409 and not resync:
+                        # Receiver lacks the base state for some deltas; resend those fractals in full
+                        try:
+                            resync = {int(f) for f in (await response.json()).get('resync', [])}
+                        except (aiohttp.ContentTypeError, json.JSONDecodeError, ValueError, TypeError):
+                            resync = set()
+                        resync = resync or {item['fractal_id'] for item in batch}
+                        continue
+                    
+                    if response.status == 415 and self.encoding != webhook_codec.JSON:
+                        self.logger.warning("Web app doesn't accept msgpack webhooks; falling back to JSON")
+                        self.encoding = webhook_codec.JSON
+                        continue
+                    
+                    self.logger.error(f"Webhook failed: {response.status} - {await response.text()}")
+                    if response.status < 500:
                         return False
-                        
-        except asyncio.TimeoutError:
-            self.logger.error(f"Webhook timeout for {event_type}")
-            return False
-        except Exception as e:
-            self.logger.error(f"Webhook error: {e}")
-            return False
+            except asyncio.TimeoutError:
+                self.logger.error(f"Webhook timeout for batch of {len(batch)} events")
+            except aiohttp.ClientError as e:
+                self.logger.error(f"Webhook error: {e}")
+            
+            if attempt >= len(RETRY_DELAYS):
+                self.logger.error(f"Dropping webhook batch of {len(batch)} events after {attempt + 1} attempts")
+                return False
+            await asyncio.sleep(RETRY_DELAYS[attempt])
+            attempt += 1
     
     async def notify_fractal_started(self, fractal_group) -> bool:
         """Notify web app that a fractal has started"""
+        state = fractal_group.state
         data = {
-            'threadId': str(fractal_group.thread.id),
-            'name': fractal_group.thread.name,
-            'guildId': str(fractal_group.thread.guild.id),
-            'facilitatorDiscordId': str(fractal_group.facilitator.id),
-            'participantDiscordIds': [str(member.id) for member in fractal_group.members],
-            'currentLevel': fractal_group.current_level
+            'threadId': state.thread_id,
+            'name': state.name,
+            'guildId': state.guild_id,
+            'facilitatorDiscordId': state.facilitator_id,
+            'participantDiscordIds': list(state.member_ids),
+            'currentLevel': state.level
         }
-        return await self.send_webhook('fractal_started', str(fractal_group.thread.id), data)
+        return await self.send_webhook('fractal_started', state.thread_id, data)
     
-    async def notify_vote_cast(self, fractal_group, voter, candidate) -> bool:
+    async def notify_vote_cast(self, fractal_group, voter_id: int, candidate_id: int) -> bool:
         """Notify web app that a vote was cast"""
+        state = fractal_group.state
         data = {
-            'voterId': str(voter.id),
-            'candidateId': str(candidate.id),
-            'level': fractal_group.current_level,
-            'totalVotes': len(fractal_group.votes)
+            'voterId': voter_id,
+            'candidateId': candidate_id,
+            'level': state.level,
+            'totalVotes': len(state.votes)
         }
-        return await self.send_webhook('vote_cast', str(fractal_group.thread.id), data)
+        return await self.send_webhook('vote_cast', state.thread_id, data)
     
-    async def notify_round_complete(self, fractal_group, winner) -> bool:
+    async def notify_round_complete(self, fractal_group, winner_id: int) -> bool:
         """Notify web app that a round is complete"""
+        state = fractal_group.state
         data = {
-            'level': fractal_group.current_level,
-            'winnerId': str(winner.id),
-            'totalVotes': len(fractal_group.votes),
+            'level': state.level,
+            'winnerId': winner_id,
+            'totalVotes': len(state.votes),
             'voteDistribution': self._get_vote_distribution(fractal_group)
         }
-        return await self.send_webhook('round_complete', str(fractal_group.thread.id), data)
+        return await self.send_webhook('round_complete', state.thread_id, data)
     
     async def notify_fractal_complete(self, fractal_group) -> bool:
         """Notify web app that a fractal is complete"""
-        # Build results array with final rankings
+        state = fractal_group.state
+        # Rank the rounds won by vote, as the web app's stats backfill does
+        # from its voting_rounds rows
+        rounds = state.round_results()
         results = []
-        for level, winner in sorted(fractal_group.winners.items(), reverse=True):
-            rank = 7 - level  # Convert level to rank (6->1st, 5->2nd, etc.)
+        for rank, (level, winner_id) in enumerate(rounds, 1):
             results.append({
-                'discordId': str(winner.id),
+                'discordId': winner_id,
                 'rank': rank,
                 'level': level
             })
         
         data = {
             'results': results,
-            'totalRounds': len(fractal_group.winners)
+            'participantDiscordIds': list(state.member_ids),  # Everyone counts towards participation stats
+            'totalRounds': len(rounds)
         }
-        return await self.send_webhook('fractal_complete', str(fractal_group.thread.id), data)
+        return await self.send_webhook('fractal_complete', state.thread_id, data)
     
     async def notify_fractal_paused(self, fractal_group) -> bool:
         """Notify web app that a fractal was paused"""
@@ -103,7 +199,7 @@ class WebIntegration:
             'currentLevel': fractal_group.current_level,
             'pausedAt': fractal_group.current_level
         }
-        return await self.send_webhook('fractal_paused', str(fractal_group.thread.id), data)
+        return await self.send_webhook('fractal_paused', fractal_group.state.thread_id, data)
     
     async def notify_fractal_resumed(self, fractal_group) -> bool:
         """Notify web app that a fractal was resumed"""
@@ -111,17 +207,20 @@ class WebIntegration:
             'currentLevel': fractal_group.current_level,
             'resumedAt': fractal_group.current_level
         }
-        return await self.send_webhook('fractal_resumed', str(fractal_group.thread.id), data)
+        return await self.send_webhook('fractal_resumed', fractal_group.state.thread_id, data)
+    
+    async def notify_fractal_reaped(self, fractal_group, reason: str) -> bool:
+        """Notify web app that an abandoned fractal was closed by the bot"""
+        data = {
+            'currentLevel': fractal_group.current_level,
+            'reason': reason
+        }
+        return await self.send_webhook('fractal_reaped', fractal_group.state.thread_id, data)
     
     def _get_vote_distribution(self, fractal_group) -> Dict[str, int]:
         """Get vote distribution for current round"""
-        vote_counts = {}
-        for candidate_id in fractal_group.votes.values():
-            candidate = next((c for c in fractal_group.active_candidates if c.id == candidate_id), None)
-            if candidate:
-                key = str(candidate.id)
-                vote_counts[key] = vote_counts.get(key, 0) + 1
-        return vote_counts
+        candidates = set(fractal_group.state.candidate_ids)
+        return {str(cid): count for cid, count in fractal_group.state.tally().items() if cid in candidates}
 
 # Global instance
 web_integration = WebIntegration()
@@ -0,0 +1,221 @@
+import argparse
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import time
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the msgpack wire format
+    msgpack = None
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+
+ENCODINGS = (JSON, MSGPACK)
+
+CONTENT_TYPES = {
+    JSON: 'application/json',
+    MSGPACK: 'application/msgpack'
+}
+
+SIGNATURE_VERSION = 'v1'
+
+_MISSING = object()
+
+def stringify_ids(value):
+    """
+    Convert snowflake values to strings for JSON, where they overflow JavaScript numbers
+
+    Fields named ``...Id`` hold one snowflake and ``...Ids`` a list of them.
+
+    Args:
+        value: Payload data (dicts, lists and scalars)
+
+    Returns:
+        The same structure with every id value as a string
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if isinstance(key, str) and key.endswith('Id') and isinstance(item, int):
+                item = str(item)
+            elif isinstance(key, str) and key.endswith('Ids') and isinstance(item, list):
+                item = [str(i) for i in item]
+            else:
+                item = stringify_ids(item)
+            result[key] = item
+        return result
+    if isinstance(value, list):
+        return [stringify_ids(item) for item in value]
+    return value
+
+class DeltaTracker:
+    """
+    Tracks the last state sent for each fractal so events only carry changed fields
+
+    Each fractal has a sequence number and a merged view of every field sent
+    so far. An event is sent as the fields that differ from that view plus
+    the sequence it builds on; the receiver merges it onto its own copy, or
+    answers 409 if it doesn't hold that sequence, and the event is resent
+    in full.
+    """
+
+    def __init__(self):
+        self._last = {}  # fractal_id -> (seq, merged data)
+
+    def track(self, fractal_id, data, final=False):
+        """
+        Record an event for a fractal
+
+        Args:
+            fractal_id (int): Thread ID of the fractal
+            data (dict): Full event data
+            final (bool): Whether this is the fractal's last event
+
+        Returns:
+            tuple: (seq, base_seq or None, full merged data, delta data)
+        """
+        base_seq, merged = self._last.get(fractal_id, (None, {}))
+        seq = (base_seq or 0) + 1
+        delta = {key: value for key, value in data.items() if merged.get(key, _MISSING) != value}
+        merged = {**merged, **data}
+        if final:
+            self._last.pop(fractal_id, None)
+        else:
+            self._last[fractal_id] = (seq, merged)
+        return seq, base_seq, merged, delta
+
+def encode_batch(items, encoding=JSON, resync=(), gzip_min_bytes=4096):
+    """
+    Encode queued webhook events as one request body
+
+    Args:
+        items (list): Queued events as dicts with fractal_id, event, seq, base_seq, full and delta
+        encoding (str): One of ENCODINGS
+        resync (set): Fractal IDs whose events must be sent in full
+        gzip_min_bytes (int): Compress bodies at least this large
+
+    Returns:
+        tuple: (body bytes, headers dict)
+    """
+    events = []
+    for item in items:
+        event = {'fractalId': item['fractal_id'], 'event': item['event'], 'seq': item['seq']}
+        if item['base_seq'] is not None and item['fractal_id'] not in resync:
+            event['baseSeq'] = item['base_seq']
+            event['data'] = item['delta']
+        else:
+            event['data'] = item['full']
+        events.append(event)
+
+    if encoding == MSGPACK:
+        body = msgpack.packb({'events': events}, use_bin_type=True)
+    else:
+        body = json.dumps(stringify_ids({'events': events}), separators=(',', ':')).encode()
+
+    headers = {'Content-Type': CONTENT_TYPES[encoding]}
+    if len(body) >= gzip_min_bytes:
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return body, headers
+
+def sign(secret, body, timestamp=None, nonce=None):
+    """
+    Headers authenticating a request body with HMAC-SHA256
+
+    The signature covers ``timestamp.nonce.body`` so the receiver can reject
+    stale or replayed requests as well as tampered ones. Sign the final
+    (encoded, possibly gzipped) body once per request.
+
+    Args:
+        secret (bytes): Shared webhook secret
+        body (bytes): Request body as sent
+        timestamp (int): Unix seconds; defaults to now
+        nonce (str): Unique request id; defaults to 16 random bytes as hex
+
+    Returns:
+        dict: X-Fractal-Timestamp, X-Fractal-Nonce and X-Fractal-Signature headers
+    """
+    timestamp = str(int(time.time()) if timestamp is None else timestamp)
+    nonce = nonce or os.urandom(16).hex()
+    mac = hmac.new(secret, f"{timestamp}.{nonce}.".encode(), hashlib.sha256)
+    mac.update(body)
+    return {
+        'X-Fractal-Timestamp': timestamp,
+        'X-Fractal-Nonce': nonce,
+        'X-Fractal-Signature': f"{SIGNATURE_VERSION}={mac.hexdigest()}"
+    }
+
+def _legacy_body(item):
+    """The previous wire format: one JSON request per event with full data"""
+    return json.dumps({
+        'fractalId': str(item['fractal_id']),
+        'event': item['event'],
+        'data': stringify_ids(item['full'])
+    }).encode()
+
+def _simulate(fractals):
+    """Queue the webhook events of ``fractals`` six-member groups voting to completion"""
+    tracker, items = DeltaTracker(), []
+
+    def add(fractal_id, event, data, final=False):
+        seq, base_seq, full, delta = tracker.track(fractal_id, data, final)
+        items.append({'fractal_id': fractal_id, 'event': event, 'seq': seq, 'base_seq': base_seq, 'full': data, 'delta': delta})
+
+    for f in range(fractals):
+        fractal_id = 1_300_000_000_000_000_000 + f
+        members = [1_100_000_000_000_000_000 + f * 10 + m for m in range(6)]
+        add(fractal_id, 'fractal_started', {
+            'threadId': fractal_id, 'name': f"Fractal Group {f}", 'guildId': 1_000_000_000_000_000_000,
+            'facilitatorDiscordId': members[0], 'participantDiscordIds': members, 'currentLevel': 6
+        })
+        candidates = list(members)
+        for level in range(6, 1, -1):
+            winner = candidates[0]
+            for voter in members[:4]:
+                add(fractal_id, 'vote_cast', {'voterId': voter, 'candidateId': winner, 'level': level, 'totalVotes': members.index(voter) + 1})
+            add(fractal_id, 'round_complete', {'level': level, 'winnerId': winner, 'totalVotes': 4, 'voteDistribution': {str(winner): 4}})
+            candidates.remove(winner)
+        add(fractal_id, 'fractal_complete', {
+            'results': [{'discordId': m, 'rank': r, 'level': 7 - r} for r, m in enumerate(members, 1)], 'totalRounds': 6
+        }, final=True)
+    return items
+
+def bench(fractals=200, batch_size=50):
+    """Compare bytes on the wire and encode time of each format on simulated fractals"""
+    items = _simulate(fractals)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    def measure(label, encode):
+        start = time.perf_counter()
+        size = sum(len(encode(batch)) for batch in batches)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {size / len(items):8.1f} bytes/event  {elapsed / len(items) * 1e6:6.1f}us/event")
+
+    print(f"{len(items)} events from {fractals} fractals, batches of {batch_size}")
+    measure("json, one request/event", lambda batch: b"".join(_legacy_body(item) for item in batch))
+    for encoding in ENCODINGS:
+        if encoding == MSGPACK and msgpack is None:
+            print("msgpack not installed; skipping msgpack formats")
+            continue
+        measure(f"{encoding} batch, full", lambda batch: encode_batch(batch, encoding, resync={i['fractal_id'] for i in batch}, gzip_min_bytes=1 << 30)[0])
+        measure(f"{encoding} batch, delta", lambda batch: encode_batch(batch, encoding, gzip_min_bytes=1 << 30)[0])
+        measure(f"{encoding} batch, delta+gzip", lambda batch: encode_batch(batch, encoding, gzip_min_bytes=0)[0])
+
+    secret = os.urandom(32)
+    bodies = [encode_batch(batch, JSON, gzip_min_bytes=1 << 30)[0] for batch in batches]
+    start = time.perf_counter()
+    for body in bodies:
+        sign(secret, body)
+    elapsed = time.perf_counter() - start
+    print(f"{'hmac-sha256 signing':<28} {elapsed / len(bodies) * 1e6:8.1f}us/batch  {elapsed / len(items) * 1e6:6.2f}us/event")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark webhook wire formats")
+    parser.add_argument('--fractals', type=int, default=200, help="Number of simulated fractals")
+    parser.add_argument('--batch', type=int, default=50, help="Events per webhook batch")
+    args = parser.parse_args()
+    bench(args.fractals, args.batch)
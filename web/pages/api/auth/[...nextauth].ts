@@ -1,7 +1,7 @@
-import NextAuth from 'next-auth';
+import NextAuth, { NextAuthOptions } from 'next-auth';
 import DiscordProvider from 'next-auth/providers/discord';
 import { db } from '../../../utils/database';
-import { users } from '../../../utils/schema';
+import { users, userStats } from '../../../utils/schema';
 import { eq } from 'drizzle-orm';
 
 interface DiscordProfile {
@@ -31,7 +31,8 @@ if (!process.env.NEXTAUTH_SECRET) {
   console.error('❌ NEXTAUTH_SECRET is not set');
 }
 
-export default NextAuth({
+// Shared with API routes that read the session via getServerSession
+export const authOptions: NextAuthOptions = {
   providers: [
     DiscordProvider({
       clientId: process.env.DISCORD_CLIENT_ID!,
@@ -85,19 +86,22 @@ export default NextAuth({
     },
     async session({ session, token }) {
       if (token.sub) {
-        // Get user data from database
+        // Get user data and precomputed stats in one keyed lookup
         const userData = await db
-          .select()
+          .select({ user: users, stats: userStats })
           .from(users)
+          .leftJoin(userStats, eq(userStats.discordId, users.discordId))
           .where(eq(users.discordId, token.sub as string))
           .limit(1);
 
         if (userData.length > 0 && session.user) {
-          session.user.id = userData[0].id.toString();
-          session.user.discordId = userData[0].discordId;
-          session.user.walletAddress = userData[0].walletAddress;
-          session.user.totalFractals = userData[0].totalFractals ?? 0;
-          session.user.totalWins = userData[0].totalWins ?? 0;
+          const { user, stats } = userData[0];
+          session.user.id = user.id.toString();
+          session.user.discordId = user.discordId;
+          session.user.walletAddress = user.walletAddress;
+          session.user.totalFractals = stats?.fractals ?? 0;
+          session.user.totalWins = stats?.wins ?? 0;
+          session.user.averageRank = stats && stats.placements > 0 ? stats.rankSum / stats.placements : null;
         }
       }
       return session;
@@ -117,4 +121,6 @@ export default NextAuth({
   session: {
     strategy: 'jwt',
   },
-});
+};
+
+export default NextAuth(authOptions);
@@ -1,47 +1,109 @@
 import { NextApiRequest, NextApiResponse } from 'next';
 import { getServerSession } from 'next-auth/next';
+import { authOptions } from '../auth/[...nextauth]';
 import { db } from '../../../utils/database';
 import { fractals, users, fractalParticipants } from '../../../utils/schema';
-import { eq, desc } from 'drizzle-orm';
+import { and, eq, desc, lt, SQL } from 'drizzle-orm';
+import { fractalListCache, invalidateFractalLists } from '../../../utils/cache';
+
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 100;
+const STATUSES = ['active', 'completed', 'cancelled'];
+
+interface ListQuery {
+  guildId?: string;
+  status?: string;
+  cursor?: number;
+  limit: number;
+}
+
+function single(value: string | string[] | undefined): string | undefined {
+  return Array.isArray(value) ? value[0] : value;
+}
+
+// Validate ?guildId=&status=&cursor=&limit= for GET
+function parseListQuery(query: NextApiRequest['query']): ListQuery | { error: string } {
+  const guildId = single(query.guildId);
+  const status = single(query.status);
+  const cursor = single(query.cursor);
+  const limit = single(query.limit);
+
+  if (guildId !== undefined && !/^\d+$/.test(guildId)) {
+    return { error: 'guildId must be a Discord snowflake' };
+  }
+  if (status !== undefined && !STATUSES.includes(status)) {
+    return { error: `status must be one of: ${STATUSES.join(', ')}` };
+  }
+  if (cursor !== undefined && !/^\d+$/.test(cursor)) {
+    return { error: 'Invalid cursor' };
+  }
+  const pageSize = limit === undefined ? DEFAULT_PAGE_SIZE : Number(limit);
+  if (!Number.isInteger(pageSize) || pageSize < 1 || pageSize > MAX_PAGE_SIZE) {
+    return { error: `limit must be between 1 and ${MAX_PAGE_SIZE}` };
+  }
+
+  return { guildId, status, cursor: cursor === undefined ? undefined : Number(cursor), limit: pageSize };
+}
+
+// One page of fractals, newest first. Pages are keyed on the serial id (which
+// follows creation order), so each page is an index range scan however deep
+// it is, and rows created meanwhile never shift later pages.
+async function listFractals({ guildId, status, cursor, limit }: ListQuery) {
+  const conditions: SQL[] = [];
+  if (guildId) conditions.push(eq(fractals.guildId, guildId));
+  if (status) conditions.push(eq(fractals.status, status));
+  if (cursor !== undefined) conditions.push(lt(fractals.id, cursor));
+
+  const rows = await db
+    .select({
+      id: fractals.id,
+      threadId: fractals.threadId,
+      name: fractals.name,
+      guildId: fractals.guildId,
+      status: fractals.status,
+      participantCount: fractals.participantCount,
+      currentLevel: fractals.currentLevel,
+      isPaused: fractals.isPaused,
+      createdAt: fractals.createdAt,
+      completedAt: fractals.completedAt,
+      facilitator: {
+        id: users.id,
+        username: users.username,
+        displayName: users.displayName,
+        avatarUrl: users.avatarUrl,
+      },
+    })
+    .from(fractals)
+    .leftJoin(users, eq(fractals.facilitatorId, users.id))
+    .where(conditions.length > 0 ? and(...conditions) : undefined)
+    .orderBy(desc(fractals.id))
+    .limit(limit + 1);  // One extra row tells us whether there is a next page
+
+  const page = rows.slice(0, limit);
+  return {
+    fractals: page,
+    nextCursor: rows.length > limit ? String(page[page.length - 1].id) : null,
+  };
+}
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
-  const session = await getServerSession(req, res, {});
+  const session = await getServerSession(req, res, authOptions);
   
   if (!session) {
     return res.status(401).json({ error: 'Unauthorized' });
   }
 
   if (req.method === 'GET') {
+    const query = parseListQuery(req.query);
+    if ('error' in query) {
+      return res.status(400).json({ error: query.error });
+    }
+
     try {
-      // Get all fractals with participant counts
-      const allFractals = await db
-        .select({
-          id: fractals.id,
-          threadId: fractals.threadId,
-          name: fractals.name,
-          guildId: fractals.guildId,
-          status: fractals.status,
-          participantCount: fractals.participantCount,
-          currentLevel: fractals.currentLevel,
-          isPaused: fractals.isPaused,
-          createdAt: fractals.createdAt,
-          completedAt: fractals.completedAt,
-          facilitator: {
-            id: users.id,
-            username: users.username,
-            displayName: users.displayName,
-            avatarUrl: users.avatarUrl,
-          },
-        })
-        .from(fractals)
-        .leftJoin(users, eq(fractals.facilitatorId, users.id))
-        .orderBy(desc(fractals.createdAt))
-        .limit(50);
-      console.log('✅ Fractals fetched:', {
-        count: allFractals.length,
-        fractals: allFractals.slice(0, 2) // Log first 2 for debugging
-      });
-      res.status(200).json(allFractals);
+      const key = `${query.guildId ?? ''}|${query.status ?? ''}|${query.cursor ?? ''}|${query.limit}`;
+      const { value: page, hit } = await fractalListCache.getOrLoad(key, () => listFractals(query));
+      res.setHeader('X-Cache', hit ? 'HIT' : 'MISS');
+      res.status(200).json(page);
     } catch (error) {
       console.error('💥 Database error:', error);
       res.status(500).json({ error: 'Internal server error', details: (error as Error).message });
@@ -92,6 +154,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         }
       }
 
+      invalidateFractalLists();
       res.status(201).json(newFractal[0]);
     } catch (error) {
       console.error('Error creating fractal:', error);
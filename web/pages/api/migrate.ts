@@ -20,8 +20,6 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         display_name VARCHAR(255),
         avatar_url TEXT,
         wallet_address VARCHAR(255),
-        total_fractals INTEGER DEFAULT 0,
-        total_wins INTEGER DEFAULT 0,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
       )
@@ -37,24 +35,29 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         guild_id VARCHAR(255) NOT NULL,
         facilitator_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
         status VARCHAR(50) DEFAULT 'active',
+        current_level INTEGER DEFAULT 6,
+        is_paused BOOLEAN DEFAULT false,
+        participant_discord_ids JSONB,
+        results JSONB,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         completed_at TIMESTAMP
       )
     `;
     console.log('✅ Fractals table created');
 
-    // Create participants table
+    // Create fractal_participants table
     await sql`
-      CREATE TABLE IF NOT EXISTS participants (
+      CREATE TABLE IF NOT EXISTS fractal_participants (
         id SERIAL PRIMARY KEY,
-        fractal_id INTEGER REFERENCES fractals(id) ON DELETE CASCADE,
-        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-        level INTEGER NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(fractal_id, user_id, level)
+        fractal_id INTEGER NOT NULL REFERENCES fractals(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        final_rank INTEGER,
+        levels_won TEXT[],
+        total_votes_received INTEGER DEFAULT 0
       )
     `;
-    console.log('✅ Participants table created');
+    console.log('✅ Fractal participants table created');
 
     // Create voting_rounds table
     await sql`
@@ -75,15 +78,104 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     await sql`
       CREATE TABLE IF NOT EXISTS votes (
         id SERIAL PRIMARY KEY,
-        voting_round_id INTEGER REFERENCES voting_rounds(id) ON DELETE CASCADE,
+        round_id INTEGER REFERENCES voting_rounds(id) ON DELETE CASCADE,
         voter_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
         candidate_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        UNIQUE(voting_round_id, voter_id)
+        voted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
       )
     `;
     console.log('✅ Votes table created');
 
+    // Bring tables created by earlier versions of this migration in line
+    // with utils/schema.ts. Each step checks first, so re-running is a no-op.
+    await sql`
+      DO $$
+      BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema()
+                   AND table_name = 'votes' AND column_name = 'voting_round_id')
+           AND NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema()
+                           AND table_name = 'votes' AND column_name = 'round_id') THEN
+          ALTER TABLE votes RENAME COLUMN voting_round_id TO round_id;
+        END IF;
+        IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema()
+                   AND table_name = 'votes' AND column_name = 'created_at')
+           AND NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema()
+                           AND table_name = 'votes' AND column_name = 'voted_at') THEN
+          ALTER TABLE votes RENAME COLUMN created_at TO voted_at;
+        END IF;
+      END $$
+    `;
+    await sql`ALTER TABLE fractals ADD COLUMN IF NOT EXISTS current_level INTEGER DEFAULT 6`;
+    await sql`ALTER TABLE fractals ADD COLUMN IF NOT EXISTS is_paused BOOLEAN DEFAULT false`;
+
+    // Participants used to be created in a `participants` table that nothing
+    // reads; copy any into fractal_participants, which the app and the stats
+    // backfill use. The old table is left in place.
+    await sql`
+      DO $$
+      BEGIN
+        IF to_regclass('participants') IS NOT NULL THEN
+          INSERT INTO fractal_participants (fractal_id, user_id, joined_at)
+          SELECT p.fractal_id, p.user_id, MIN(p.created_at)
+          FROM participants p
+          WHERE p.fractal_id IS NOT NULL AND p.user_id IS NOT NULL
+            AND NOT EXISTS (
+              SELECT 1 FROM fractal_participants fp WHERE fp.fractal_id = p.fractal_id AND fp.user_id = p.user_id
+            )
+          GROUP BY p.fractal_id, p.user_id;
+        END IF;
+      END $$
+    `;
+    console.log('✅ Existing tables updated');
+
+    // Indexes for paging fractal listings by guild or status, newest first
+    await sql`CREATE INDEX IF NOT EXISTS fractals_guild_id_idx ON fractals (guild_id, id)`;
+    await sql`CREATE INDEX IF NOT EXISTS fractals_status_id_idx ON fractals (status, id)`;
+    console.log('✅ Fractal listing indexes created');
+
+    // Unique keys the webhook upserts on. Older databases may hold a vote
+    // per click, so keep only each voter's latest vote in a round first
+    await sql`
+      DELETE FROM votes a USING votes b
+      WHERE a.round_id = b.round_id AND a.voter_id = b.voter_id AND a.id < b.id
+    `;
+    await sql`CREATE UNIQUE INDEX IF NOT EXISTS votes_round_voter_idx ON votes (round_id, voter_id)`;
+    await sql`CREATE UNIQUE INDEX IF NOT EXISTS voting_rounds_fractal_level_idx ON voting_rounds (fractal_id, level)`;
+    console.log('✅ Vote and round unique indexes created');
+
+    // Per-user stats, updated when fractals complete (see scripts/backfill-user-stats.js)
+    await sql`
+      CREATE TABLE IF NOT EXISTS user_stats (
+        discord_id VARCHAR(255) PRIMARY KEY,
+        fractals INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0,
+        placements INTEGER NOT NULL DEFAULT 0,
+        rank_sum INTEGER NOT NULL DEFAULT 0,
+        last_fractal_at TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+      )
+    `;
+    console.log('✅ User stats table created');
+
+    // Completed fractals keep who took part and the results, which the
+    // webhook counts into user_stats and the backfill recounts
+    await sql`ALTER TABLE fractals ADD COLUMN IF NOT EXISTS participant_discord_ids JSONB`;
+    await sql`ALTER TABLE fractals ADD COLUMN IF NOT EXISTS results JSONB`;
+
+    // Totals now live in user_stats; these were no longer updated
+    await sql`ALTER TABLE users DROP COLUMN IF EXISTS total_fractals, DROP COLUMN IF EXISTS total_wins`;
+    console.log('✅ Stats columns updated');
+
+    // Webhook nonces, claimed with each batch so replays are rejected on any instance
+    await sql`
+      CREATE TABLE IF NOT EXISTS webhook_nonces (
+        nonce VARCHAR(64) PRIMARY KEY,
+        expires_at TIMESTAMP NOT NULL
+      )
+    `;
+    await sql`CREATE INDEX IF NOT EXISTS webhook_nonces_expires_at_idx ON webhook_nonces (expires_at)`;
+    console.log('✅ Webhook nonces table created');
+
     // Test the connection
     const userCount = await sql`SELECT COUNT(*) as count FROM users`;
     console.log(`📊 Current users in database: ${userCount[0].count}`);
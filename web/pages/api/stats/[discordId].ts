@@ -0,0 +1,52 @@
+import { NextApiRequest, NextApiResponse } from 'next';
+import { getServerSession } from 'next-auth/next';
+import { authOptions } from '../auth/[...nextauth]';
+import { db } from '../../../utils/database';
+import { userStats } from '../../../utils/schema';
+import { eq } from 'drizzle-orm';
+
+type UserStatsRow = typeof userStats.$inferSelect;
+
+// Public shape of a user's aggregates, with the derived ratios filled in
+function presentStats(discordId: string, row?: UserStatsRow) {
+  const fractals = row?.fractals ?? 0;
+  const wins = row?.wins ?? 0;
+  const placements = row?.placements ?? 0;
+  return {
+    discordId,
+    fractals,
+    wins,
+    placements,
+    winRate: fractals > 0 ? wins / fractals : 0,
+    averageRank: placements > 0 ? (row?.rankSum ?? 0) / placements : null,
+    lastFractalAt: row?.lastFractalAt ?? null,
+  };
+}
+
+// GET /api/stats/:discordId (or /api/stats/me) - one user's precomputed stats
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  const session = await getServerSession(req, res, authOptions);
+
+  if (!session) {
+    return res.status(401).json({ error: 'Unauthorized' });
+  }
+
+  if (req.method !== 'GET') {
+    res.setHeader('Allow', ['GET']);
+    return res.status(405).end(`Method ${req.method} Not Allowed`);
+  }
+
+  const requested = Array.isArray(req.query.discordId) ? req.query.discordId[0] : req.query.discordId;
+  const discordId = requested === 'me' ? session.user?.discordId : requested;
+  if (!discordId || !/^\d+$/.test(discordId)) {
+    return res.status(400).json({ error: 'discordId must be a Discord snowflake' });
+  }
+
+  try {
+    const rows = await db.select().from(userStats).where(eq(userStats.discordId, discordId)).limit(1);
+    res.status(200).json(presentStats(discordId, rows[0]));
+  } catch (error) {
+    console.error('💥 Database error:', error);
+    res.status(500).json({ error: 'Internal server error' });
+  }
+}
@@ -18,6 +18,11 @@ import {
   ExternalLink
 } from 'lucide-react';
 
+interface FractalPage {
+  fractals: Fractal[];
+  nextCursor: string | null;
+}
+
 interface Fractal {
   id: number;
   threadId: string;
@@ -36,7 +41,9 @@ interface Fractal {
 
 export default function Dashboard() {
   const { data: session, status } = useSession();
-  const [fractals, setFractals] = useState<Fractal[]>([]);
+  const [activeFractals, setActiveFractals] = useState<Fractal[]>([]);
+  const [completedFractals, setCompletedFractals] = useState<Fractal[]>([]);
+  const [completedCursor, setCompletedCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
   // Debug logging
@@ -54,24 +61,26 @@ export default function Dashboard() {
     }
   }, [session]);
 
+  // One page of fractals with the given status, newest first
+  const fetchPage = async (fractalStatus: string, cursor?: string | null): Promise<FractalPage | null> => {
+    const params = new URLSearchParams({ status: fractalStatus });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`/api/fractals?${params}`);
+    if (!response.ok) {
+      console.error('❌ Fractals API Error:', await response.text());
+      return null;
+    }
+    return response.json();
+  };
+
   const fetchFractals = async () => {
     console.log('🔄 Fetching fractals...');
     try {
-      const response = await fetch('/api/fractals');
-      console.log('📡 Fractals API Response:', {
-        status: response.status,
-        statusText: response.statusText,
-        ok: response.ok,
-        url: response.url
-      });
-      
-      if (response.ok) {
-        const data = await response.json();
-        console.log('📊 Fractals Data:', data);
-        setFractals(data);
-      } else {
-        const errorText = await response.text();
-        console.error('❌ Fractals API Error:', errorText);
+      const [active, completed] = await Promise.all([fetchPage('active'), fetchPage('completed')]);
+      if (active) setActiveFractals(active.fractals);
+      if (completed) {
+        setCompletedFractals(completed.fractals);
+        setCompletedCursor(completed.nextCursor);
       }
     } catch (error) {
       console.error('💥 Fetch Error:', error);
@@ -80,6 +89,18 @@ export default function Dashboard() {
     }
   };
 
+  const loadMoreCompleted = async () => {
+    try {
+      const page = await fetchPage('completed', completedCursor);
+      if (page) {
+        setCompletedFractals((previous) => [...previous, ...page.fractals]);
+        setCompletedCursor(page.nextCursor);
+      }
+    } catch (error) {
+      console.error('💥 Fetch Error:', error);
+    }
+  };
+
   if (status === 'loading') {
     return (
       <div className="min-h-screen flex items-center justify-center">
@@ -163,9 +184,6 @@ export default function Dashboard() {
     );
   }
 
-  const activeFractals = fractals.filter(f => f.status === 'active');
-  const completedFractals = fractals.filter(f => f.status === 'completed');
-
   return (
     <div className="min-h-screen bg-background">
       <Head>
@@ -247,7 +265,7 @@ export default function Dashboard() {
         <Tabs defaultValue="active" className="space-y-4">
           <TabsList>
             <TabsTrigger value="active">Active Fractals ({activeFractals.length})</TabsTrigger>
-            <TabsTrigger value="completed">Completed ({completedFractals.length})</TabsTrigger>
+            <TabsTrigger value="completed">Completed ({completedFractals.length}{completedCursor ? '+' : ''})</TabsTrigger>
           </TabsList>
           
           <TabsContent value="active" className="space-y-4">
@@ -279,11 +297,20 @@ export default function Dashboard() {
                 </CardContent>
               </Card>
             ) : (
-              <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
-                {completedFractals.map((fractal) => (
-                  <FractalCard key={fractal.id} fractal={fractal} />
-                ))}
-              </div>
+              <>
+                <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
+                  {completedFractals.map((fractal) => (
+                    <FractalCard key={fractal.id} fractal={fractal} />
+                  ))}
+                </div>
+                {completedCursor && (
+                  <div className="text-center">
+                    <Button variant="outline" onClick={loadMoreCompleted}>
+                      Load more
+                    </Button>
+                  </div>
+                )}
+              </>
             )}
           </TabsContent>
         </Tabs>
@@ -0,0 +1,122 @@
+// Rebuild user_stats from recorded history. New completions update it
+// incrementally from the webhook; run this once after creating the table,
+// or any time the aggregates need recomputing.
+//
+// Usage: DATABASE_URL=... node scripts/backfill-user-stats.js [--dry-run]
+
+// Aggregates per Discord id over completed fractals.
+//
+// Since the webhook started recording each completed fractal's participants
+// and results on the fractal row, those are counted exactly as the webhook
+// counted them: every participant by Discord id (signed in or not), plus
+// any ranked winner missing from the list.
+//
+// Fractals completed before that are rebuilt from fractal_participants,
+// voters and round winners, which only covers users in the users table.
+// Their round winners are ranked by level, highest first, the same rounds
+// the bot ranks in its results (FractalState.round_results).
+const AGGREGATE = `
+  WITH completed AS (
+    SELECT id, completed_at, participant_discord_ids, results FROM fractals WHERE status = 'completed'
+  ),
+  recorded_ranks AS (
+    SELECT c.id AS fractal_id, r."discordId" AS discord_id, r.rank
+    FROM completed c, jsonb_to_recordset(c.results) AS r("discordId" text, rank int)
+    WHERE c.participant_discord_ids IS NOT NULL
+  ),
+  recorded AS (
+    SELECT c.id AS fractal_id, p.discord_id
+    FROM completed c, jsonb_array_elements_text(c.participant_discord_ids) AS p(discord_id)
+    UNION
+    SELECT fractal_id, discord_id FROM recorded_ranks
+  ),
+  legacy AS (
+    SELECT id FROM completed WHERE participant_discord_ids IS NULL
+  ),
+  legacy_ranks AS (
+    SELECT vr.fractal_id, u.discord_id,
+           ROW_NUMBER() OVER (PARTITION BY vr.fractal_id ORDER BY vr.level DESC)::int AS rank
+    FROM voting_rounds vr
+    JOIN legacy l ON l.id = vr.fractal_id
+    JOIN users u ON u.id = vr.winner_id
+  ),
+  legacy_participants AS (
+    SELECT fp.fractal_id, u.discord_id
+    FROM fractal_participants fp JOIN legacy l ON l.id = fp.fractal_id JOIN users u ON u.id = fp.user_id
+    UNION
+    SELECT vr.fractal_id, u.discord_id
+    FROM votes v JOIN voting_rounds vr ON vr.id = v.round_id JOIN legacy l ON l.id = vr.fractal_id
+    JOIN users u ON u.id = v.voter_id
+    UNION
+    SELECT fractal_id, discord_id FROM legacy_ranks
+  ),
+  participants AS (
+    SELECT fractal_id, discord_id FROM recorded
+    UNION ALL
+    SELECT fractal_id, discord_id FROM legacy_participants
+  ),
+  ranks AS (
+    SELECT fractal_id, discord_id, rank FROM recorded_ranks
+    UNION ALL
+    SELECT fractal_id, discord_id, rank FROM legacy_ranks
+  )
+  SELECT p.discord_id,
+         COUNT(*)::int AS fractals,
+         COUNT(*) FILTER (WHERE r.rank = 1)::int AS wins,
+         COUNT(r.rank)::int AS placements,
+         COALESCE(SUM(r.rank), 0)::int AS rank_sum,
+         MAX(c.completed_at) AS last_fractal_at
+  FROM participants p
+  JOIN completed c ON c.id = p.fractal_id
+  LEFT JOIN ranks r ON r.fractal_id = p.fractal_id AND r.discord_id = p.discord_id
+  GROUP BY p.discord_id
+`;
+
+async function backfill() {
+  require('dotenv').config();
+  const { neon } = require('@neondatabase/serverless');
+
+  if (!process.env.DATABASE_URL) {
+    console.error('❌ DATABASE_URL is not set');
+    process.exit(1);
+  }
+
+  const sql = neon(process.env.DATABASE_URL);
+  const dryRun = process.argv.includes('--dry-run');
+  console.log(`🔄 Backfilling user stats${dryRun ? ' (dry run)' : ''}...`);
+  const started = Date.now();
+
+  try {
+    if (dryRun) {
+      const rows = await sql(AGGREGATE);
+      console.log(`📊 Would write stats for ${rows.length} users`);
+      console.table(rows.slice(0, 10));
+      return;
+    }
+
+    // Replace the table in one transaction so readers never see it half-built
+    const [, inserted] = await sql.transaction([
+      sql('DELETE FROM user_stats'),
+      sql(`
+        WITH written AS (
+          INSERT INTO user_stats (discord_id, fractals, wins, placements, rank_sum, last_fractal_at, updated_at)
+          SELECT discord_id, fractals, wins, placements, rank_sum, last_fractal_at, now()
+          FROM (${AGGREGATE}) AS totals
+          RETURNING 1
+        )
+        SELECT COUNT(*)::int AS count FROM written
+      `),
+    ]);
+    console.log(`✅ Wrote stats for ${inserted[0].count} users in ${Date.now() - started}ms`);
+  } catch (error) {
+    console.error('❌ Backfill failed:', error);
+    process.exit(1);
+  }
+}
+
+// The query is shared with the tests, which check it against the webhook's counts
+module.exports = { AGGREGATE };
+
+if (require.main === module) {
+  backfill();
+}
@@ -11,6 +11,7 @@ declare module "next-auth" {
       walletAddress?: string | null
       totalFractals?: number
       totalWins?: number
+      averageRank?: number | null
     }
   }
 
@@ -18,8 +19,6 @@ declare module "next-auth" {
     id: string
     discordId?: string
     walletAddress?: string | null
-    totalFractals?: number
-    totalWins?: number
   }
 }
 
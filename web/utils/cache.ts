@@ -0,0 +1,74 @@
+// Short-lived in-memory caches for API responses. Entries live in the
+// function instance, so each serverless instance keeps its own copy:
+// invalidation reaches the instance that handled the webhook, and the TTL
+// bounds how stale any other instance can be.
+export class TtlCache<T> {
+  private entries = new Map<string, { value: T; expires: number }>();
+  private loading = new Map<string, Promise<T>>();
+  private generation = 0;
+
+  constructor(private ttlMs: number, private maxEntries = 500) {}
+
+  get(key: string): T | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expires <= Date.now()) {
+      this.entries.delete(key);
+      return undefined;
+    }
+    return entry.value;
+  }
+
+  set(key: string, value: T) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expires: Date.now() + this.ttlMs });
+    // Insertion order is expiry order, so the oldest entries are at the front
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value as string);
+    }
+  }
+
+  // Cached value for a key, loading it on a miss. Concurrent misses for the
+  // same key share one load, and a load that started before clear() is
+  // returned to its callers but not cached.
+  async getOrLoad(key: string, load: () => Promise<T>): Promise<{ value: T; hit: boolean }> {
+    const cached = this.get(key);
+    if (cached !== undefined) {
+      return { value: cached, hit: true };
+    }
+
+    let pending = this.loading.get(key);
+    if (!pending) {
+      const generation = this.generation;
+      pending = load()
+        .then((value) => {
+          if (generation === this.generation) this.set(key, value);
+          return value;
+        })
+        .finally(() => {
+          if (this.loading.get(key) === pending) this.loading.delete(key);
+        });
+      this.loading.set(key, pending);
+    }
+    return { value: await pending, hit: false };
+  }
+
+  clear() {
+    this.generation += 1;
+    this.entries.clear();
+    this.loading.clear();
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+}
+
+// Pages of GET /api/fractals, keyed by filters, cursor and page size
+export const FRACTAL_LIST_TTL_MS = Number(process.env.FRACTAL_LIST_CACHE_MS ?? 5000);
+export const fractalListCache = new TtlCache<any>(FRACTAL_LIST_TTL_MS);
+
+// Called by the webhook handler whenever a fractal's listed fields change
+export function invalidateFractalLists() {
+  fractalListCache.clear();
+}
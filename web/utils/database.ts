@@ -12,7 +12,8 @@ if (!process.env.DATABASE_URL) {
   throw new Error('DATABASE_URL is not set');
 }
 
-const sql = neon(process.env.DATABASE_URL!);
+// Raw queries and HTTP transactions (see utils/webhookStore.ts)
+export const sql = neon(process.env.DATABASE_URL!);
 export const db = drizzle(sql as any, { schema });
 
 console.log('✅ Database connection initialized');
@@ -1,4 +1,4 @@
-import { pgTable, serial, bigint, varchar, integer, timestamp, text, boolean, jsonb } from 'drizzle-orm/pg-core';
+import { pgTable, serial, bigint, varchar, integer, timestamp, text, boolean, jsonb, index, uniqueIndex } from 'drizzle-orm/pg-core';
 import { relations } from 'drizzle-orm';
 
 // Users table - Discord users with wallet integration
@@ -10,8 +10,6 @@ export const users = pgTable('users', {
   avatarUrl: varchar('avatar_url', { length: 500 }),
   walletAddress: varchar('wallet_address', { length: 255 }).unique(),
   walletType: varchar('wallet_type', { length: 50 }), // 'ethereum', 'solana', etc.
-  totalFractals: integer('total_fractals').default(0),
-  totalWins: integer('total_wins').default(0),
   totalVotes: integer('total_votes').default(0),
   createdAt: timestamp('created_at').defaultNow(),
   updatedAt: timestamp('updated_at').defaultNow(),
@@ -28,9 +26,15 @@ export const fractals = pgTable('fractals', {
   participantCount: integer('participant_count').default(0),
   currentLevel: integer('current_level').default(6),
   isPaused: boolean('is_paused').default(false),
+  participantDiscordIds: jsonb('participant_discord_ids'), // Set on completion; counted into user_stats
+  results: jsonb('results'), // Ranked round winners, set on completion
   createdAt: timestamp('created_at').defaultNow(),
   completedAt: timestamp('completed_at'),
-});
+}, (table) => ({
+  // Keyset pagination of /api/fractals filtered by guild or status, newest first
+  guildIdIdx: index('fractals_guild_id_idx').on(table.guildId, table.id),
+  statusIdIdx: index('fractals_status_id_idx').on(table.status, table.id),
+}));
 
 // Fractal participants - Many-to-many relationship
 export const fractalParticipants = pgTable('fractal_participants', {
@@ -53,7 +57,10 @@ export const votingRounds = pgTable('voting_rounds', {
   voteData: jsonb('vote_data'), // Store vote counts and details
   createdAt: timestamp('created_at').defaultNow(),
   completedAt: timestamp('completed_at'),
-});
+}, (table) => ({
+  // One round per level; the webhook upserts rounds on it
+  fractalLevelIdx: uniqueIndex('voting_rounds_fractal_level_idx').on(table.fractalId, table.level),
+}));
 
 // Individual votes
 export const votes = pgTable('votes', {
@@ -62,8 +69,33 @@ export const votes = pgTable('votes', {
   voterId: integer('voter_id').references(() => users.id).notNull(),
   candidateId: integer('candidate_id').references(() => users.id).notNull(),
   votedAt: timestamp('voted_at').defaultNow(),
+}, (table) => ({
+  // One vote per voter per round; a changed vote replaces the earlier one
+  roundVoterIdx: uniqueIndex('votes_round_voter_idx').on(table.roundId, table.voterId),
+}));
+
+// Per-user aggregates, updated incrementally when a fractal completes so
+// profile stats are a single keyed lookup. Keyed by Discord id so stats
+// accumulate before a user first signs in. Rebuild with
+// scripts/backfill-user-stats.js.
+export const userStats = pgTable('user_stats', {
+  discordId: varchar('discord_id', { length: 255 }).primaryKey(),
+  fractals: integer('fractals').notNull().default(0), // Completed fractals participated in
+  wins: integer('wins').notNull().default(0), // Finished first (won the highest level)
+  placements: integer('placements').notNull().default(0), // Finished with a rank (won any level)
+  rankSum: integer('rank_sum').notNull().default(0), // Sum of ranks, for the average rank
+  lastFractalAt: timestamp('last_fractal_at'),
+  updatedAt: timestamp('updated_at').defaultNow(),
 });
 
+// Webhook request nonces within the replay window, shared by every instance
+export const webhookNonces = pgTable('webhook_nonces', {
+  nonce: varchar('nonce', { length: 64 }).primaryKey(),
+  expiresAt: timestamp('expires_at').notNull(),
+}, (table) => ({
+  expiresAtIdx: index('webhook_nonces_expires_at_idx').on(table.expiresAt),
+}));
+
 // User achievements/badges
 export const achievements = pgTable('achievements', {
   id: serial('id').primaryKey(),
@@ -0,0 +1,58 @@
+import type { NextApiRequest } from 'next';
+import { createHmac, timingSafeEqual } from 'crypto';
+
+const SIGNATURE_VERSION = 'v1';
+
+// Requests whose timestamp is further than this from our clock are rejected
+const MAX_SKEW_SECONDS = 300;
+
+// How long a nonce must be remembered: as long as its timestamp is accepted.
+// Nonces are claimed in Postgres alongside the batch (see utils/webhookStore.ts),
+// so a replay is caught whichever serverless instance receives it.
+export const NONCE_TTL_SECONDS = MAX_SKEW_SECONDS * 2;
+
+const NONCE_PATTERN = /^[0-9a-f]{16,64}$/;
+
+function header(req: NextApiRequest, name: string): string {
+  const value = req.headers[name];
+  return (Array.isArray(value) ? value[0] : value) ?? '';
+}
+
+export function requestNonce(req: NextApiRequest): string {
+  return header(req, 'x-fractal-nonce');
+}
+
+// Check the HMAC-SHA256 signature over `timestamp.nonce.body` and reject
+// stale requests. Returns an error message, or null if valid. Replays are
+// rejected when the nonce is claimed with the batch.
+export function verifySignature(req: NextApiRequest, rawBody: Buffer, secret = process.env.WEBHOOK_SECRET): string | null {
+  if (!secret) {
+    return 'Webhook secret is not configured';
+  }
+
+  const timestamp = header(req, 'x-fractal-timestamp');
+  const nonce = requestNonce(req);
+  const signature = header(req, 'x-fractal-signature');
+  if (!timestamp || !nonce || !signature.startsWith(`${SIGNATURE_VERSION}=`)) {
+    return 'Missing signature';
+  }
+  if (!NONCE_PATTERN.test(nonce)) {
+    return 'Malformed nonce';
+  }
+
+  const now = Date.now();
+  if (!/^\d+$/.test(timestamp) || Math.abs(now / 1000 - Number(timestamp)) > MAX_SKEW_SECONDS) {
+    return 'Stale timestamp';
+  }
+
+  const expected = createHmac('sha256', secret)
+    .update(`${timestamp}.${nonce}.`)
+    .update(rawBody)
+    .digest();
+  const received = Buffer.from(signature.slice(SIGNATURE_VERSION.length + 1), 'hex');
+  if (received.length !== expected.length || !timingSafeEqual(received, expected)) {
+    return 'Invalid signature';
+  }
+
+  return null;
+}
@@ -0,0 +1,116 @@
+import type { NextApiRequest } from 'next';
+import { gunzipSync } from 'zlib';
+import { decode } from '@msgpack/msgpack';
+
+export interface WebhookEvent {
+  fractalId: string;
+  event: string;
+  seq?: number;
+  baseSeq?: number;
+  data: any;
+}
+
+export class UnsupportedMediaTypeError extends Error {}
+
+// Events after which the bot sends nothing more for a fractal
+const FINAL_EVENTS = new Set(['fractal_complete', 'fractal_reaped']);
+
+// Last merged data per fractal, used to expand delta payloads. This lives in
+// the function instance, so a cold start or a batch routed to another
+// instance answers 409 and the bot resends the affected fractals in full.
+// That is why the bot sends full events unless WEBHOOK_DELTAS is enabled.
+const MAX_TRACKED_FRACTALS = 5000;
+const deltaState = new Map<string, { seq: number; data: any }>();
+
+export async function readRawBody(req: NextApiRequest): Promise<Buffer> {
+  const chunks: Buffer[] = [];
+  for await (const chunk of req) {
+    chunks.push(typeof chunk === 'string' ? Buffer.from(chunk) : chunk);
+  }
+  return Buffer.concat(chunks);
+}
+
+// Decode a webhook body by its Content-Type (JSON or msgpack) and Content-Encoding
+export function decodeBody(raw: Buffer, contentType = '', contentEncoding = ''): any {
+  const body = contentEncoding.includes('gzip') ? gunzipSync(raw) : raw;
+
+  if (contentType.startsWith('application/msgpack')) {
+    // Snowflakes arrive as 64-bit integers; BigInt keeps them exact until normalizeIds
+    return normalizeIds(decode(body, { useBigInt64: true }));
+  }
+  if (contentType.startsWith('application/json') || contentType === '') {
+    return normalizeIds(JSON.parse(body.toString('utf8')));
+  }
+  throw new UnsupportedMediaTypeError(`Unsupported content type: ${contentType}`);
+}
+
+// Convert `...Id` and `...Ids` fields to strings, matching the database's text snowflakes
+export function normalizeIds(value: any): any {
+  if (Array.isArray(value)) {
+    return value.map(normalizeIds);
+  }
+  if (value && typeof value === 'object') {
+    const result: any = {};
+    for (const [key, item] of Object.entries(value)) {
+      if (key.endsWith('Id') && (typeof item === 'number' || typeof item === 'bigint')) {
+        result[key] = item.toString();
+      } else if (key.endsWith('Ids') && Array.isArray(item)) {
+        result[key] = item.map((id) => id.toString());
+      } else {
+        result[key] = normalizeIds(item);
+      }
+    }
+    return result;
+  }
+  return typeof value === 'bigint' ? Number(value) : value;
+}
+
+// A batch ({ events: [...] }) or a single legacy event as a list of events
+export function toEvents(body: any): WebhookEvent[] {
+  return Array.isArray(body?.events) ? body.events : [body];
+}
+
+// Expand delta events against the last data seen for each fractal. Nothing is
+// stored unless every event resolves; otherwise the fractals to resend in
+// full are returned so the batch can be retried without applying anything twice.
+export function resolveDeltas(events: WebhookEvent[]): { resolved: WebhookEvent[]; resync: string[] } {
+  const staged = new Map<string, { seq: number; data: any } | null>();
+  const resync = new Set<string>();
+  const resolved: WebhookEvent[] = [];
+
+  for (const event of events) {
+    const { fractalId, seq, baseSeq } = event;
+    if (seq === undefined) {
+      resolved.push(event);  // Legacy full payload without sequencing
+      continue;
+    }
+
+    let data = event.data;
+    if (baseSeq !== undefined && baseSeq !== null) {
+      const base = staged.has(fractalId) ? staged.get(fractalId) : deltaState.get(fractalId);
+      if (!base || base.seq !== baseSeq) {
+        resync.add(fractalId);
+        continue;
+      }
+      data = { ...base.data, ...event.data };
+    }
+
+    staged.set(fractalId, FINAL_EVENTS.has(event.event) ? null : { seq, data });
+    resolved.push({ ...event, data });
+  }
+
+  if (resync.size > 0) {
+    return { resolved: [], resync: Array.from(resync) };
+  }
+
+  staged.forEach((entry, fractalId) => {
+    deltaState.delete(fractalId);
+    if (entry) {
+      deltaState.set(fractalId, entry);
+    }
+  });
+  while (deltaState.size > MAX_TRACKED_FRACTALS) {
+    deltaState.delete(deltaState.keys().next().value as string);
+  }
+  return { resolved, resync: [] };
+}
@@ -0,0 +1,200 @@
+import type { WebhookEvent } from './webhookCodec';
+import { NONCE_TTL_SECONDS } from './webhookAuth';
+
+// Thrown when a batch's nonce was already claimed by an earlier request
+export class ReplayedRequestError extends Error {
+  constructor() {
+    super('Replayed request');
+  }
+}
+
+// The parts of the Neon driver used here: a tagged template that builds a
+// query and a transaction running several in one round trip. Tests pass an
+// equivalent client for a local Postgres.
+export interface SqlClient {
+  (strings: TemplateStringsArray, ...values: any[]): any;
+  transaction(queries: any[]): Promise<any[]>;
+}
+
+// Events after which the bot sends nothing more for a fractal
+const FINAL_EVENTS = new Set(['fractal_complete', 'fractal_reaped']);
+
+const MAX_CACHED_FRACTALS = 5000;
+
+export class WebhookStore {
+  // Thread id -> fractals.id for fractals seen recently. Statements use the
+  // cached row id directly and only fall back to the thread_id lookup on a
+  // miss; every statement returns the row id to fill the cache.
+  private fractalIds = new Map<string, number>();
+
+  constructor(private sql: SqlClient) {}
+
+  private cachedFractalId(threadId: string): number | null {
+    return this.fractalIds.get(threadId) ?? null;
+  }
+
+  private rememberFractalId(threadId: string, id: number) {
+    this.fractalIds.delete(threadId);
+    this.fractalIds.set(threadId, id);
+    while (this.fractalIds.size > MAX_CACHED_FRACTALS) {
+      this.fractalIds.delete(this.fractalIds.keys().next().value as string);
+    }
+  }
+
+  // One statement per event, returning `fractal_id` (no rows if the fractal is
+  // unknown). Each starts from the fractal's row id: the cached one, else looked
+  // up by thread id (COALESCE only runs the subquery when nothing is cached).
+  // The driver can't compose query fragments, so that CTE is repeated inline.
+  // Parameters in SELECT lists are cast, since nothing else gives them a type.
+  private statementFor(threadId: string, event: string, data: any) {
+    const sql = this.sql;
+    const cached = this.cachedFractalId(threadId);
+    switch (event) {
+      case 'fractal_started':
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id)
+          UPDATE fractals SET status = 'active', current_level = ${data.currentLevel || 6}
+          WHERE id = (SELECT id FROM f)
+          RETURNING id AS fractal_id`;
+
+      case 'vote_cast':
+        // A changed vote replaces the voter's earlier vote for the round
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id),
+          r AS (
+            INSERT INTO voting_rounds (fractal_id, level)
+            SELECT id, ${data.level}::int FROM f WHERE id IS NOT NULL
+            ON CONFLICT (fractal_id, level) DO UPDATE SET level = EXCLUDED.level
+            RETURNING id, fractal_id
+          )
+          INSERT INTO votes (round_id, voter_id, candidate_id)
+          SELECT r.id, voter.id, candidate.id
+          FROM r
+          JOIN users voter ON voter.discord_id = ${data.voterId}
+          JOIN users candidate ON candidate.discord_id = ${data.candidateId}
+          ON CONFLICT (round_id, voter_id) DO UPDATE
+            SET candidate_id = EXCLUDED.candidate_id, voted_at = now()
+          RETURNING (SELECT fractal_id FROM r) AS fractal_id`;
+
+      case 'round_complete':
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id),
+          r AS (
+            INSERT INTO voting_rounds (fractal_id, level, winner_id, total_votes, completed_at)
+            SELECT f.id, ${data.level}::int, winner.id, ${data.totalVotes}::int, now()
+            FROM f JOIN users winner ON winner.discord_id = ${data.winnerId}
+            WHERE f.id IS NOT NULL
+            ON CONFLICT (fractal_id, level) DO UPDATE
+              SET winner_id = EXCLUDED.winner_id, total_votes = EXCLUDED.total_votes, completed_at = EXCLUDED.completed_at
+            RETURNING fractal_id
+          )
+          UPDATE fractals SET current_level = ${data.level - 1}
+          WHERE id IN (SELECT fractal_id FROM r)
+          RETURNING id AS fractal_id`;
+
+      case 'fractal_complete':
+        // The fractal keeps its participants and results, and per-user stats
+        // are counted from that record, exactly as scripts/backfill-user-stats.js
+        // recounts them: every participant by Discord id, whether or not they
+        // have signed in, plus any ranked winner missing from the list.
+        // Stats only move when the fractal actually transitions to completed,
+        // so a redelivered event can't count twice.
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id),
+          done AS (
+            UPDATE fractals SET status = 'completed', completed_at = now(),
+              participant_discord_ids = ${JSON.stringify(data.participantDiscordIds ?? [])}::jsonb,
+              results = ${JSON.stringify(data.results ?? [])}::jsonb
+            WHERE id = (SELECT id FROM f) AND status IS DISTINCT FROM 'completed'
+            RETURNING participant_discord_ids, results, completed_at
+          ),
+          ranks AS (
+            SELECT r."discordId" AS discord_id, r.rank
+            FROM done, jsonb_to_recordset(done.results) AS r("discordId" text, rank int)
+          ),
+          participants AS (
+            SELECT jsonb_array_elements_text(participant_discord_ids) AS discord_id FROM done
+            UNION
+            SELECT discord_id FROM ranks
+          ),
+          stats AS (
+            INSERT INTO user_stats AS s (discord_id, fractals, wins, placements, rank_sum, last_fractal_at, updated_at)
+            SELECT p.discord_id, 1, COALESCE((r.rank = 1)::int, 0), (r.rank IS NOT NULL)::int, COALESCE(r.rank, 0),
+                   (SELECT completed_at FROM done), now()
+            FROM participants p LEFT JOIN ranks r ON r.discord_id = p.discord_id
+            ON CONFLICT (discord_id) DO UPDATE SET
+              fractals = s.fractals + EXCLUDED.fractals,
+              wins = s.wins + EXCLUDED.wins,
+              placements = s.placements + EXCLUDED.placements,
+              rank_sum = s.rank_sum + EXCLUDED.rank_sum,
+              last_fractal_at = EXCLUDED.last_fractal_at,
+              updated_at = EXCLUDED.updated_at
+          )
+          SELECT id AS fractal_id FROM f WHERE id IS NOT NULL`;
+
+      case 'fractal_paused':
+      case 'fractal_resumed':
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id)
+          UPDATE fractals SET is_paused = ${event === 'fractal_paused'}
+          WHERE id = (SELECT id FROM f)
+          RETURNING id AS fractal_id`;
+
+      case 'fractal_reaped':
+        return sql`
+          WITH f AS (SELECT COALESCE(${cached}::int, (SELECT id FROM fractals WHERE thread_id = ${threadId})) AS id)
+          UPDATE fractals SET status = 'cancelled', current_level = ${data.currentLevel}, completed_at = now()
+          WHERE id = (SELECT id FROM f)
+          RETURNING id AS fractal_id`;
+
+      default:
+        console.log(`Unknown event type: ${event}`);
+        return null;
+    }
+  }
+
+  // Apply a batch of webhook events in one transaction (one HTTP round trip to
+  // the database). Either every event is applied or none is, so a failed batch
+  // can be retried by the bot as is.
+  //
+  // The transaction starts by claiming the request's nonce. Its primary key
+  // makes a replay fail the whole transaction, on whichever instance it lands,
+  // and expired nonces are pruned as it goes.
+  async applyEvents(events: WebhookEvent[], nonce: string): Promise<number> {
+    const sql = this.sql;
+    const applied: WebhookEvent[] = [];
+    const statements = [
+      sql`INSERT INTO webhook_nonces (nonce, expires_at) VALUES (${nonce}, now() + make_interval(secs => ${NONCE_TTL_SECONDS}))`,
+      sql`DELETE FROM webhook_nonces WHERE expires_at < now()`,
+    ];
+    const firstEvent = statements.length;
+    for (const event of events) {
+      const statement = this.statementFor(event.fractalId, event.event, event.data);
+      if (statement) {
+        applied.push(event);
+        statements.push(statement);
+      }
+    }
+
+    let results: Array<Array<{ fractal_id: number | null }>>;
+    try {
+      results = (await sql.transaction(statements)) as typeof results;
+    } catch (error: any) {
+      // Every other insert has an ON CONFLICT clause, so a unique violation here is the nonce
+      if (error?.code === '23505' && String(error?.constraint ?? error?.message).includes('webhook_nonces')) {
+        throw new ReplayedRequestError();
+      }
+      throw error;
+    }
+
+    results.slice(firstEvent).forEach((rows, i) => {
+      const { fractalId, event } = applied[i];
+      if (FINAL_EVENTS.has(event)) {
+        this.fractalIds.delete(fractalId);
+      } else if (rows[0]?.fractal_id) {
+        this.rememberFractalId(fractalId, rows[0].fractal_id);
+      }
+    });
+    return applied.length;
+  }
+}